@@ -0,0 +1,34 @@
+"""add_evaluation_confidence_interval
+
+Revision ID: 4c7e2b9d1f3a
+Revises: 1a8fdc23eb6f
+Create Date: 2026-10-18 09:12:40.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c7e2b9d1f3a'
+down_revision: Union[str, None] = '1a8fdc23eb6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add the achieved confidence interval of sampling mode evaluations to evaluation_metadata table
+    with op.batch_alter_table('evaluation_metadata', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('average_score_ci_half_width', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('ci_level', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('sample_size', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    # Remove the confidence interval columns from evaluation_metadata table
+    with op.batch_alter_table('evaluation_metadata', schema=None) as batch_op:
+        batch_op.drop_column('sample_size')
+        batch_op.drop_column('ci_level')
+        batch_op.drop_column('average_score_ci_half_width')
@@ -0,0 +1,30 @@
+"""add_evaluation_results_path
+
+Revision ID: 7d3f1a6c2b84
+Revises: 4c7e2b9d1f3a
+Create Date: 2026-10-18 14:27:05.311902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3f1a6c2b84'
+down_revision: Union[str, None] = '4c7e2b9d1f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add the JSONL file streaming mode evaluations write their results to, to evaluation_metadata table
+    with op.batch_alter_table('evaluation_metadata', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('results_path', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    # Remove results_path column from evaluation_metadata table
+    with op.batch_alter_table('evaluation_metadata', schema=None) as batch_op:
+        batch_op.drop_column('results_path')
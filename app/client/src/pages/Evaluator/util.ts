@@ -214,7 +214,8 @@ export const getTopicMap = (evaluateResult: EvaluateResult) => {
         const keys = Object.keys(result);
         forEach(keys, (topicName: string) => {
             const value = get(result, topicName);
-            if (topicName !== 'Overall_Average') {
+            // Overall_Average and the sampling summary (ci_half_width, sample_size, ...) are not topics
+            if (topicName !== 'Overall_Average' && isObject(value)) {
                 topics.push(topicName);
             }
             if (isObject(value)) {
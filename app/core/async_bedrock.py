@@ -0,0 +1,160 @@
+import os
+import json
+import asyncio
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import quote
+
+import boto3
+import httpx
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.eventstream import EventStreamBuffer
+from botocore.exceptions import ClientError, EndpointConnectionError, NoCredentialsError
+
+
+class AsyncBedrockClient:
+    """
+    Minimal asyncio client for the Bedrock runtime Converse API.
+
+    Requests are signed with botocore's SigV4 signer and sent over a pooled
+    httpx.AsyncClient, so many calls can be in flight from one event loop
+    without holding a thread each. Error responses are raised as botocore
+    ClientError, the same as the boto3 client, so callers can share retry handling.
+    """
+
+    SIGNING_NAME = "bedrock"
+
+    def __init__(self, region_name: str, endpoint_url: Optional[str] = None,
+                 max_connections: int = 256, timeout: float = 3600.0):
+        self.region_name = region_name
+        self.endpoint_url = (endpoint_url or f"https://bedrock-runtime.{region_name}.amazonaws.com").rstrip('/')
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._credentials = None
+        # httpx pools are bound to the loop they were first used on
+        self._http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+            self._http_clients[loop] = client
+        return client
+
+    def _signed_headers(self, url: str, body: bytes, accept: str = "application/json") -> Dict[str, str]:
+        if self._credentials is None:
+            self._credentials = boto3.Session().get_credentials()
+            if self._credentials is None:
+                raise NoCredentialsError()
+        request = AWSRequest(
+            method="POST",
+            url=url,
+            data=body,
+            headers={"Content-Type": "application/json", "Accept": accept},
+        )
+        SigV4Auth(self._credentials.get_frozen_credentials(), self.SIGNING_NAME, self.region_name).add_auth(request)
+        return dict(request.headers.items())
+
+    @staticmethod
+    def _client_error(response: httpx.Response, operation_name: str) -> ClientError:
+        """Translate an HTTP error response into the ClientError boto3 would raise"""
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        error_type = response.headers.get("x-amzn-ErrorType", "").split(":")[0]
+        code = error_type or str(payload.get("__type", "")).split("#")[-1] or str(response.status_code)
+        message = payload.get("message") or payload.get("Message") or response.text
+        return ClientError(
+            {
+                "Error": {"Code": code, "Message": message},
+                "ResponseMetadata": {"HTTPStatusCode": response.status_code,
+                                     "HTTPHeaders": dict(response.headers)},
+            },
+            operation_name,
+        )
+
+    async def _post(self, path: str, payload: Dict[str, Any], operation_name: str) -> httpx.Response:
+        url = f"{self.endpoint_url}{path}"
+        body = json.dumps(payload).encode("utf-8")
+        headers = self._signed_headers(url, body)
+        try:
+            response = await self._get_http_client().post(url, content=body, headers=headers)
+        except httpx.TransportError as e:
+            raise EndpointConnectionError(endpoint_url=self.endpoint_url, error=e)
+        if response.status_code >= 400:
+            raise self._client_error(response, operation_name)
+        return response
+
+    async def converse(self, modelId: str, **kwargs) -> Dict[str, Any]:
+        """Async equivalent of boto3 ``bedrock-runtime.converse``"""
+        response = await self._post(f"/model/{quote(modelId, safe='')}/converse", kwargs, "Converse")
+        return response.json()
+
+    async def converse_stream(self, modelId: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async equivalent of boto3 ``bedrock-runtime.converse_stream``.
+
+        Yields events in the same shape as the boto3 ``stream`` iterator,
+        e.g. ``{"contentBlockDelta": {"delta": {"text": ...}}}``.
+        """
+        url = f"{self.endpoint_url}/model/{quote(modelId, safe='')}/converse-stream"
+        body = json.dumps(kwargs).encode("utf-8")
+        headers = self._signed_headers(url, body, accept="application/vnd.amazon.eventstream")
+        try:
+            async with self._get_http_client().stream("POST", url, content=body, headers=headers) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise self._client_error(response, "ConverseStream")
+                buffer = EventStreamBuffer()
+                async for chunk in response.aiter_bytes():
+                    buffer.add_data(chunk)
+                    for message in buffer:
+                        event = self._decode_event(message)
+                        if event is not None:
+                            yield event
+        except httpx.TransportError as e:
+            raise EndpointConnectionError(endpoint_url=self.endpoint_url, error=e)
+
+    @staticmethod
+    def _decode_event(message) -> Optional[Dict[str, Any]]:
+        headers = message.headers
+        payload = json.loads(message.payload) if message.payload else {}
+        if headers.get(":message-type") == "exception":
+            code = headers.get(":exception-type", "ModelStreamErrorException")
+            raise ClientError(
+                {"Error": {"Code": code, "Message": payload.get("message", "")},
+                 "ResponseMetadata": {"HTTPStatusCode": payload.get("originalStatusCode", 500)}},
+                "ConverseStream",
+            )
+        event_type = headers.get(":event-type")
+        return {event_type: payload} if event_type else None
+
+    async def close(self) -> None:
+        """Close the connection pool owned by the running loop"""
+        client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+_clients: Dict[Tuple[str, Optional[str]], AsyncBedrockClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_async_bedrock_client(region_name: Optional[str] = None, endpoint_url: Optional[str] = None) -> AsyncBedrockClient:
+    """Return the process-wide async client for a region/endpoint pair"""
+    region_name = region_name or os.environ.get("AWS_REGION", os.environ.get("AWS_DEFAULT_REGION", "us-west-2"))
+    key = (region_name, endpoint_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = AsyncBedrockClient(region_name, endpoint_url)
+            _clients[key] = client
+        return client
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import weakref
+from typing import Dict, Tuple
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+from app.core.config import CAII_MAX_CONNECTIONS
+
+
+_sync_clients: Dict[Tuple[str, str], OpenAI] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _base_url(caii_endpoint: str) -> str:
+    return caii_endpoint.removesuffix('/chat/completions')
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=CAII_MAX_CONNECTIONS,
+                        max_keepalive_connections=CAII_MAX_CONNECTIONS)
+
+
+def get_caii_client(caii_endpoint: str, token: str) -> OpenAI:
+    """
+    Return the shared OpenAI client for a CAII endpoint.
+
+    Clients are keyed by (endpoint, token) and keep their connections alive
+    between calls. A new token for an endpoint replaces the old client in the
+    registry; the old one is not closed, since other threads may still be
+    mid-request on it, and its pool is released once their references are gone.
+    """
+    base_url = _base_url(caii_endpoint)
+    key = (base_url, token)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            for stale_key in [k for k in _sync_clients if k[0] == base_url]:
+                del _sync_clients[stale_key]
+            client = OpenAI(base_url=base_url, api_key=token,
+                            http_client=httpx.Client(limits=_limits()))
+            _sync_clients[key] = client
+        return client
+
+
+def get_async_caii_client(caii_endpoint: str, token: str) -> AsyncOpenAI:
+    """
+    Return the shared AsyncOpenAI client for a CAII endpoint on the running loop.
+
+    Async connection pools cannot be shared across event loops, so the
+    registry is kept per loop and released together with it.
+    """
+    base_url = _base_url(caii_endpoint)
+    key = (base_url, token)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            for stale_key in [k for k in clients if k[0] == base_url]:
+                # Dropped, not closed, as in get_caii_client: closing would fail requests in flight
+                del clients[stale_key]
+            client = AsyncOpenAI(base_url=base_url, api_key=token,
+                                 http_client=httpx.AsyncClient(limits=_limits()))
+            clients[key] = client
+        return client
@@ -0,0 +1,101 @@
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import CHECKPOINT_DIR
+
+
+class JobCheckpoint:
+    """
+    Per-job SQLite store of completed work units and their outputs.
+
+    A non-demo job records each finished unit (a topic batch, an input row, an
+    evaluated pair) with the outputs it produced, together with the job's
+    parameters and output file. When the job is resumed, finished units are
+    replayed from here instead of being sent to the model again. The file is
+    removed once the job succeeds.
+    """
+
+    def __init__(self, job_name: str, directory: Optional[str] = None):
+        self.job_name = job_name
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", job_name)
+        self.db_path = Path(directory or CHECKPOINT_DIR) / f"{safe_name}.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS units (
+            unit_id TEXT PRIMARY KEY,
+            outputs TEXT NOT NULL,
+            completed_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        self._conn.commit()
+
+    @classmethod
+    def exists(cls, job_name: str, directory: Optional[str] = None) -> bool:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", job_name)
+        return (Path(directory or CHECKPOINT_DIR) / f"{safe_name}.db").exists()
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value: Any):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+            self._conn.commit()
+
+    def output_file(self, default: str) -> str:
+        """The job's output file: the one chosen by the first run, or `default` for a new job"""
+        path = self.get_meta("output_file")
+        if path is None:
+            path = default
+            self.set_meta("output_file", path)
+        return path
+
+    def record_unit(self, unit_id: str, outputs: List[Dict[str, Any]]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO units (unit_id, outputs) VALUES (?, ?)",
+                (unit_id, json.dumps(outputs, ensure_ascii=False)),
+            )
+            self._conn.commit()
+
+    def unit_outputs(self, unit_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Outputs of one finished unit, or None if it has not been completed"""
+        with self._lock:
+            row = self._conn.execute("SELECT outputs FROM units WHERE unit_id = ?", (unit_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count_units(self, prefix: str = "") -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM units WHERE substr(unit_id, 1, ?) = ?", (len(prefix), prefix)
+            ).fetchone()[0]
+
+    def completed_units(self, prefix: str = "") -> Dict[str, List[Dict[str, Any]]]:
+        """Outputs of the finished units whose id starts with prefix, in completion order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT unit_id, outputs FROM units WHERE substr(unit_id, 1, ?) = ? ORDER BY rowid",
+                (len(prefix), prefix),
+            ).fetchall()
+        return {unit_id: json.loads(outputs) for unit_id, outputs in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def discard(self):
+        """Delete the checkpoint after the job has succeeded"""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            Path(str(self.db_path) + suffix).unlink(missing_ok=True)
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import (
+    MAX_CONCURRENT_LLM_CALLS,
+    AIMD_INITIAL_LIMIT,
+    AIMD_MIN_LIMIT,
+    AIMD_DECREASE_FACTOR,
+)
+from app.core.telemetry import telemetry_manager
+
+# Outcomes reported back to the controller when a call finishes
+SUCCESS = "success"
+CONGESTION = "congestion"
+NEUTRAL = "neutral"
+
+
+class AdaptiveConcurrencyController:
+    """
+    Additive-increase / multiplicative-decrease limit on in-flight calls to one model.
+
+    Each successful call raises the limit by 1/limit (about +1 per round of
+    calls); a throttle or 5xx halves it. Only calls started after the last
+    decrease can trigger another one, so a burst of throttles from the same
+    window counts once.
+
+    Async callers wait on futures of their event loop and synchronous callers
+    (worker threads) block on a condition of the same lock, so both share one limit.
+    """
+
+    def __init__(self, model_id: str, initial_limit: float = AIMD_INITIAL_LIMIT,
+                 min_limit: float = AIMD_MIN_LIMIT, max_limit: float = MAX_CONCURRENT_LLM_CALLS,
+                 decrease_factor: float = AIMD_DECREASE_FACTOR, history_size: int = 200):
+        self.model_id = model_id
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.decrease_factor = decrease_factor
+        self.limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self.in_flight = 0
+        self.successes = 0
+        self.congestion_events = 0
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    async def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to release()"""
+        while True:
+            with self._lock:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return time.monotonic()
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    try:
+                        self._waiters.remove((loop, waiter))
+                    except ValueError:
+                        # Already woken: hand the wake-up to the next waiter
+                        self._wake_waiters()
+                raise
+
+    def acquire_blocking(self) -> float:
+        """Blocking acquire() for synchronous calls; returns the start time to pass to release()"""
+        with self._slot_freed:
+            while self.in_flight >= int(self.limit):
+                self._slot_freed.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started_at: float, outcome: str = NEUTRAL) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            old_limit = self.limit
+            if outcome == SUCCESS:
+                self.successes += 1
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            elif outcome == CONGESTION:
+                self.congestion_events += 1
+                if started_at >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = time.monotonic()
+            changed = int(self.limit) != int(old_limit)
+            if changed:
+                self._record_change(old_limit, outcome)
+            self._wake_waiters()
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one slot for the duration of a call.
+
+        The body reports its outcome by setting ``outcome["value"]`` on the
+        yielded dict; unhandled exceptions count as neutral.
+        """
+        started_at = await self.acquire()
+        outcome = {"value": NEUTRAL}
+        try:
+            yield outcome
+        finally:
+            self.release(started_at, outcome["value"])
+
+    @contextmanager
+    def sync_slot(self):
+        """
+        slot() for synchronous calls, blocking the calling thread until a slot is free.
+        Not for event loop threads: their calls would hold up the slots they wait for.
+        """
+        started_at = self.acquire_blocking()
+        outcome = {"value": NEUTRAL}
+        try:
+            yield outcome
+        finally:
+            self.release(started_at, outcome["value"])
+
+    def _wake_waiters(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            loop, waiter = self._waiters.popleft()
+            loop.call_soon_threadsafe(_resolve, waiter)
+            free -= 1
+        if free > 0:
+            # Blocked threads re-check the limit under the lock, like woken futures
+            self._slot_freed.notify_all()
+
+    def _record_change(self, old_limit: float, outcome: str) -> None:
+        event = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "model_id": self.model_id,
+            "event": "decrease" if outcome == CONGESTION else "increase",
+            "old_limit": int(old_limit),
+            "new_limit": int(self.limit),
+            "in_flight": self.in_flight,
+        }
+        self.history.append(event)
+        telemetry_manager.record_concurrency_change(**event)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model_id": self.model_id,
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "successes": self.successes,
+                "congestion_events": self.congestion_events,
+                "history": list(self.history),
+            }
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_controllers: Dict[str, AdaptiveConcurrencyController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_concurrency_controller(model_id: str) -> AdaptiveConcurrencyController:
+    """Return the process-wide controller for a model, shared by all services"""
+    with _controllers_lock:
+        controller = _controllers.get(model_id)
+        if controller is None:
+            controller = AdaptiveConcurrencyController(model_id)
+            _controllers[model_id] = controller
+        return controller
+
+
+def get_concurrency_snapshots(model_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    with _controllers_lock:
+        controllers = list(_controllers.values())
+    return [c.snapshot() for c in controllers if model_id is None or c.model_id == model_id]
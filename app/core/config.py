@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 from fastapi import FastAPI, HTTPException, Request, status
 import requests
@@ -165,6 +165,156 @@ MODEL_CONFIGS = {
     ModelID.MISTRAL: {"max_tokens": 2048, "max_input_tokens": 2048}
 }
 
+# Upper bound on LLM calls in flight at once for a single model
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "100"))
+
+# AIMD concurrency controller: starting, floor and decrease factor of the per-model limit
+AIMD_INITIAL_LIMIT = int(os.getenv("AIMD_INITIAL_LIMIT", "5"))
+AIMD_MIN_LIMIT = int(os.getenv("AIMD_MIN_LIMIT", "1"))
+AIMD_DECREASE_FACTOR = float(os.getenv("AIMD_DECREASE_FACTOR", "0.5"))
+
+# Generation work-unit scheduler: most batches of one topic allowed in flight at
+# once when other topics cannot use the capacity (1 keeps every topic strictly in order)
+GENERATION_LANE_MAX_IN_FLIGHT = int(os.getenv("GENERATION_LANE_MAX_IN_FLIGHT", "8"))
+
+# Most evaluation calls of one job in flight at once, across all of its topics;
+# the model's adaptive concurrency limit applies beneath it
+EVALUATION_MAX_IN_FLIGHT = int(os.getenv("EVALUATION_MAX_IN_FLIGHT", "16"))
+
+# QA pairs or rows scored per evaluation call when a request does not set
+# eval_batch_size, and the rounds in which items a batched reply left out or
+# malformed are re-asked together before falling back to one call per item
+EVALUATION_BATCH_SIZE = int(os.getenv("EVALUATION_BATCH_SIZE", "1"))
+EVALUATION_BATCH_RETRY_ROUNDS = int(os.getenv("EVALUATION_BATCH_RETRY_ROUNDS", "1"))
+
+# Sampling evaluation mode: size of the first stratified sample of a dataset, and the
+# fewest items judged per topic, before rounds grow it towards the CI target
+EVALUATION_SAMPLE_INITIAL_SIZE = int(os.getenv("EVALUATION_SAMPLE_INITIAL_SIZE", "200"))
+EVALUATION_SAMPLE_MIN_PER_TOPIC = int(os.getenv("EVALUATION_SAMPLE_MIN_PER_TOPIC", "10"))
+
+# Streaming evaluation of large imports: most pairs or rows issued ahead of the oldest
+# unfinished one, and the evaluated and failed items kept per topic in the summary file
+# (every result is in the JSONL results file next to it)
+EVALUATION_STREAM_MAX_PENDING = int(os.getenv("EVALUATION_STREAM_MAX_PENDING", "256"))
+EVALUATION_STREAM_PREVIEW_ITEMS = int(os.getenv("EVALUATION_STREAM_PREVIEW_ITEMS", "100"))
+
+# Items missing from a batch are re-requested in one call per round, up to this many
+# rounds, asking for this fraction more than needed (rounded up) to absorb invalid items
+GENERATION_REBATCH_MAX_ROUNDS = int(os.getenv("GENERATION_REBATCH_MAX_ROUNDS", "2"))
+GENERATION_REBATCH_MARGIN = float(os.getenv("GENERATION_REBATCH_MARGIN", "0.2"))
+
+# Near-duplicate filtering of generated items: Jaccard similarity of character
+# shingles at which two items count as duplicates, and the token budget of the
+# "already generated" hint in each prompt (the newest items that fit)
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.7"))
+GENERATION_OMIT_HINT_TOKENS = int(os.getenv("GENERATION_OMIT_HINT_TOKENS", "150"))
+
+# Generated items are appended to a JSONL file as they validate and fsynced
+# every this many items or seconds, whichever comes first
+RESULT_FSYNC_EVERY_ITEMS = int(os.getenv("RESULT_FSYNC_EVERY_ITEMS", "100"))
+RESULT_FSYNC_INTERVAL_SECONDS = float(os.getenv("RESULT_FSYNC_INTERVAL_SECONDS", "5"))
+
+# Most input rows of a generate_result job that may be issued but not yet
+# written in input order; bounds memory however large the input files are
+GENERATE_RESULT_MAX_PENDING = int(os.getenv("GENERATE_RESULT_MAX_PENDING", "256"))
+
+# Directory of the per-job checkpoint stores that let a failed CML job resume
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "checkpoints")
+
+# Directory of the per-job progress files served by /jobs/{job_id}/progress,
+# and the least time between two rewrites of a job's file
+PROGRESS_DIR = os.getenv("PROGRESS_DIR", "progress")
+PROGRESS_FLUSH_INTERVAL_SECONDS = float(os.getenv("PROGRESS_FLUSH_INTERVAL_SECONDS", "10"))
+
+# Host-wide rate limits per model_id, shared by the API server and CML jobs.
+# RATE_LIMITS is a JSON object {"<model_id>": {"requests_per_minute": .., "tokens_per_minute": ..}};
+# RATE_LIMIT_REQUESTS_PER_MIN / RATE_LIMIT_TOKENS_PER_MIN set the default for other models. 0 disables.
+RATE_LIMITS = json.loads(os.getenv("RATE_LIMITS", "{}"))
+RATE_LIMITS.setdefault("default", {
+    "requests_per_minute": int(os.getenv("RATE_LIMIT_REQUESTS_PER_MIN", "0")),
+    "tokens_per_minute": int(os.getenv("RATE_LIMIT_TOKENS_PER_MIN", "0")),
+})
+RATE_LIMIT_DB_PATH = Path(os.getenv("RATE_LIMIT_DB_PATH", str(Path(__file__).parent.parent.parent / "rate_limits.db")))
+
+# Response cache: "auto" caches temperature 0 calls only, "on"/"off" force it
+RESPONSE_CACHE_MODE = os.getenv("RESPONSE_CACHE_MODE", "auto").lower()
+RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "512"))
+RESPONSE_CACHE_DB_PATH = Path(os.getenv("RESPONSE_CACHE_DB_PATH", str(Path(__file__).parent.parent.parent / "response_cache.db")))
+
+# Evaluation store: scores of earlier evaluations are reused for pairs and rows whose
+# content, judge model, judge prompt and model parameters are all unchanged
+EVALUATION_STORE_ENABLED = os.getenv("EVALUATION_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+EVALUATION_STORE_DB_PATH = Path(os.getenv("EVALUATION_STORE_DB_PATH", str(Path(__file__).parent.parent.parent / "evaluation_store.db")))
+
+# Context window and largest accepted maxTokens, matched against the model id in order;
+# the first entry whose pattern is a substring wins, then the family default applies.
+MODEL_TOKEN_LIMITS = [
+    ("claude-3-haiku", {"context_window": 200000, "max_output_tokens": 4096}),
+    ("claude-3-opus", {"context_window": 200000, "max_output_tokens": 4096}),
+    ("claude-3-sonnet", {"context_window": 200000, "max_output_tokens": 4096}),
+    ("claude-3-5", {"context_window": 200000, "max_output_tokens": 8192}),
+    ("claude-3-7", {"context_window": 200000, "max_output_tokens": 64000}),
+    ("claude-sonnet-4", {"context_window": 200000, "max_output_tokens": 64000}),
+    ("claude-opus-4", {"context_window": 200000, "max_output_tokens": 32000}),
+    ("claude-v2", {"context_window": 100000, "max_output_tokens": 4096}),
+    ("claude-instant", {"context_window": 100000, "max_output_tokens": 4096}),
+    ("llama3-8b", {"context_window": 8192, "max_output_tokens": 2048}),
+    ("llama3-70b", {"context_window": 8192, "max_output_tokens": 2048}),
+    ("mixtral-8x7b", {"context_window": 32768, "max_output_tokens": 4096}),
+    ("mistral-7b", {"context_window": 32768, "max_output_tokens": 8192}),
+]
+MODEL_FAMILY_TOKEN_LIMITS = {
+    ModelFamily.CLAUDE: {"context_window": 200000, "max_output_tokens": 8192},
+    ModelFamily.LLAMA: {"context_window": 128000, "max_output_tokens": 2048},
+    ModelFamily.MISTRAL: {"context_window": 128000, "max_output_tokens": 8192},
+    ModelFamily.QWEN: {"context_window": 32768, "max_output_tokens": 8192},
+}
+DEFAULT_TOKEN_LIMITS = {"context_window": 32768, "max_output_tokens": 8192}
+
+# Bedrock prompt caching: a cachePoint is placed after the static prompt prefix for
+# these models when the prefix reaches the model's minimum cacheable length (tokens)
+BEDROCK_PROMPT_CACHING = os.getenv("BEDROCK_PROMPT_CACHING", "true").lower() in ("1", "true", "yes")
+PROMPT_CACHE_MIN_TOKENS = [
+    ("claude-3-5-haiku", 2048),
+    ("claude-3-7-sonnet", 1024),
+    ("claude-sonnet-4", 1024),
+    ("claude-opus-4", 1024),
+]
+
+# Structured output: item schemas sent as a Bedrock tool input schema or a CAII
+# response_format, so the model returns {"items": [...]} instead of free text
+STRUCTURED_OUTPUT_TOOL_NAME = "record_items"
+QA_PAIR_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "question": {"type": "string"},
+        "solution": {"type": "string"},
+    },
+    "required": ["question", "solution"],
+}
+FREEFORM_ITEM_SCHEMA = {"type": "object", "minProperties": 1}
+# Bedrock models that accept toolConfig, and those that can be forced to call the tool
+BEDROCK_TOOL_USE_MODELS = [
+    "anthropic.claude-3", "anthropic.claude-sonnet-4", "anthropic.claude-opus-4",
+    "meta.llama3-1", "meta.llama3-2-11b", "meta.llama3-2-90b", "meta.llama3-3", "meta.llama4",
+    "mistral.mistral-large", "amazon.nova",
+]
+BEDROCK_TOOL_CHOICE_MODELS = [
+    "anthropic.claude-3", "anthropic.claude-sonnet-4", "anthropic.claude-opus-4",
+    "mistral.mistral-large", "amazon.nova",
+]
+
+def freeform_item_schema(examples: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Schema for freeform items, requiring the fields of the first example when there is one"""
+    if not examples or not isinstance(examples[0], dict):
+        return FREEFORM_ITEM_SCHEMA
+    json_types = {str: "string", bool: "boolean", int: "number", float: "number", list: "array", dict: "object"}
+    return {
+        "type": "object",
+        "properties": {k: {"type": json_types[type(v)]} if type(v) in json_types else {} for k, v in examples[0].items()},
+        "required": list(examples[0]),
+    }
+
 def get_model_family(model_id: str) -> ModelFamily:
     if "anthropic.claude" in model_id or "us.anthropic.claude" in model_id:
         return ModelFamily.CLAUDE
@@ -287,10 +437,20 @@ responses = {
 
 JWT_PATH = Path("/tmp/jwt")
 
+# Connection pool size of each pooled CAII client
+CAII_MAX_CONNECTIONS = int(os.getenv("CAII_MAX_CONNECTIONS", "100"))
+
+# (mtime_ns, token) of the last /tmp/jwt read
+_jwt_cache: Optional[tuple] = None
+
 def _get_caii_token() -> str:
+    global _jwt_cache
     if (tok := os.getenv("CDP_TOKEN")):
         return tok
     try:
+        mtime = os.stat(JWT_PATH).st_mtime_ns
+        if _jwt_cache is not None and _jwt_cache[0] == mtime:
+            return _jwt_cache[1]
         payload = json.loads(open(JWT_PATH).read())
     except FileNotFoundError:
         raise HTTPException(
@@ -305,6 +465,7 @@ def _get_caii_token() -> str:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="access_token missing in /tmp/jwt")
+    _jwt_cache = (mtime, tok)
     return tok
 
 def caii_check(endpoint: str, timeout: int = 3) -> requests.Response:
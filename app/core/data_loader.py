@@ -6,6 +6,8 @@ import warnings
 from pathlib import Path
 from typing import Optional, Union
 
+from app.core.result_writer import ensure_json_array
+
 class DataLoader:
     """Load arbitrary tabular data into a DataFrame with robust error handling."""
     
@@ -21,7 +23,8 @@ class DataLoader:
         Returns:
             pandas DataFrame with the loaded data
         """
-        # Validate the path exists
+        # Validate the path exists; a generation job's output is written from its JSONL file on first use
+        path = ensure_json_array(path)
         if not os.path.exists(path):
             raise FileNotFoundError(f"File not found: {path}")
             
@@ -95,7 +95,11 @@ class DatabaseManager:
                         job_id TEXT,
                         job_name TEXT UNIQUE,
                         job_status TEXT,
-                        job_creator_name TEXT
+                        job_creator_name TEXT,
+                        average_score_ci_half_width FLOAT,
+                        ci_level FLOAT,
+                        sample_size INTEGER,
+                        results_path TEXT
                        
                     )
                 """)
@@ -312,8 +316,9 @@ class DatabaseManager:
                         timestamp, model_id, inference_type,caii_endpoint, use_case,
                         custom_prompt, model_parameters, generate_file_name,
                         evaluate_file_name, display_name, local_export_path,
-                        examples, average_score, job_id, job_name, job_status, job_creator_name
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        examples, average_score, job_id, job_name, job_status, job_creator_name,
+                        average_score_ci_half_width, ci_level, sample_size, results_path
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """
                 
                 values = (
@@ -334,7 +339,11 @@ class DatabaseManager:
                     metadata.get('job_id', None),
                  metadata.get('job_name', None),
                     metadata.get('job_status', None),
-                    metadata.get('job_creator_name', None)
+                    metadata.get('job_creator_name', None),
+                    metadata.get('average_score_ci_half_width', None),
+                    metadata.get('ci_level', None),
+                    metadata.get('sample_size', None),
+                    metadata.get('results_path', None)
                 )
                 
                 cursor.execute(query, values)
@@ -721,8 +730,13 @@ class DatabaseManager:
             raise
 
     
-    def update_job_evaluate(self, job_name: str, evaluate_file_name: str, local_export_path: str, timestamp: str, average_score: float, job_status:str):
-        """Update job evaluation with retry mechanism"""
+    def update_job_evaluate(self, job_name: str, evaluate_file_name: str, local_export_path: str, timestamp: str, average_score: float, job_status:str,
+                            ci_half_width: Optional[float] = None, ci_level: Optional[float] = None, sample_size: Optional[int] = None,
+                            results_path: Optional[str] = None):
+        """
+        Update job evaluation with retry mechanism; sampling mode jobs also record their
+        achieved interval and streaming mode jobs the JSONL file holding their results
+        """
         max_retries = 3
         retry_delay = 1  # seconds
         
@@ -755,11 +769,16 @@ class DatabaseManager:
                             local_export_path = ?,
                             timestamp = ?,
                             average_score = ?,
-                            job_status = ?
+                            job_status = ?,
+                            average_score_ci_half_width = ?,
+                            ci_level = ?,
+                            sample_size = ?,
+                            results_path = ?
                         WHERE job_name = ?
                         AND job_name IS NOT NULL 
                         AND job_name != ''
-                    """, (evaluate_file_name, local_export_path, timestamp, average_score, job_status, job_name))
+                    """, (evaluate_file_name, local_export_path, timestamp, average_score, job_status,
+                          ci_half_width, ci_level, sample_size, results_path, job_name))
                     
                     rows_affected = cursor.rowcount
                     conn.commit()
@@ -786,6 +805,22 @@ class DatabaseManager:
         
         raise Exception(f"Failed to update evaluation job after {max_retries} attempts")
     
+    def get_job_name(self, job_id: str) -> Optional[str]:
+        """Name of the generation or evaluation job with the given CML job id"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                for table in ("generation_metadata", "evaluation_metadata"):
+                    cursor.execute(f"SELECT job_name FROM {table} WHERE job_id = ?", (job_id,))
+                    row = cursor.fetchone()
+                    if row:
+                        return row[0]
+                return None
+
+        except Exception as e:
+            print(f"Error retrieving job name: {str(e)}")
+            return None
+
     def get_all_generate_metadata(self) -> List[Dict]:
         """Retrieve all metadata entries"""
         try:
@@ -1123,6 +1158,9 @@ class DatabaseManager:
             if file_path and os.path.exists(file_path):
                 #file_name = os.path.basename(file_path)
                 os.remove(file_path)
+            # The job's JSONL output, which file_path is written from on first use
+            if file_path and os.path.exists(os.path.splitext(file_path)[0] + ".jsonl"):
+                os.remove(os.path.splitext(file_path)[0] + ".jsonl")
             with self.get_connection() as conn:
                 conn.execute("BEGIN IMMEDIATE")
                 cursor = conn.cursor()
@@ -1142,6 +1180,10 @@ class DatabaseManager:
             if file_path and os.path.exists(file_path):
                 #file_name = os.path.basename(file_path)
                 os.remove(file_path)
+            # Streaming mode evaluations keep their results in a JSONL file next to the summary
+            results_path = (self.get_evaldata_by_filename(file_name) or {}).get('results_path')
+            if results_path and os.path.exists(results_path):
+                os.remove(results_path)
             
             with self.get_connection() as conn:
                 conn.execute("BEGIN IMMEDIATE")
@@ -0,0 +1,89 @@
+import hashlib
+import random
+import re
+import threading
+from typing import Dict, FrozenSet, List, Tuple
+
+from app.core.config import DEDUP_SIMILARITY_THRESHOLD
+
+SHINGLE_CHARS = 4
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+")
+
+# Fixed coefficients so signatures are comparable across processes and runs
+_rng = random.Random(0x5D5)
+_PERMUTATIONS: List[Tuple[int, int]] = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Character shingles of a text with case, punctuation and spacing normalized away"""
+    normalized = " ".join(_WORD.findall(text.lower()))
+    if len(normalized) <= SHINGLE_CHARS:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(normalized[i:i + SHINGLE_CHARS] for i in range(len(normalized) - SHINGLE_CHARS + 1))
+
+
+def minhash(shingle_set: FrozenSet[str]) -> List[int]:
+    """MinHash signature; the share of equal positions estimates Jaccard similarity"""
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+              for s in shingle_set]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashIndex:
+    """
+    Near-duplicate index over generated items, shared by all topics of a job.
+
+    Items are character shingled and MinHash signatures are banded for LSH,
+    so only items that agree on a whole band are compared. A candidate is a
+    duplicate when the exact Jaccard similarity of the shingle sets reaches
+    the threshold. Thread-safe, so concurrent batches can check and add
+    results as they arrive.
+    """
+
+    def __init__(self, threshold: float = DEDUP_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._rows = NUM_PERMUTATIONS // LSH_BANDS
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(LSH_BANDS)]
+        self._shingles: List[FrozenSet[str]] = []
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.duplicates = 0
+
+    def add_if_new(self, text: str) -> bool:
+        """Index text and return True, or return False if a near-duplicate is already indexed"""
+        shingle_set = shingles(text or "")
+        if not shingle_set:
+            return True
+        signature = minhash(shingle_set)
+        keys = [tuple(signature[band * self._rows:(band + 1) * self._rows]) for band in range(LSH_BANDS)]
+        with self._lock:
+            self.checked += 1
+            seen = set()
+            for band, key in enumerate(keys):
+                for item_id in self._buckets[band].get(key, ()):
+                    if item_id in seen:
+                        continue
+                    seen.add(item_id)
+                    if jaccard(shingle_set, self._shingles[item_id]) >= self.threshold:
+                        self.duplicates += 1
+                        return False
+            item_id = len(self._shingles)
+            self._shingles.append(shingle_set)
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, []).append(item_id)
+        return True
+
+    @property
+    def hit_rate(self) -> float:
+        return self.duplicates / self.checked if self.checked else 0.0
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import EVALUATION_STORE_DB_PATH
+from app.models.request_models import ModelParameters
+
+logger = logging.getLogger("evaluation_store")
+
+# Unit of SQLite IN (...) lookups, well below its bound variable limit
+_LOOKUP_CHUNK = 500
+
+
+def _hash(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class EvaluationStore:
+    """
+    Evaluations of single QA pairs or rows from earlier runs, stored in SQLite.
+
+    Entries are keyed by the judge (model, inference type, judge prompt and model
+    parameters) and by a hash of the evaluated content, so re-evaluating an edited
+    dataset only sends new or changed items to the model.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = db_path or EVALUATION_STORE_DB_PATH
+        self._write_lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        with self._get_db_connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS evaluations (
+                judge_key TEXT NOT NULL,
+                content_key TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (judge_key, content_key)
+            )
+            ''')
+            conn.commit()
+
+    @contextmanager
+    def _get_db_connection(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def judge_key(model_id: str, inference_type: str, judge_prompt: str, model_params: ModelParameters) -> str:
+        """Hash of every judge setting that determines a score"""
+        return _hash({
+            "model_id": model_id,
+            "inference_type": inference_type,
+            "judge_prompt": judge_prompt,
+            "model_params": model_params.model_dump(),
+        })
+
+    @staticmethod
+    def content_key(content: Any) -> str:
+        return _hash(content)
+
+    def get_many(self, judge_key: str, content_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored results of the given contents under judge_key, by content key"""
+        found = {}
+        try:
+            with self._get_db_connection() as conn:
+                for start in range(0, len(content_keys), _LOOKUP_CHUNK):
+                    chunk = content_keys[start:start + _LOOKUP_CHUNK]
+                    rows = conn.execute(
+                        f"SELECT content_key, result FROM evaluations WHERE judge_key = ? "
+                        f"AND content_key IN ({','.join('?' * len(chunk))})",
+                        (judge_key, *chunk)
+                    ).fetchall()
+                    found.update((key, json.loads(result)) for key, result in rows)
+        except Exception as e:
+            logger.error(f"Evaluation store read failed: {str(e)}")
+        return found
+
+    def put_many(self, judge_key: str, results: Dict[str, Dict[str, Any]]) -> None:
+        if not results:
+            return
+        try:
+            now = time.time()
+            with self._write_lock, self._get_db_connection() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO evaluations (judge_key, content_key, result, created_at) VALUES (?, ?, ?, ?)",
+                    [(judge_key, key, json.dumps(result, ensure_ascii=False), now) for key, result in results.items()]
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Evaluation store write failed: {str(e)}")
+
+    def clear(self) -> None:
+        with self._write_lock, self._get_db_connection() as conn:
+            conn.execute("DELETE FROM evaluations")
+            conn.commit()
+
+
+_evaluation_store: Optional[EvaluationStore] = None
+_evaluation_store_lock = threading.Lock()
+
+
+def get_evaluation_store() -> EvaluationStore:
+    """Return the process-wide evaluation store"""
+    global _evaluation_store
+    with _evaluation_store_lock:
+        if _evaluation_store is None:
+            _evaluation_store = EvaluationStore()
+        return _evaluation_store
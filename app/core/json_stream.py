@@ -0,0 +1,234 @@
+import ast
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_DECODER = json.JSONDecoder(strict=False)
+_SEPARATOR_RE = re.compile(r'[\s,]*')
+_CONTAINER_RE = re.compile(r'[\[{]')
+_SPACE_RE = re.compile(r'\s*')
+_SPECIAL_RE = re.compile(r'["\\{}\[\]]')
+_PREFIX_ATTEMPTS = 3
+
+
+class JsonArrayStreamParser:
+    """
+    Incremental parser for a JSON array of objects arriving in chunks.
+
+    Text before the first '[' (preambles, code fences) is skipped. Each
+    top-level object in the array is returned by feed() as soon as its closing
+    brace arrives; objects that are not valid JSON are skipped and counted in
+    ``skipped`` so the caller can fall back to parsing the full text.
+    """
+
+    def __init__(self):
+        self.text = []
+        self.skipped = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._current: List[str] = []
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk and return the objects it completed"""
+        self.text.append(chunk)
+        items = []
+        if self._done:
+            return items
+
+        for ch in chunk:
+            if not self._in_array:
+                if ch == '[':
+                    self._in_array = True
+                continue
+
+            if self._depth == 0:
+                if ch == '{':
+                    self._depth = 1
+                    self._current = [ch]
+                elif ch == ']':
+                    self._done = True
+                    break
+                continue
+
+            self._current.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{' or ch == '[':
+                self._depth += 1
+            elif ch == '}' or ch == ']':
+                self._depth -= 1
+                if self._depth == 0:
+                    item = self._decode(''.join(self._current))
+                    self._current = []
+                    if item is not None:
+                        items.append(item)
+        return items
+
+    def _decode(self, raw: str):
+        item = _decode_object(raw)
+        if item is None:
+            self.skipped += 1
+        return item
+
+    @property
+    def full_text(self) -> str:
+        return ''.join(self.text)
+
+
+def _decode_object(raw: str) -> Optional[Dict[str, Any]]:
+    """Decode one object, accepting Python-literal dicts the model sometimes emits"""
+    try:
+        item = json.loads(raw, strict=False)
+    except json.JSONDecodeError:
+        try:
+            item = ast.literal_eval(raw)
+        except (SyntaxError, ValueError, TypeError, MemoryError, RecursionError):
+            return None
+    return item if isinstance(item, dict) else None
+
+
+def _match_object(text: str, start: int) -> Tuple[Optional[int], str]:
+    """
+    Find the end of a malformed object starting at text[start] == '{'.
+
+    A double quote inside a string only closes it when followed by ',', ':',
+    '}' or ']'; other quotes are treated as unescaped content and escaped in
+    the returned copy. Returns (end, repaired), with end None when the text
+    runs out first (truncated output).
+    """
+    out = []
+    depth = 0
+    in_string = False
+    copied = start
+    escaped_until = start
+    n = len(text)
+    for match in _SPECIAL_RE.finditer(text, start):
+        i = match.start()
+        if i < escaped_until:
+            continue
+        ch = text[i]
+        if in_string:
+            if ch == '\\':
+                escaped_until = i + 2
+            elif ch == '"':
+                j = _SPACE_RE.match(text, i + 1).end()
+                if j < n and text[j] not in ',:}]':
+                    out.append(text[copied:i])
+                    out.append('\\')
+                    copied = i
+                else:
+                    in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{' or ch == '[':
+            depth += 1
+        elif ch == '}' or ch == ']':
+            depth -= 1
+            if depth == 0:
+                out.append(text[copied:i + 1])
+                return i + 1, ''.join(out)
+    out.append(text[copied:])
+    return None, ''.join(out)
+
+
+def _scan_object(text: str, start: int, items: List[Dict[str, Any]]) -> Optional[int]:
+    """Decode the object at text[start], appending it if valid; returns where it ends"""
+    try:
+        item, end = _DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        end, repaired = _match_object(text, start)
+        if end is None:
+            return None
+        item = _decode_object(text[start:end]) or _decode_object(repaired)
+    if isinstance(item, dict):
+        items.append(item)
+    return end
+
+
+def _decode_array_prefix(text: str, start: int, items: List[Dict[str, Any]]) -> Tuple[int, bool]:
+    """
+    Decode as much of the array at text[start] == '[' as the C decoder accepts.
+
+    A valid array is decoded whole. Otherwise the elements before the first
+    error are decoded by closing the array after one of the last '}'
+    preceding it, which covers output truncated at max_tokens. Returns where element-wise
+    scanning should resume and whether the array was fully consumed.
+    """
+    try:
+        value, end = _DECODER.raw_decode(text, start)
+    except json.JSONDecodeError as e:
+        last = e.pos
+        # A '}' inside a string of the broken element is not a boundary; try a few
+        for _ in range(_PREFIX_ATTEMPTS):
+            last = text.rfind('}', start, last)
+            if last == -1:
+                break
+            try:
+                value = json.loads(text[start:last + 1] + ']', strict=False)
+            except json.JSONDecodeError:
+                continue
+            items.extend(item for item in value if isinstance(item, dict))
+            return last + 1, False
+        return start + 1, False
+    items.extend(item for item in value if isinstance(item, dict))
+    return end, True
+
+
+def scan_json_objects(text: str) -> List[Dict[str, Any]]:
+    """
+    Recover every well-formed object from a possibly malformed JSON response.
+
+    Walks the text once, left to right. Each top-level array is decoded by
+    the C JSON decoder up to its first error; from there each element (and
+    each object outside an array) is decoded in place, and only an element
+    that fails is re-scanned to find its end, repair unescaped quotes or
+    read it as a Python literal. Prose around the JSON, a broken
+    element, trailing commas and a truncated tail only cost the affected
+    object; everything else is returned in order.
+    """
+    items = []
+    pos = 0
+    n = len(text)
+    while pos < n:
+        match = _CONTAINER_RE.search(text, pos)
+        if match is None:
+            break
+        pos = match.start()
+        if text[pos] == '{':
+            end = _scan_object(text, pos, items)
+            if end is None:
+                break
+            pos = end
+            continue
+
+        pos, complete = _decode_array_prefix(text, pos, items)
+        if complete:
+            continue
+
+        # Element by element: objects, separators, and anything else ends the array
+        while True:
+            pos = _SEPARATOR_RE.match(text, pos).end()
+            if pos >= n or text[pos] == ']':
+                pos += 1
+                break
+            if text[pos] == '{':
+                end = _scan_object(text, pos, items)
+                if end is None:
+                    return items
+                pos = end
+                continue
+            try:
+                _, pos = _DECODER.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                break
+    return items
@@ -116,12 +116,12 @@ def list_bedrock_models() -> List[str]:
 async def _probe_bedrock(model_id: str, runtime) -> Tuple[str, bool]:
     handler = UnifiedModelHandler(model_id=model_id,
                                   bedrock_client=runtime,
-                                  model_params=_MIN_PARAMS)
+                                  model_params=_MIN_PARAMS,
+                                  use_cache=False)
     try:
         await asyncio.wait_for(
-            asyncio.to_thread(handler.generate_response,
-                              "Return HEALTHY if you can process this message.",
-                              False),
+            handler.agenerate_response("Return HEALTHY if you can process this message.",
+                                       False),
             timeout=5
         )
         return model_id, True
@@ -1,24 +1,42 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import json
 import time
+import asyncio
 import boto3
 from botocore.exceptions import ClientError, ConnectionClosedError, EndpointConnectionError
 from urllib3.exceptions import ProtocolError
-import ast
-import re
-from app.core.config import get_model_family, MODEL_CONFIGS
+from app.core.config import (
+    get_model_family, MODEL_CONFIGS, BEDROCK_PROMPT_CACHING, PROMPT_CACHE_MIN_TOKENS,
+    STRUCTURED_OUTPUT_TOOL_NAME, BEDROCK_TOOL_USE_MODELS, BEDROCK_TOOL_CHOICE_MODELS,
+)
+from app.core.async_bedrock import get_async_bedrock_client
+from app.core.concurrency import get_concurrency_controller, SUCCESS, CONGESTION
+from app.core.rate_limiter import get_rate_limiter
+from app.core.token_estimator import get_token_estimator
+from app.core.json_stream import JsonArrayStreamParser, scan_json_objects
 from app.models.request_models import ModelParameters
-from openai import OpenAI
+from app.core.caii_clients import get_caii_client, get_async_caii_client
+from app.core.response_cache import ResponseCache, get_response_cache, response_cache_enabled
 from app.core.exceptions import APIError, InvalidModelError, ModelHandlerError, JSONParsingError
+from app.core.telemetry import telemetry_manager
 from app.core.telemetry_integration import track_llm_operation
 from app.core.config import  _get_caii_token
 
 
 
+CONGESTION_ERROR_CODES = {
+    'ThrottlingException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'InternalServerException',
+    'TooManyRequestsException',
+}
+
+
 class UnifiedModelHandler:
     """Unified handler for all model types using Bedrock's converse API"""
     
-    def __init__(self, model_id: str, bedrock_client=None, model_params: Optional[ModelParameters] = None, inference_type = "aws_bedrock", caii_endpoint:Optional[str]=None, custom_p = False):
+    def __init__(self, model_id: str, bedrock_client=None, model_params: Optional[ModelParameters] = None, inference_type = "aws_bedrock", caii_endpoint:Optional[str]=None, custom_p = False, async_bedrock_client=None, use_cache: Optional[bool] = None, output_schema: Optional[Dict[str, Any]] = None):
         """
         Initialize the model handler
         
@@ -26,6 +44,13 @@ class UnifiedModelHandler:
             model_id: The ID of the model to use
             bedrock_client: Optional pre-configured Bedrock client
             model_params: Optional model parameters
+            inference_type: "aws_bedrock" or "CAII"
+            caii_endpoint: Endpoint URL of the CAII model, for inference_type "CAII"
+            custom_p: Return the raw response text instead of parsing it as JSON
+            async_bedrock_client: Optional client exposing an async converse(), used by agenerate_response
+            use_cache: Cache responses on disk; defaults to on for temperature 0 only
+            output_schema: JSON schema of one output item; when set the model is asked for
+                structured output (Bedrock tool use, CAII response_format) where supported
         """
         self.model_id = model_id
         self.bedrock_client = bedrock_client or boto3.client('bedrock-runtime')
@@ -34,6 +59,10 @@ class UnifiedModelHandler:
         self.inference_type = inference_type
         self.caii_endpoint = caii_endpoint
         self.custom_p = custom_p
+        self.async_bedrock_client = async_bedrock_client
+        self.output_schema = None if custom_p else output_schema
+        self.use_cache = response_cache_enabled(self.model_params) if use_cache is None else use_cache
+        self.response_cache = get_response_cache() if self.use_cache else None
         
         # AWS Step Functions style retry config
         self.MAX_RETRIES = 2
@@ -45,10 +74,19 @@ class UnifiedModelHandler:
         delay = self.BASE_DELAY * (self.MULTIPLIER ** retry_count)
         time.sleep(delay)
 
+    async def _aexponential_backoff(self, retry_count: int) -> None:
+        """Same schedule as _exponential_backoff, yielding to the event loop"""
+        delay = self.BASE_DELAY * (self.MULTIPLIER ** retry_count)
+        await asyncio.sleep(delay)
+
     def _extract_json_from_text(self, text: str) -> List[Dict[str, Any]]:
         """
         Extract JSON array from text response with robust parsing.
         Handles both QA pairs and evaluation responses.
+
+        Well-formed JSON is parsed directly; anything else goes through a single
+        tolerant scan that keeps every object that parses, so prose around the
+        array, one broken element or a truncated tail do not lose the rest.
         
         Args:
             text: The text to parse
@@ -59,12 +97,9 @@ class UnifiedModelHandler:
         try:
             # If text is not a string, try to work with it as is
             if not isinstance(text, str):
-                try:
-                    if isinstance(text, (list, dict)):
-                        return text if isinstance(text, list) else [text]
-                    return []
-                except:
-                    return []
+                if isinstance(text, (list, dict)):
+                    return text if isinstance(text, list) else self._structured_items(text) or [text]
+                return []
 
             # First attempt: Try direct JSON parsing of the entire text
             try:
@@ -72,75 +107,13 @@ class UnifiedModelHandler:
                 if isinstance(parsed, list):
                     return parsed
                 elif isinstance(parsed, dict):
-                    return [parsed]
+                    return self._structured_items(parsed) or [parsed]
                 return []
             except json.JSONDecodeError:
-                # Continue with other parsing methods if direct parsing fails
+                # Continue with the tolerant scan if direct parsing fails
                 pass
 
-            # Find JSON array boundaries
-            start_idx = text.find('[')
-            end_idx = text.rfind(']') + 1
-
-            if start_idx != -1 and end_idx != -1:
-                json_text = text[start_idx:end_idx]
-                
-                # Multiple parsing attempts
-                try:
-                    # Try parsing the extracted JSON
-                    parsed = json.loads(json_text)
-                    if isinstance(parsed, list):
-                        return parsed
-                    elif isinstance(parsed, dict):
-                        return [parsed]
-                except json.JSONDecodeError:
-                    try:
-                        # Try using ast.literal_eval
-                        parsed = ast.literal_eval(json_text)
-                        if isinstance(parsed, list):
-                            return parsed
-                        elif isinstance(parsed, dict):
-                            return [parsed]
-                    except (SyntaxError, ValueError):
-                        # Try cleaning the text
-                        cleaned = (json_text
-                                .replace('\n', ' ')
-                                .replace('\\n', ' ')
-                                .replace("'", '"')
-                                .replace('\t', ' ')
-                                .strip())
-                        try:
-                            parsed = json.loads(cleaned)
-                            if isinstance(parsed, list):
-                                return parsed
-                            elif isinstance(parsed, dict):
-                                return [parsed]
-                        except json.JSONDecodeError:
-                            pass
-
-            # If JSON parsing fails, try regex patterns for both formats
-            results = []
-            
-            # Try to extract score and justification pattern
-            score_pattern = r'"score":\s*(\d+\.?\d*),\s*"justification":\s*"([^"]*)"'
-            score_matches = re.findall(score_pattern, text, re.DOTALL)
-            if score_matches:
-                for score, justification in score_matches:
-                    results.append({
-                        "score": float(score),
-                        "justification": justification.strip()
-                    })
-                    
-            # Try to extract question and solution pattern
-            qa_pattern = r'"question":\s*"([^"]*)",\s*"solution":\s*"([^"]*)"'
-            qa_matches = re.findall(qa_pattern, text, re.DOTALL)
-            if qa_matches:
-                for question, solution in qa_matches:
-                    results.append({
-                        "question": question.strip(),
-                        "solution": solution.strip()
-                    })
-
+            results = scan_json_objects(text)
             if results:
                 return results
 
@@ -153,113 +126,335 @@ class UnifiedModelHandler:
             return []
 
 
+    def _structured_items(self, value: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """The items of a structured-output payload ({"items": [...]}), None for anything else"""
+        if self.output_schema is None or not isinstance(value.get("items"), list):
+            return None
+        return [item for item in value["items"] if isinstance(item, dict)]
+
+    def _items_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {"items": {"type": "array", "items": self.output_schema}},
+            "required": ["items"],
+        }
+
+    def _tool_config(self) -> Optional[Dict[str, Any]]:
+        """Bedrock toolConfig asking for the items as tool input, None when not applicable"""
+        if self.output_schema is None or not any(m in self.model_id for m in BEDROCK_TOOL_USE_MODELS):
+            return None
+        tool_config = {"tools": [{"toolSpec": {
+            "name": STRUCTURED_OUTPUT_TOOL_NAME,
+            "description": "Record every generated item, in order.",
+            "inputSchema": {"json": self._items_schema()},
+        }}]}
+        # Other tool-use models only support automatic tool choice
+        if any(m in self.model_id for m in BEDROCK_TOOL_CHOICE_MODELS):
+            tool_config["toolChoice"] = {"tool": {"name": STRUCTURED_OUTPUT_TOOL_NAME}}
+        return tool_config
+
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        if not self.use_cache:
+            return None
+        return ResponseCache.make_key(self.model_id, self.inference_type, prompt, self.model_params,
+                                      caii_endpoint=self.caii_endpoint, custom_p=self.custom_p,
+                                      output_schema=self.output_schema)
+
+    @staticmethod
+    def _cacheable(result: Any) -> bool:
+        """
+        Whether a response may be cached: only extracted items. Empty results and the
+        [{"text": ...}] fallback of an unparseable reply are not, so a retry of the
+        same prompt asks the model again instead of replaying the failure.
+        """
+        if isinstance(result, str):
+            return bool(result)
+        return (isinstance(result, list) and bool(result)
+                and not any(isinstance(item, dict) and set(item) == {"text"} for item in result))
+
     #@track_llm_operation("generate")
     def generate_response(self, prompt: str, retry_with_reduced_tokens: bool = True, request_id = None) -> List[Dict[str, str]]:
+        cache_key = self._cache_key(prompt)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if self.inference_type == "aws_bedrock":
+            result = self._handle_bedrock_request(prompt, retry_with_reduced_tokens, request_id)
+        elif self.inference_type == "CAII":
+            result = self._handle_caii_request(prompt, request_id)
+        else:
+            return None
+
+        if cache_key and self._cacheable(result):
+            self.response_cache.put(cache_key, result)
+        return result
+
+    async def agenerate_response(self, prompt: str, retry_with_reduced_tokens: bool = True, request_id = None) -> List[Dict[str, str]]:
+        """
+        Async variant of generate_response.
+
+        Calls never block the event loop, so callers can fan out with
+        asyncio.gather; the number of calls in flight per model is set by
+        its shared AIMD concurrency controller.
+        """
+        cache_key = self._cache_key(prompt)
+        if cache_key:
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+            if cached is not None:
+                return cached
+
         if self.inference_type == "aws_bedrock":
-            return self._handle_bedrock_request(prompt, retry_with_reduced_tokens)
+            result = await self._ahandle_bedrock_request(prompt, retry_with_reduced_tokens, request_id)
         elif self.inference_type == "CAII":
-            return self._handle_caii_request(prompt)
+            result = await self._ahandle_caii_request(prompt, request_id)
+        else:
+            return None
+
+        if cache_key and self._cacheable(result):
+            await asyncio.to_thread(self.response_cache.put, cache_key, result)
+        return result
+
+    def _build_converse_kwargs(self, prompt: str, max_tokens_cap: int) -> Dict[str, Any]:
+        """Build the converse() arguments shared by the sync and async Bedrock paths"""
+        conversation = [{
+            "role": "user",
+            "content": self._message_content(prompt)
+        }]
+        inference_config = {
+            "maxTokens": min(self.model_params.max_tokens, max_tokens_cap),
+            "temperature": min(self.model_params.temperature, 1.0),
+            "topP": self.model_params.top_p,
+            "stopSequences": ["\n\nHuman:"] if "claude" in self.model_id else [],
+        }
+        kwargs = {
+            "modelId": self.model_id,
+            "messages": conversation,
+            "inferenceConfig": inference_config,
+        }
+        if "claude" in self.model_id:
+            kwargs["additionalModelRequestFields"] = {"top_k": self.model_params.top_k}
+        tool_config = self._tool_config()
+        if tool_config is not None:
+            kwargs["toolConfig"] = tool_config
+        return kwargs
+
+    def _message_content(self, prompt: str) -> List[Dict[str, Any]]:
+        """
+        Converse content blocks for a prompt.
+
+        Prompts built with a static prefix (CacheablePrompt) get a cachePoint
+        after the prefix on models that support prompt caching, once the prefix
+        is long enough for the model to cache it.
+        """
+        prefix = getattr(prompt, "prefix", None)
+        min_tokens = self._prompt_cache_min_tokens()
+        if prefix and min_tokens is not None:
+            suffix = prompt[len(prefix):]
+            if suffix.strip() and self._estimate_input_tokens(prefix) >= min_tokens:
+                return [{"text": prefix}, {"cachePoint": {"type": "default"}}, {"text": suffix}]
+        return [{"text": prompt}]
+
+    def _prompt_cache_min_tokens(self) -> Optional[int]:
+        """Minimum cacheable prefix for this model, or None when prompt caching is unavailable"""
+        if not BEDROCK_PROMPT_CACHING:
+            return None
+        for pattern, min_tokens in PROMPT_CACHE_MIN_TOKENS:
+            if pattern in self.model_id:
+                return min_tokens
+        return None
+
+    def _estimate_input_tokens(self, prompt: str) -> int:
+        return get_token_estimator().estimate(self.model_id, prompt)
+
+    def _plan_max_tokens(self, input_tokens: int) -> int:
+        """maxTokens for the first Bedrock attempt, fitted to the model's output cap and context window"""
+        return get_token_estimator().plan_max_tokens(self.model_id, input_tokens, self.model_params.max_tokens)
+
+    def _settle_usage(self, reserved: int, input_tokens: int, usage: Dict[str, Any]) -> None:
+        """Refund unused rate limit budget and calibrate the estimator from reported usage"""
+        used_input = usage.get("tokens_input")
+        if used_input is None:
+            return
+        get_rate_limiter().refund(self.model_id, reserved - used_input - usage.get("tokens_output", 0))
+        get_token_estimator().observe(self.model_id, input_tokens, used_input)
 
-    def _handle_bedrock_request(self, prompt: str, retry_with_reduced_tokens: bool):
+    @staticmethod
+    def _bedrock_usage(response: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Usage, server-side latency and stop reason of a converse response (or of
+        the merged metadata and messageStop events of a stream), keyed like the
+        llm_operations telemetry columns.
+        """
+        if not isinstance(response, dict):
+            return {}
+        stats = {}
+        usage = response.get("usage")
+        if isinstance(usage, dict) and "inputTokens" in usage:
+            # inputTokens excludes the prompt prefix read from or written to the prompt cache
+            cache_read = usage.get("cacheReadInputTokens", 0)
+            cache_write = usage.get("cacheWriteInputTokens", 0)
+            stats["tokens_input"] = usage["inputTokens"] + cache_read + cache_write
+            stats["tokens_output"] = usage.get("outputTokens", 0)
+            stats["tokens_cache_read"] = cache_read
+            stats["tokens_cache_write"] = cache_write
+        metrics = response.get("metrics")
+        if isinstance(metrics, dict) and "latencyMs" in metrics:
+            stats["server_latency_ms"] = metrics["latencyMs"]
+        if isinstance(response.get("stopReason"), str):
+            stats["stop_reason"] = response["stopReason"]
+        return stats
+
+    @staticmethod
+    def _caii_usage(completion) -> Dict[str, Any]:
+        """Usage and finish reason of a chat completion or stream chunk, keyed like _bedrock_usage"""
+        stats = {}
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+            if isinstance(prompt_tokens, int):
+                stats["tokens_input"] = prompt_tokens
+                stats["tokens_output"] = completion_tokens if isinstance(completion_tokens, int) else 0
+            cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+            if isinstance(cached_tokens, int):
+                stats["tokens_cache_read"] = cached_tokens
+        choices = getattr(completion, "choices", None)
+        if isinstance(choices, list) and choices:
+            finish_reason = getattr(choices[0], "finish_reason", None)
+            if isinstance(finish_reason, str):
+                stats["stop_reason"] = finish_reason
+        return stats
+
+    def _record_operation(self, operation_type: str, request_id, started: float,
+                          usage: Optional[Dict[str, Any]] = None, error: Optional[Exception] = None) -> None:
+        """Record one model call in llm_operations with the provider-reported usage"""
+        telemetry_manager.record_llm_operation(
+            request_id=request_id,
+            model_id=self.model_id,
+            operation_type=operation_type,
+            latency_ms=(time.monotonic() - started) * 1000,
+            success=error is None,
+            error=str(error) if error is not None else None,
+            inference_type=self.inference_type,
+            **(usage or {})
+        )
+
+    def _call_and_record(self, call, operation_type: str, request_id, usage_of):
+        """
+        Run one blocking model call inside a slot of this model's concurrency controller
+        and record it, with usage_of(response) on success; the synchronous counterpart
+        of _acall_with_slot, so both paths share one limit and feed it the same signals
+        """
+        with get_concurrency_controller(self.model_id).sync_slot() as outcome:
+            started = time.monotonic()
+            try:
+                response = call()
+            except Exception as e:
+                if self._is_congestion_error(e):
+                    outcome["value"] = CONGESTION
+                self._record_operation(operation_type, request_id, started, error=e)
+                raise
+            outcome["value"] = SUCCESS
+            self._record_operation(operation_type, request_id, started, usage_of(response))
+            return response
+
+    def _parse_bedrock_response(self, response: Dict[str, Any]):
+        try:
+            content = response["output"]["message"]["content"]
+            for block in content:
+                if "toolUse" in block:
+                    return self._extract_json_from_text(block["toolUse"]["input"])
+            response_text = content[0]["text"]
+            return self._extract_json_from_text(response_text) if not self.custom_p else response_text
+        except KeyError as e:
+            print(f"Unexpected response format: {str(e)}")
+            print(f"Response structure: {response}")
+            raise ModelHandlerError(f"Unexpected response format: {str(e)}", status_code=500)
+
+    def _classify_bedrock_error(self, e: Exception, retries: int, retry_with_reduced_tokens: bool) -> str:
+        """
+        Decide how to recover from a Bedrock error.
+
+        Returns "connection", "validation" or "throttle" when the call should be
+        retried after backoff; raises when the error is final.
+        """
+        error_message = str(e)
+
+        # Check for specific connection errors
+        if "Connection was closed" in error_message or \
+           isinstance(e, EndpointConnectionError) or \
+           "EndpointConnectionError" in error_message or \
+           "Connection reset by peer" in error_message:
+            if retries < self.MAX_RETRIES:
+                print(f"Retry {retries + 1}: Connection error, retrying after backoff...")
+                print(f"Error details: {error_message}")
+                return "connection"
+
+        # Handle other AWS errors
+        if isinstance(e, ClientError):
+            error_code = e.response['Error']['Code']
+
+            if error_code == 'ValidationException':
+                if 'model identifier is invalid' in error_message:
+                    raise InvalidModelError(self.model_id, error_message)
+                elif "on-demand throughput isn’t supported" in error_message:
+                    raise InvalidModelError(self.model_id, error_message)
+
+                if retry_with_reduced_tokens and retries <= 1:
+                    return "validation"
+
+            elif error_code in ['ThrottlingException', 'ServiceUnavailableException']:
+                if retries < self.MAX_RETRIES:
+                    return "throttle"
+
+        raise ModelHandlerError(f"Bedrock API error: {error_message}", status_code=503)
+
+    def _reduced_max_tokens(self, max_tokens: int) -> int:
+        """Token cap to use after a ValidationException despite planning: half the previous one"""
+        reduced = max(max_tokens // 2, 1)
+        print(f"maxTokens {max_tokens} rejected for {self.model_id}, trying with {reduced} tokens")
+        return reduced
+
+    def _raise_exhausted(self, last_exception: Exception):
+        print(f"All {self.MAX_RETRIES} retries exhausted. Final error: {str(last_exception)}")
+        if isinstance(last_exception, (InvalidModelError, ModelHandlerError)):
+            raise last_exception
+        raise ModelHandlerError(f"Failed after {self.MAX_RETRIES} retries: {str(last_exception)}", status_code=500)
+
+    def _handle_bedrock_request(self, prompt: str, retry_with_reduced_tokens: bool, request_id=None):
         """Handle Bedrock requests with retry logic"""
         retries = 0
         last_exception = None
-        new_max_tokens = 8192
+        input_tokens = self._estimate_input_tokens(prompt)
+        new_max_tokens = self._plan_max_tokens(input_tokens)
         while retries <= self.MAX_RETRIES:  # Changed to <= to match AWS behavior
             try:
-                conversation = [{
-                    "role": "user",
-                    "content": [{"text": prompt}]
-                }]
-                additional_model_fields = {"top_k": self.model_params.top_k}
-                
-                if "claude" in self.model_id:
-                    inference_config = {
-                                "maxTokens": min(self.model_params.max_tokens, new_max_tokens),
-                                "temperature": min(self.model_params.temperature, 1.0),
-                                "topP": self.model_params.top_p,
-                                "stopSequences": ["\n\nHuman:"],
-                              
-                             }
-                    response = self.bedrock_client.converse(
-                        modelId=self.model_id,
-                        messages=conversation,
-                        inferenceConfig=inference_config,
-                        additionalModelRequestFields=additional_model_fields
-                    )
-                else:
-                    inference_config = {
-                                "maxTokens": min(self.model_params.max_tokens, new_max_tokens),
-                                "temperature": min(self.model_params.temperature, 1.0),
-                                "topP": self.model_params.top_p,
-                               "stopSequences": []
-                             }
-                    print(inference_config)
-                    response = self.bedrock_client.converse(
-                        modelId=self.model_id,
-                        messages=conversation,
-                        inferenceConfig=inference_config
-                       )
-                
-                try:
-                    response_text = response["output"]["message"]["content"][0]["text"]
-                    #print(response)
-                    return self._extract_json_from_text(response_text) if not self.custom_p else response_text
-                except KeyError as e:
-                    print(f"Unexpected response format: {str(e)}")
-                    print(f"Response structure: {response}")
-                    raise ModelHandlerError(f"Unexpected response format: {str(e)}", status_code=500)
+                converse_kwargs = self._build_converse_kwargs(prompt, new_max_tokens)
+                reserved = input_tokens + converse_kwargs["inferenceConfig"]["maxTokens"]
+                get_rate_limiter().acquire(self.model_id, reserved)
+                response = self._call_and_record(
+                    lambda: self.bedrock_client.converse(**converse_kwargs), "converse", request_id, self._bedrock_usage
+                )
+                self._settle_usage(reserved, input_tokens, self._bedrock_usage(response))
+                return self._parse_bedrock_response(response)
 
             except (ClientError, ConnectionClosedError, EndpointConnectionError, ProtocolError) as e:
-                        error_message = str(e)
-                        
-                        # Check for specific connection errors
-                        if "Connection was closed" in error_message or \
-                           "EndpointConnectionError" in error_message or \
-                           "Connection reset by peer" in error_message:
-                            if retries < self.MAX_RETRIES:
-                                print(f"Retry {retries + 1}: Connection error, retrying after backoff...")
-                                print(f"Error details: {error_message}")
-                                self._exponential_backoff(retries)
-                                retries += 1
-                                
-                                # Create a new client on connection errors
-                                self.bedrock_client = boto3.client(
-                                    service_name="bedrock-runtime",
-                                    config=self.bedrock_client.meta.config
-                                )
-                                continue
-                        
-                        # Handle other AWS errors
-                        if isinstance(e, ClientError):
-                            error_code = e.response['Error']['Code']
-                            
-                            if error_code == 'ValidationException':
-                                if 'model identifier is invalid' in error_message:
-                                    raise InvalidModelError(self.model_id,error_message )
-                                elif "on-demand throughput isn’t supported" in error_message:
-                                    print("Hi")
-                                    raise InvalidModelError(self.model_id, error_message)
-                                
-                                if retry_with_reduced_tokens and retries<1:
-                                    new_max_tokens = 4096
-                                    self._exponential_backoff(retries)
-                                    retries += 1
-                                    continue
-                                if retry_with_reduced_tokens and retries==1 :
-                                    new_max_tokens = 2048
-                                    self._exponential_backoff(retries)
-                                    print("trying with 2040 tokens")
-                                    retries += 1
-                                    continue
-                                    
-                            elif error_code in ['ThrottlingException', 'ServiceUnavailableException']:
-                                if retries < self.MAX_RETRIES:
-                                    self._exponential_backoff(retries)
-                                    retries += 1
-                                    continue
-                        
-                        raise ModelHandlerError(f"Bedrock API error: {error_message}", status_code=503)
+                action = self._classify_bedrock_error(e, retries, retry_with_reduced_tokens)
+                if action == "validation":
+                    # A rejected request is not transient, retry right away
+                    new_max_tokens = self._reduced_max_tokens(new_max_tokens)
+                else:
+                    self._exponential_backoff(retries)
+                retries += 1
+                if action == "connection":
+                    # Create a new client on connection errors
+                    self.bedrock_client = boto3.client(
+                        service_name="bedrock-runtime",
+                        config=self.bedrock_client.meta.config
+                    )
+                continue
 
             except Exception as e:
                 last_exception = e
@@ -272,44 +467,293 @@ class UnifiedModelHandler:
                 break
 
         if last_exception:
-            print(f"All {self.MAX_RETRIES} retries exhausted. Final error: {str(last_exception)}")
-            if isinstance(last_exception, (InvalidModelError, ModelHandlerError)):
-                raise last_exception
-            raise ModelHandlerError(f"Failed after {self.MAX_RETRIES} retries: {str(last_exception)}", status_code=500)
+            self._raise_exhausted(last_exception)
+
+    def _get_async_bedrock_client(self):
+        if self.async_bedrock_client is None:
+            meta = self.bedrock_client.meta
+            self.async_bedrock_client = get_async_bedrock_client(meta.region_name, meta.endpoint_url)
+        return self.async_bedrock_client
+
+    @staticmethod
+    def _is_congestion_error(e: Exception) -> bool:
+        """Throttling and 5xx responses, the signals that should shrink concurrency"""
+        if isinstance(e, ClientError):
+            error_code = e.response.get('Error', {}).get('Code')
+            status_code = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+            return error_code in CONGESTION_ERROR_CODES or status_code == 429 or status_code >= 500
+        status_code = getattr(e, 'status_code', None)
+        return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
+    async def _acall_with_slot(self, call, operation_type: str, request_id, usage_of):
+        """
+        Run one model call inside a slot of this model's concurrency controller
+        and record it, with usage_of(response) on success. Latency excludes the
+        wait for the slot.
+        """
+        async with get_concurrency_controller(self.model_id).slot() as outcome:
+            started = time.monotonic()
+            try:
+                result = await call()
+            except Exception as e:
+                if self._is_congestion_error(e):
+                    outcome["value"] = CONGESTION
+                self._record_operation(operation_type, request_id, started, error=e)
+                raise
+            outcome["value"] = SUCCESS
+            self._record_operation(operation_type, request_id, started, usage_of(result))
+            return result
+
+    async def _ahandle_bedrock_request(self, prompt: str, retry_with_reduced_tokens: bool, request_id=None):
+        """Handle Bedrock requests with retry logic without blocking the event loop"""
+        retries = 0
+        last_exception = None
+        input_tokens = self._estimate_input_tokens(prompt)
+        new_max_tokens = self._plan_max_tokens(input_tokens)
+        while retries <= self.MAX_RETRIES:
+            try:
+                converse_kwargs = self._build_converse_kwargs(prompt, new_max_tokens)
+                reserved = input_tokens + converse_kwargs["inferenceConfig"]["maxTokens"]
+                await get_rate_limiter().aacquire(self.model_id, reserved)
+                response = await self._acall_with_slot(
+                    lambda: self._get_async_bedrock_client().converse(**converse_kwargs),
+                    "converse", request_id, self._bedrock_usage
+                )
+                self._settle_usage(reserved, input_tokens, self._bedrock_usage(response))
+                return self._parse_bedrock_response(response)
+
+            except (ClientError, ConnectionClosedError, EndpointConnectionError, ProtocolError) as e:
+                action = self._classify_bedrock_error(e, retries, retry_with_reduced_tokens)
+                if action == "validation":
+                    # A rejected request is not transient, retry right away
+                    new_max_tokens = self._reduced_max_tokens(new_max_tokens)
+                else:
+                    # Broken connections are dropped by the pool, no need to rebuild the client
+                    await self._aexponential_backoff(retries)
+                retries += 1
+                continue
+
+            except Exception as e:
+                last_exception = e
+                if retries < self.MAX_RETRIES:
+                    print(f"Retry {retries + 1}: Unexpected error, retrying after backoff...")
+                    print(f"Error details: {str(e)}")
+                    await self._aexponential_backoff(retries)
+                    retries += 1
+                    continue
+                break
+
+        if last_exception:
+            self._raise_exhausted(last_exception)
 
+    def _caii_completion_kwargs(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model_id,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.model_params.temperature,
+            "top_p": self.model_params.top_p,
+            "max_tokens": self.model_params.max_tokens,
+            "stream": False,
+            **({"response_format": {"type": "json_schema",
+                                    "json_schema": {"name": STRUCTURED_OUTPUT_TOOL_NAME, "schema": self._items_schema()}}}
+               if self.output_schema is not None else {}),
+        }
 
-    def _handle_caii_request(self, prompt: str):
+    def _handle_caii_request(self, prompt: str, request_id=None):
         """Original CAII implementation"""
         try:
             #API_KEY = json.load(open("/tmp/jwt"))["access_token"]
             API_KEY = _get_caii_token()
-            MODEL_ID = self.model_id
-            caii_endpoint = self.caii_endpoint
-            
-            caii_endpoint = caii_endpoint.removesuffix('/chat/completions')
-            client_ca = OpenAI(
-                base_url=caii_endpoint,
-                api_key=API_KEY,
+            client_ca = get_caii_client(self.caii_endpoint, API_KEY)
+
+            input_tokens = self._estimate_input_tokens(prompt)
+            reserved = input_tokens + self.model_params.max_tokens
+            get_rate_limiter().acquire(self.model_id, reserved)
+            completion = self._call_and_record(
+                lambda: client_ca.chat.completions.create(**self._caii_completion_kwargs(prompt)),
+                "chat_completion", request_id, self._caii_usage
             )
+            self._settle_usage(reserved, input_tokens, self._caii_usage(completion))
+
+            print("generated via CAII")
+            response_text = completion.choices[0].message.content
+
+            return self._extract_json_from_text(response_text) if not self.custom_p else response_text
+
+        except Exception as e:
+            raise ModelHandlerError(f"CAII request failed: {str(e)}", status_code=500)
 
-            completion = client_ca.chat.completions.create(
-                model=MODEL_ID,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=self.model_params.temperature,
-                top_p=self.model_params.top_p,
-                max_tokens=self.model_params.max_tokens,
-                stream=False
+    async def _ahandle_caii_request(self, prompt: str, request_id=None):
+        """CAII request over the async OpenAI client"""
+        try:
+            API_KEY = _get_caii_token()
+            client_ca = get_async_caii_client(self.caii_endpoint, API_KEY)
+
+            input_tokens = self._estimate_input_tokens(prompt)
+            reserved = input_tokens + self.model_params.max_tokens
+            await get_rate_limiter().aacquire(self.model_id, reserved)
+            completion = await self._acall_with_slot(
+                lambda: client_ca.chat.completions.create(**self._caii_completion_kwargs(prompt)),
+                "chat_completion", request_id, self._caii_usage
             )
+            self._settle_usage(reserved, input_tokens, self._caii_usage(completion))
 
             print("generated via CAII")
             response_text = completion.choices[0].message.content
-            
+
             return self._extract_json_from_text(response_text) if not self.custom_p else response_text
-            
+
+        except Exception as e:
+            raise ModelHandlerError(f"CAII request failed: {str(e)}", status_code=500)
+
+    async def astream_response(self, prompt: str, retry_with_reduced_tokens: bool = True, request_id = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the items of a JSON-array response as they are generated.
+
+        Each object is yielded as soon as its closing brace arrives (Bedrock
+        converse_stream / CAII stream=True). If no object could be parsed
+        incrementally, the full text goes through _extract_json_from_text at
+        the end, so the items match what agenerate_response would return.
+        Raw-text (custom_p) handlers are not streamed.
+        """
+        cache_key = self._cache_key(prompt)
+        cached = await asyncio.to_thread(self.response_cache.get, cache_key) if cache_key else None
+        if cached is not None or self.custom_p:
+            result = cached if cached is not None else await self.agenerate_response(prompt, retry_with_reduced_tokens, request_id)
+            for item in (result if isinstance(result, list) else [result]):
+                yield item
+            return
+
+        if self.inference_type == "aws_bedrock":
+            stream = self._astream_bedrock_request(prompt, retry_with_reduced_tokens, request_id)
+        elif self.inference_type == "CAII":
+            stream = self._astream_caii_request(prompt, request_id)
+        else:
+            return
+
+        items = []
+        async for item in stream:
+            items.append(item)
+            yield item
+
+        if cache_key and self._cacheable(items):
+            await asyncio.to_thread(self.response_cache.put, cache_key, items)
+
+    async def _astream_bedrock_request(self, prompt: str, retry_with_reduced_tokens: bool, request_id=None) -> AsyncIterator[Dict[str, Any]]:
+        """Bedrock converse_stream with the same retry policy, as long as nothing was yielded yet"""
+        retries = 0
+        last_exception = None
+        input_tokens = self._estimate_input_tokens(prompt)
+        new_max_tokens = self._plan_max_tokens(input_tokens)
+        while retries <= self.MAX_RETRIES:
+            parser = JsonArrayStreamParser()
+            emitted = 0
+            try:
+                converse_kwargs = self._build_converse_kwargs(prompt, new_max_tokens)
+                reserved = input_tokens + converse_kwargs["inferenceConfig"]["maxTokens"]
+                # metadata (usage, metrics) and messageStop (stopReason) events merged
+                summary = {}
+                await get_rate_limiter().aacquire(self.model_id, reserved)
+                async with get_concurrency_controller(self.model_id).slot() as outcome:
+                    started = time.monotonic()
+                    try:
+                        async for event in self._get_async_bedrock_client().converse_stream(**converse_kwargs):
+                            if "contentBlockDelta" in event:
+                                delta = event["contentBlockDelta"].get("delta", {})
+                                # Structured output arrives as tool input JSON: {"items": [...]}
+                                text = delta.get("text") or delta.get("toolUse", {}).get("input")
+                                for item in parser.feed(text or ""):
+                                    emitted += 1
+                                    yield item
+                            elif "messageStop" in event:
+                                summary["stopReason"] = event["messageStop"].get("stopReason")
+                            elif "metadata" in event:
+                                summary.update(event["metadata"])
+                    except Exception as e:
+                        if self._is_congestion_error(e):
+                            outcome["value"] = CONGESTION
+                        self._record_operation("converse_stream", request_id, started, error=e)
+                        raise
+                    outcome["value"] = SUCCESS
+                usage = self._bedrock_usage(summary)
+                self._record_operation("converse_stream", request_id, started, usage)
+                self._settle_usage(reserved, input_tokens, usage)
+
+                if emitted == 0:
+                    for item in self._extract_json_from_text(parser.full_text):
+                        yield item
+                return
+
+            except (ClientError, ConnectionClosedError, EndpointConnectionError, ProtocolError) as e:
+                if emitted:
+                    raise ModelHandlerError(f"Bedrock stream interrupted after {emitted} items: {str(e)}", status_code=503)
+                action = self._classify_bedrock_error(e, retries, retry_with_reduced_tokens)
+                if action == "validation":
+                    new_max_tokens = self._reduced_max_tokens(new_max_tokens)
+                else:
+                    await self._aexponential_backoff(retries)
+                retries += 1
+                continue
+
+            except Exception as e:
+                if emitted:
+                    raise
+                last_exception = e
+                if retries < self.MAX_RETRIES:
+                    print(f"Retry {retries + 1}: Unexpected error, retrying after backoff...")
+                    print(f"Error details: {str(e)}")
+                    await self._aexponential_backoff(retries)
+                    retries += 1
+                    continue
+                break
+
+        if last_exception:
+            self._raise_exhausted(last_exception)
+
+    async def _astream_caii_request(self, prompt: str, request_id=None) -> AsyncIterator[Dict[str, Any]]:
+        """CAII chat completion with stream=True"""
+        parser = JsonArrayStreamParser()
+        emitted = 0
+        try:
+            API_KEY = _get_caii_token()
+            client_ca = get_async_caii_client(self.caii_endpoint, API_KEY)
+
+            input_tokens = self._estimate_input_tokens(prompt)
+            reserved = input_tokens + self.model_params.max_tokens
+            # finish_reason and usage arrive on different chunks
+            usage = {}
+            await get_rate_limiter().aacquire(self.model_id, reserved)
+            async with get_concurrency_controller(self.model_id).slot() as outcome:
+                started = time.monotonic()
+                try:
+                    stream = await client_ca.chat.completions.create(
+                        **{**self._caii_completion_kwargs(prompt), "stream": True}
+                    )
+                    async for chunk in stream:
+                        usage.update(self._caii_usage(chunk))
+                        if not chunk.choices:
+                            continue
+                        for item in parser.feed(chunk.choices[0].delta.content or ""):
+                            emitted += 1
+                            yield item
+                except Exception as e:
+                    if self._is_congestion_error(e):
+                        outcome["value"] = CONGESTION
+                    self._record_operation("chat_completion_stream", request_id, started, error=e)
+                    raise
+                outcome["value"] = SUCCESS
+            self._record_operation("chat_completion_stream", request_id, started, usage)
+            self._settle_usage(reserved, input_tokens, usage)
+
+            if emitted == 0:
+                for item in self._extract_json_from_text(parser.full_text):
+                    yield item
+
         except Exception as e:
             raise ModelHandlerError(f"CAII request failed: {str(e)}", status_code=500)
 
-def create_handler(model_id: str, bedrock_client=None, model_params: Optional[ModelParameters] = None, inference_type:Optional[str] = "aws_bedrock", caii_endpoint:Optional[str]=None, custom_p = False) -> UnifiedModelHandler:
+
+def create_handler(model_id: str, bedrock_client=None, model_params: Optional[ModelParameters] = None, inference_type:Optional[str] = "aws_bedrock", caii_endpoint:Optional[str]=None, custom_p = False, async_bedrock_client=None, use_cache: Optional[bool] = None, output_schema: Optional[Dict[str, Any]] = None) -> UnifiedModelHandler:
     """
     Factory function to create model handler
     
@@ -317,8 +761,15 @@ def create_handler(model_id: str, bedrock_client=None, model_params: Optional[Mo
         model_id: The ID of the model to use
         bedrock_client: Optional pre-configured Bedrock client
         model_params: Optional model parameters
+        inference_type: "aws_bedrock" or "CAII"
+        caii_endpoint: Endpoint URL of the CAII model, for inference_type "CAII"
+        custom_p: Return the raw response text instead of parsing it as JSON
+        async_bedrock_client: Optional client exposing an async converse(), used by agenerate_response
+        use_cache: Cache responses on disk; defaults to on for temperature 0 only
+        output_schema: JSON schema of one output item; when set the model is asked for
+            structured output (Bedrock tool use, CAII response_format) where supported
         
     Returns:
         UnifiedModelHandler instance
     """
-    return UnifiedModelHandler(model_id, bedrock_client, model_params, inference_type, caii_endpoint, custom_p)
\ No newline at end of file
+    return UnifiedModelHandler(model_id, bedrock_client, model_params, inference_type, caii_endpoint, custom_p, async_bedrock_client, use_cache, output_schema)
\ No newline at end of file
@@ -0,0 +1,140 @@
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import PROGRESS_DIR, PROGRESS_FLUSH_INTERVAL_SECONDS
+from app.core.telemetry import telemetry_manager
+
+
+def _progress_path(job_name: str, directory: Optional[str] = None) -> Path:
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", job_name)
+    return Path(directory or PROGRESS_DIR) / f"{safe_name}.json"
+
+
+class JobProgress:
+    """
+    Live progress counters of one CML job, published to a small JSON file.
+
+    Engines bump in-memory counters as work units finish; the file is rewritten
+    (atomically) at most every flush_interval seconds, so progress adds no
+    database writes to the hot path and a poll of /jobs/{job_id}/progress only
+    reads one file. Token totals come from the telemetry manager's running
+    counters for the job's request_id.
+    """
+
+    def __init__(self, job_name: str, job_type: str, request_id: Optional[str] = None,
+                 directory: Optional[str] = None, flush_interval: float = PROGRESS_FLUSH_INTERVAL_SECONDS):
+        self.job_name = job_name
+        self.job_type = job_type
+        self.request_id = request_id
+        self.path = _progress_path(job_name, directory)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.status = "running"
+        self.units_total = 0
+        self.units_done = 0
+        self.items_total: Optional[int] = None
+        self.valid_items = 0
+        self.fallback_calls = 0
+        self._resumed_units = 0
+        self._resumed_items = 0
+        self._started = time.monotonic()
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        if request_id:
+            telemetry_manager.track_request_tokens(request_id)
+
+    def set_total(self, units: int, items: Optional[int] = None):
+        with self._lock:
+            self.units_total = units
+            self.items_total = items
+        self.flush()
+
+    def add_units(self, units: int = 1):
+        """Grow the total when a unit spawns more work, like a re-batch of missing items"""
+        with self._lock:
+            self.units_total += units
+
+    def resumed(self, units: int, items: int):
+        """Count work replayed from a checkpoint as done, without crediting it to throughput"""
+        with self._lock:
+            self.units_done += units
+            self.valid_items += items
+            self._resumed_units += units
+            self._resumed_items += items
+
+    def unit_done(self, valid_items: int = 0, fallback: bool = False):
+        with self._lock:
+            self.units_done += 1
+            self.valid_items += valid_items
+            if fallback:
+                self.fallback_calls += 1
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            items_per_second = (self.valid_items - self._resumed_items) / elapsed if elapsed > 0 else 0.0
+            units_per_second = (self.units_done - self._resumed_units) / elapsed if elapsed > 0 else 0.0
+            if self.status != "running":
+                eta_seconds = 0.0
+            elif self.items_total is not None and items_per_second > 0:
+                eta_seconds = max(0, self.items_total - self.valid_items) / items_per_second
+            elif units_per_second > 0:
+                eta_seconds = max(0, self.units_total - self.units_done) / units_per_second
+            else:
+                eta_seconds = None
+            snapshot = {
+                "job_name": self.job_name,
+                "job_type": self.job_type,
+                "status": self.status,
+                "units_done": self.units_done,
+                "units_total": self.units_total,
+                "valid_items": self.valid_items,
+                "items_total": self.items_total,
+                "fallback_calls": self.fallback_calls,
+                "elapsed_seconds": round(elapsed, 1),
+                "items_per_second": round(items_per_second, 3),
+                "eta_seconds": round(eta_seconds, 1) if eta_seconds is not None else None,
+                "started_at": self._started_at,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+        tokens = telemetry_manager.get_request_token_totals(self.request_id) if self.request_id else {
+            "tokens_input": 0, "tokens_output": 0}
+        snapshot.update(tokens)
+        snapshot["tokens_per_second"] = round(
+            (tokens["tokens_input"] + tokens["tokens_output"]) / elapsed, 1) if elapsed > 0 else 0.0
+        return snapshot
+
+    def flush(self):
+        """Write the current snapshot, replacing the file so readers never see a partial one"""
+        snapshot = self.snapshot()
+        with self._lock:
+            self._last_flush = time.monotonic()
+            tmp_path = str(self.path) + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+
+    def finish(self, status: str = "completed"):
+        self.status = status
+        self.flush()
+        if self.request_id:
+            telemetry_manager.untrack_request_tokens(self.request_id)
+
+
+def read_progress(job_name: str, directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """The last progress snapshot a job published, or None if it has not published one"""
+    try:
+        with open(_progress_path(job_name, directory)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
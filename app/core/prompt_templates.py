@@ -128,6 +128,22 @@ Points are accumulated based on the satisfaction of each criterion:
 
 
 
+class CacheablePrompt(str):
+    """
+    Prompt text made of a static prefix and a per-call suffix.
+
+    Behaves as the plain concatenated string everywhere; `prefix` is the part
+    that is byte-identical across calls (instructions, schema, examples), so
+    model handlers can mark it for provider-side prompt caching.
+    """
+    prefix: str
+
+    def __new__(cls, prefix: str, suffix: str):
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        return prompt
+
+
 class PromptHandler:
     """Handles prompt generation for different model families and use cases"""
 
@@ -423,54 +439,51 @@ class ModelPrompts:
                 - No text or comments outside the JSON array
 
                 Return ONLY the JSON array."""
-        json_prompt = omit_prompt +  '\n' +  json_instruction
 
+        # Everything up to the topic is identical for every batch of every topic
+        # and stays in the cacheable prefix; topic, count and omit list follow it
+        task_prompt = ""
         if use_case == UseCase.CODE_GENERATION:
-            base_prompt += f"""Create {num_questions} programming question-solution pairs about the following topic:
+            task_prompt = f"""Create {num_questions} programming question-solution pairs about the following topic:
                         <topic>{topic}</topic>"""
 
-            
         elif use_case == UseCase.TEXT2SQL:
             base_prompt += f"""Using this database schema:
                             {schema_str}
-
-                            Create {num_questions} natural language to SQL query pairs about the following topic:
+                            """
+            task_prompt = f"""Create {num_questions} natural language to SQL query pairs about the following topic:
                             <topic>{topic}</topic>"""
 
         elif use_case == UseCase.CUSTOM:
-            base_prompt+= f"""Create {num_questions} question-solution pairs about the following topic:
-                        <topic>{topic}</topic>""" 
-            
-        model_family = get_model_family(model_id)
-        
-        if model_family== ModelFamily.LLAMA:
-            
-            final_prompt = "<|begin_of_text|><|start_header_id|>user<|end_header_id|>" + '\n'  + base_prompt + '\n' + custom_prompt_str + '\n' + json_prompt + '\n' + "<|eot_id|><|start_header_id|>assistant<|end_header_id|>"
+            task_prompt = f"""Create {num_questions} question-solution pairs about the following topic:
+                        <topic>{topic}</topic>"""
 
-        elif model_family== ModelFamily.MISTRAL:
-            system_prompt = "[INST]"
-            final_prompt = system_prompt +  "\n" + base_prompt + '\n' + custom_prompt_str +  '\n'  + json_prompt + '\n'+ '[/INST]'
+        prefix = base_prompt + '\n' + custom_prompt_str + '\n' + json_instruction
+        suffix = omit_prompt + '\n' + task_prompt
+        return ModelPrompts._wrap_cacheable(model_id, prefix, suffix)
 
-        elif model_family == ModelFamily.CLAUDE:
-            final_prompt = base_prompt + '\n' + custom_prompt_str + "\n" + json_prompt 
-        elif model_family== ModelFamily.QWEN:
+    @staticmethod
+    def _wrap_cacheable(model_id: str, prefix: str, suffix: str) -> CacheablePrompt:
+        """Apply the model family's chat template around a prefix/suffix prompt"""
+        model_family = get_model_family(model_id)
+
+        if model_family == ModelFamily.LLAMA:
+            head = "<|begin_of_text|><|start_header_id|>user<|end_header_id|>" + '\n'
+            tail = '\n' + "<|eot_id|><|start_header_id|>assistant<|end_header_id|>"
+        elif model_family == ModelFamily.MISTRAL:
+            head = "[INST]" + '\n'
+            tail = '\n' + '[/INST]'
+        elif model_family == ModelFamily.QWEN:
             system_prompt = "You are Qwen, created by Alibaba Cloud. You are a helpful assistant."
-            
-            final_prompt = f'''<|im_start|>system
-                                {system_prompt}<|im_end|>
-                                <|im_start|>user
-                                {base_prompt}
-                                {custom_prompt_str}
-                                {json_prompt}<|im_end|>
-                                <|im_start|>assistant
-                                '''
-            
+            head = f"<|im_start|>system\n{system_prompt}<|im_end|>\n<|im_start|>user\n"
+            tail = "<|im_end|>\n<|im_start|>assistant\n"
         else:
-            final_prompt = base_prompt + '\n' + custom_prompt_str + "\n" + json_prompt 
-        
-        return final_prompt
+            head = ""
+            tail = ""
+
+        return CacheablePrompt(head + prefix, '\n' + suffix + tail)
+
 
-    
     @staticmethod
     def get_eval_prompt(model_id: str,
         use_case: UseCase,
@@ -585,6 +598,69 @@ class ModelPrompts:
         return final_prompt
     
 
+    @staticmethod
+    def _batch_eval_instruction(examples_str: str) -> str:
+        return f"""You are given several items, each introduced by its id. Evaluate every item on its own.
+            Provide your evaluations in a JSON array format following these requirements:
+            1. The response MUST be a valid JSON array with exactly one object per item
+            2. Each object MUST have exactly three fields:
+            - "id": the id of the item, copied exactly
+            - "score": a number based on the requirements explained above.
+            - "justification": a string explaining the score
+
+            3. Ensure all quotes are double quotes (")
+            4. No comments or additional text outside the JSON array
+            5. All strings must be properly escaped
+            6. Apart from the "id" field, follow the structure of the example below.
+            Example format:
+            {examples_str}"""
+
+    @staticmethod
+    def get_batch_eval_prompt(model_id: str,
+        use_case: UseCase,
+        pairs: List[Dict[str, str]],
+        examples: List[Example_eval],
+        custom_prompt = Optional[str]
+    ) -> CacheablePrompt:
+        """
+        Evaluation prompt for several QA pairs, each a dict of id, question and solution.
+        The rubric and examples form the cacheable prefix; only the pairs differ per call.
+        """
+        custom_prompt_str = PromptHandler.get_default_custom_eval_prompt(use_case, custom_prompt)
+        examples_str = PromptHandler.get_default_eval_example(use_case, examples)
+
+        base_prompt = """ You are a brilliant judge on evaluating quality of question and answer pairs.
+          Follow the given instructions below to evaluate each given question and answer pair."""
+        items_str = "\n\n".join(
+            f"""<item id="{pair['id']}">
+            Question: {pair['question']}
+            Solution: {pair['solution']}
+            </item>""" for pair in pairs)
+
+        prefix = base_prompt + '\n' + custom_prompt_str + '\n' + ModelPrompts._batch_eval_instruction(examples_str)
+        return ModelPrompts._wrap_cacheable(model_id, prefix, items_str)
+
+    @staticmethod
+    def get_freeform_batch_eval_prompt(model_id: str,
+        use_case: UseCase,
+        rows: List[Dict[str, Any]],
+        examples: List[Example_eval],
+        custom_prompt = Optional[str]
+    ) -> CacheablePrompt:
+        """Evaluation prompt for several data rows, each a dict of id and row"""
+        custom_prompt_str = PromptHandler.get_default_custom_eval_prompt(use_case, custom_prompt)
+        examples_str = PromptHandler.get_default_eval_example(use_case, examples)
+
+        base_prompt = """ You are a brilliant judge on evaluating a set of data with fields and corresponding values
+          Follow the given instructions to understand the structure of given data and evaluate each data row based on parameters defined for you."""
+        items_str = "\n\n".join(
+            f"""<item id="{row['id']}">
+            data row: {row['row']}
+            </item>""" for row in rows)
+
+        prefix = base_prompt + '\n' + custom_prompt_str + '\n' + ModelPrompts._batch_eval_instruction(examples_str)
+        return ModelPrompts._wrap_cacheable(model_id, prefix, items_str)
+
     # @staticmethod
     # def create_custom_prompt(model_id: str,
     #     custom_prompt:str,
@@ -1061,43 +1137,15 @@ class ModelPrompts:
 
                     Return ONLY the JSON array."""
 
-        json_prompt = omit_prompt +  '\n' +  json_instruction
-
-       
-        base_prompt += f"""Create {num_questions} set of data about the following topic:
+        # Instructions, schema and examples are the same for every batch of every
+        # topic and stay in the cacheable prefix; topic, count and omit list follow it
+        task_prompt = f"""Create {num_questions} set of data about the following topic:
                         <topic>{topic}</topic>
-                        based on the instructions provided below """
+                        based on the instructions provided above """
 
-        
-            
-        model_family = get_model_family(model_id)
-        
-        if model_family== ModelFamily.LLAMA:
-            
-            final_prompt = "<|begin_of_text|><|start_header_id|>user<|end_header_id|>" + '\n'  + base_prompt + '\n' + custom_prompt_str + '\n' + json_prompt + '\n' + "<|eot_id|><|start_header_id|>assistant<|end_header_id|>"
-
-        elif model_family== ModelFamily.MISTRAL:
-            system_prompt = "[INST]"
-            final_prompt = system_prompt +  "\n" + base_prompt + '\n' + custom_prompt_str +  '\n'  + json_prompt + '\n'+ '[/INST]'
-
-        elif model_family == ModelFamily.CLAUDE:
-            final_prompt = base_prompt + '\n' + custom_prompt_str + "\n" + json_prompt 
-        elif model_family== ModelFamily.QWEN:
-            system_prompt = "You are Qwen, created by Alibaba Cloud. You are a helpful assistant."
-            
-            final_prompt = f'''<|im_start|>system
-                                {system_prompt}<|im_end|>
-                                <|im_start|>user
-                                {base_prompt}
-                                {custom_prompt_str}
-                                {json_prompt}<|im_end|>
-                                <|im_start|>assistant
-                                '''
-            
-        else:
-            final_prompt = base_prompt + '\n' + custom_prompt_str + "\n" + json_prompt 
-        
-        return final_prompt
+        prefix = base_prompt + '\n' + custom_prompt_str + '\n' + json_instruction
+        suffix = omit_prompt + '\n' + task_prompt
+        return ModelPrompts._wrap_cacheable(model_id, prefix, suffix)
 
 
 
@@ -1131,6 +1179,16 @@ class PromptBuilder:
         
         return ModelPrompts.get_eval_prompt(model_id, use_case,  question, solution, examples,custom_prompt)
     
+    @staticmethod
+    def build_batch_eval_prompt(model_id: str,
+        use_case: UseCase,
+        pairs: List[Dict[str, str]],
+        examples: List[Example_eval],
+        custom_prompt = Optional[str]
+    ) -> str:
+
+        return ModelPrompts.get_batch_eval_prompt(model_id, use_case, pairs, examples, custom_prompt)
+
     @staticmethod
     def build_generate_result_prompt(model_id: str,
         use_case: UseCase,
@@ -1173,4 +1231,14 @@ class PromptBuilder:
         custom_prompt = Optional[str]
     ) -> str:
         
-        return ModelPrompts.get_freeform_eval_prompt(model_id,use_case, row, examples, custom_prompt)
\ No newline at end of file
+        return ModelPrompts.get_freeform_eval_prompt(model_id,use_case, row, examples, custom_prompt)
+    
+    @staticmethod
+    def build_freeform_batch_eval_prompt(model_id: str,
+        use_case: UseCase,
+        rows: List[Dict[str, Any]],
+        examples: List[Example_eval],
+        custom_prompt = Optional[str]
+    ) -> str:
+
+        return ModelPrompts.get_freeform_batch_eval_prompt(model_id, use_case, rows, examples, custom_prompt)
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.core.config import RATE_LIMITS, RATE_LIMIT_DB_PATH
+
+logger = logging.getLogger("rate_limiter")
+
+REQUESTS = "requests"
+TOKENS = "tokens"
+
+
+class SharedRateLimiter:
+    """
+    Token-bucket rate limiter whose buckets live in a SQLite file.
+
+    Every process on the host (API server, CML generation and evaluation jobs)
+    opens the same file, and each refill-and-take runs inside a BEGIN IMMEDIATE
+    transaction, so the per-model requests/min and tokens/min budgets are
+    shared rather than enforced separately by each process.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, limits: Optional[Dict[str, Dict[str, int]]] = None):
+        self.db_path = db_path or RATE_LIMIT_DB_PATH
+        self.limits = RATE_LIMITS if limits is None else limits
+        self._init_db()
+
+    def _init_db(self):
+        with self._get_db_connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS buckets (
+                model_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                level REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (model_id, kind)
+            )
+            ''')
+            conn.commit()
+
+    @contextmanager
+    def _get_db_connection(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get_limits(self, model_id: str) -> Tuple[int, int]:
+        """(requests_per_minute, tokens_per_minute) for a model; 0 means unlimited"""
+        model_limits = self.limits.get(model_id) or self.limits.get("default") or {}
+        return (int(model_limits.get("requests_per_minute", 0) or 0),
+                int(model_limits.get("tokens_per_minute", 0) or 0))
+
+    def is_limited(self, model_id: str) -> bool:
+        return any(self.get_limits(model_id))
+
+    def _take(self, model_id: str, tokens: int) -> float:
+        """
+        Refill the model's buckets and take one request plus `tokens`.
+
+        Returns 0 when the budget was granted, otherwise the number of seconds
+        to wait before trying again (nothing is taken in that case).
+        """
+        rpm, tpm = self.get_limits(model_id)
+        wanted = {kind: (amount, per_minute) for kind, amount, per_minute in
+                  ((REQUESTS, 1, rpm), (TOKENS, tokens, tpm)) if per_minute > 0}
+        if not wanted:
+            return 0.0
+
+        now = time.time()
+        with self._get_db_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = {}
+                wait = 0.0
+                for kind, (amount, per_minute) in wanted.items():
+                    row = conn.execute(
+                        "SELECT level, updated_at FROM buckets WHERE model_id = ? AND kind = ?",
+                        (model_id, kind)
+                    ).fetchone()
+                    level, updated_at = row if row else (float(per_minute), now)
+                    level = min(float(per_minute), level + (now - updated_at) * per_minute / 60.0)
+                    # Requests larger than a whole minute of budget would wait forever
+                    amount = min(amount, per_minute)
+                    levels[kind] = (level, amount)
+                    if level < amount:
+                        wait = max(wait, (amount - level) * 60.0 / per_minute)
+
+                for kind, (level, amount) in levels.items():
+                    new_level = level - amount if wait == 0 else level
+                    conn.execute(
+                        "INSERT OR REPLACE INTO buckets (model_id, kind, level, updated_at) VALUES (?, ?, ?, ?)",
+                        (model_id, kind, new_level, now)
+                    )
+                conn.execute("COMMIT")
+                return wait
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def refund(self, model_id: str, tokens: int) -> None:
+        """Return over-reserved tokens once the actual usage is known"""
+        _, tpm = self.get_limits(model_id)
+        if tpm <= 0 or tokens <= 0:
+            return
+        try:
+            with self._get_db_connection() as conn:
+                conn.execute(
+                    "UPDATE buckets SET level = MIN(?, level + ?) WHERE model_id = ? AND kind = ?",
+                    (float(tpm), float(tokens), model_id, TOKENS)
+                )
+        except Exception as e:
+            logger.error(f"Rate limiter refund failed: {str(e)}")
+
+    def acquire(self, model_id: str, tokens: int) -> None:
+        """Block until the model's budget allows one request of `tokens` tokens"""
+        if not self.is_limited(model_id):
+            return
+        while True:
+            try:
+                wait = self._take(model_id, tokens)
+            except Exception as e:
+                logger.error(f"Rate limiter unavailable, not limiting: {str(e)}")
+                return
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, model_id: str, tokens: int) -> None:
+        """Async variant of acquire(); SQLite work runs off the event loop"""
+        if not self.is_limited(model_id):
+            return
+        while True:
+            try:
+                wait = await asyncio.to_thread(self._take, model_id, tokens)
+            except Exception as e:
+                logger.error(f"Rate limiter unavailable, not limiting: {str(e)}")
+                return
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+_rate_limiter: Optional[SharedRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> SharedRateLimiter:
+    """Return the process-wide rate limiter"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = SharedRateLimiter()
+        return _rate_limiter
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import RESPONSE_CACHE_MODE, RESPONSE_CACHE_MAX_MB, RESPONSE_CACHE_DB_PATH
+from app.models.request_models import ModelParameters
+
+logger = logging.getLogger("response_cache")
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of model responses stored in SQLite.
+
+    Entries are keyed by a hash of everything that determines the model output
+    and evicted least-recently-used once the stored payload exceeds max_bytes.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.db_path = db_path or RESPONSE_CACHE_DB_PATH
+        self.max_bytes = max_bytes if max_bytes is not None else RESPONSE_CACHE_MAX_MB * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._write_lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        with self._get_db_connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+            conn.commit()
+
+    @contextmanager
+    def _get_db_connection(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model_id: str, inference_type: str, prompt: str,
+                 model_params: ModelParameters, **extra: Any) -> str:
+        """Hash of every input that determines the model output"""
+        payload = {
+            "model_id": model_id,
+            "inference_type": inference_type,
+            "prompt": prompt,
+            "model_params": model_params.model_dump(),
+            **extra,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with self._get_db_connection() as conn:
+                row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+        except Exception as e:
+            logger.error(f"Response cache read failed: {str(e)}")
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: Any) -> None:
+        try:
+            value = json.dumps(response)
+            now = time.time()
+            with self._write_lock, self._get_db_connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), now, now)
+                )
+                self._evict(conn)
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Response cache write failed: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            doomed.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def clear(self) -> None:
+        with self._write_lock, self._get_db_connection() as conn:
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._get_db_connection() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "mode": RESPONSE_CACHE_MODE,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+
+def response_cache_enabled(model_params: ModelParameters) -> bool:
+    """
+    Whether responses for these parameters should be cached.
+
+    In the default "auto" mode only deterministic (temperature 0) calls are
+    cached; "on" and "off" force the cache regardless of temperature.
+    """
+    if RESPONSE_CACHE_MODE == "off":
+        return False
+    if RESPONSE_CACHE_MODE == "on":
+        return True
+    return model_params.temperature == 0
@@ -0,0 +1,218 @@
+import json
+import os
+import re
+import textwrap
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from app.core.config import RESULT_FSYNC_EVERY_ITEMS, RESULT_FSYNC_INTERVAL_SECONDS
+
+
+class JsonlResultWriter:
+    """
+    Append-only JSONL file that generation workers feed as items validate.
+
+    Lines go to `<path>.part`. Each write is flushed, and the file is fsynced
+    every fsync_every items or fsync_interval seconds, so a crash loses at most
+    the unsynced tail. finalize() fsyncs and atomically renames the file to
+    `path`. If the job fails, close() leaves the .part file in place.
+    """
+
+    def __init__(self, path: str, transform: Optional[Callable[[Dict], Dict]] = None,
+                 fsync_every: int = RESULT_FSYNC_EVERY_ITEMS,
+                 fsync_interval: float = RESULT_FSYNC_INTERVAL_SECONDS):
+        self.path = str(path)
+        self.part_path = self.path + ".part"
+        self.transform = transform
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        # Always start a fresh .part: a resumed job replays its checkpointed
+        # outputs rather than trusting a tail that may not be checkpointed
+        self._file = open(self.part_path, "w", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._pending: Dict[int, Dict] = {}
+        self._next_index = 0
+        self._lock = threading.Lock()
+
+    def write(self, item: Dict):
+        with self._lock:
+            self._write_line(item)
+            self._file.flush()
+            self._maybe_sync()
+
+    def write_many(self, items: Iterable[Dict]):
+        with self._lock:
+            for item in items:
+                self._write_line(item)
+            self._file.flush()
+            self._maybe_sync()
+
+    def write_at(self, index: int, item: Dict):
+        """
+        Write the item for position `index` of an ordered job, holding items that
+        complete early until every item before them is written
+        """
+        with self._lock:
+            self._pending[index] = item
+            while self._next_index in self._pending:
+                self._write_line(self._pending.pop(self._next_index))
+                self._next_index += 1
+            self._file.flush()
+            self._maybe_sync()
+
+    def _write_line(self, item: Dict):
+        if self.transform is not None:
+            item = self.transform(item)
+        self._file.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self.count += 1
+        self._unsynced += 1
+
+    def _maybe_sync(self):
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def finalize(self) -> str:
+        """Sync, close and atomically move the file into place; returns its path"""
+        with self._lock:
+            if self._pending:
+                raise RuntimeError(f"{len(self._pending)} ordered results are still waiting for earlier items")
+            if not self._file.closed:
+                self._file.flush()
+                self._sync()
+                self._file.close()
+            os.replace(self.part_path, self.path)
+        return self.path
+
+    def close(self):
+        """Sync and close without finalizing, keeping what was written in the .part file"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._sync()
+                self._file.close()
+
+    def __enter__(self) -> "JsonlResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.close()
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a JSONL file one at a time"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def iter_json_array(path: str, chunk_size: int = 1 << 20) -> Iterator[Any]:
+    """
+    Yield the elements of a JSON array file one at a time, reading it in chunks
+    so memory stays bounded by the largest element rather than the file size
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+        in_array = False
+        while True:
+            pos = _SEPARATORS.match(buf, pos).end()
+            if pos >= len(buf) and not eof:
+                chunk = f.read(chunk_size)
+                buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+                continue
+            if pos >= len(buf):
+                raise ValueError(f"{path} ends before its JSON array is closed")
+            if not in_array:
+                if buf[pos] != "[":
+                    raise ValueError(f"{path} does not contain a JSON array")
+                in_array = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = len(buf)
+            # An element reaching the end of the buffer may continue in the next chunk
+            if end == len(buf) and not eof:
+                chunk = f.read(chunk_size)
+                buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+                continue
+            yield item
+            pos = end
+
+
+def write_json_array(items: Iterable[Dict[str, Any]], path: str) -> int:
+    """
+    Write items as the legacy `json.dump(items, indent=2)` array, one item at a
+    time and atomically, so consumers that expect a JSON file never see a
+    partial array. Returns the number of items written.
+    """
+    tmp_path = str(path) + ".tmp"
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for item in items:
+            f.write(("," if count else "") + "\n" + textwrap.indent(json.dumps(item, indent=2), "  "))
+            count += 1
+        f.write("\n]" if count else "]")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+_json_array_lock = threading.Lock()
+
+
+def result_jsonl_path(path: str) -> str:
+    """The JSONL file a generation job writes for its output at path"""
+    return os.path.splitext(str(path))[0] + ".jsonl"
+
+
+def ensure_json_array(path: str) -> str:
+    """
+    Return path, first writing the legacy JSON array from the job's JSONL output if
+    path does not exist yet. Generation jobs only write the JSONL file; readers that
+    need the array file itself (preview, export) call this so it is written once,
+    on first use.
+    """
+    path = str(path)
+    with _json_array_lock:
+        source = result_jsonl_path(path)
+        if path.endswith(".json") and not os.path.exists(path) and os.path.exists(source):
+            write_json_array(iter_jsonl(source), path)
+    return path
+
+
+def iter_result_file(path: str) -> Iterator[Any]:
+    """
+    Yield the items of a JSONL or JSON array file one at a time. A job output whose
+    legacy array was never written is read from its JSONL file instead.
+    """
+    path = str(path)
+    if path.endswith(".jsonl"):
+        return iter_jsonl(path)
+    if not os.path.exists(path) and os.path.exists(result_jsonl_path(path)):
+        return iter_jsonl(result_jsonl_path(path))
+    return iter_json_array(path)
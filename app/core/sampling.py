@@ -0,0 +1,143 @@
+import math
+import random
+from statistics import NormalDist
+from typing import List, Optional
+
+from app.core.config import EVALUATION_SAMPLE_INITIAL_SIZE, EVALUATION_SAMPLE_MIN_PER_TOPIC
+
+
+class RunningStats:
+    """Mean and variance of a stream of values, updated one value at a time (Welford)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance, or None below two values"""
+        return self._m2 / (self.count - 1) if self.count > 1 else None
+
+    @classmethod
+    def combine(cls, parts: List["RunningStats"]) -> "RunningStats":
+        """Statistics of the union of the parts' values (Chan et al.)"""
+        combined = cls()
+        for part in parts:
+            if not part.count:
+                continue
+            count = combined.count + part.count
+            delta = part.mean - combined.mean
+            combined._m2 += part._m2 + delta * delta * combined.count * part.count / count
+            combined.mean += delta * part.count / count
+            combined.count = count
+        return combined
+
+
+class StratifiedSample:
+    """
+    Stratified random sample of a population (one stratum per topic), grown in
+    rounds until the confidence interval of the population mean is narrow enough.
+
+    Each stratum is visited in a seeded random order, so the same seed draws the
+    same sample. The first round takes a proportional share of initial_size from
+    every stratum, at least min_per_stratum. Later rounds size each stratum from
+    the variances seen so far, at most doubling it per round, until the interval
+    half-width of the stratified mean is at most target (and, with a
+    stratum_target, that of every stratum mean too). Intervals use the normal
+    approximation with the finite population correction, so a fully judged
+    stratum is exact.
+    """
+
+    def __init__(self, sizes: List[int], stats: List[RunningStats], target: float,
+                 stratum_target: Optional[float] = None, level: float = 0.95, seed: int = 0,
+                 min_per_stratum: int = EVALUATION_SAMPLE_MIN_PER_TOPIC,
+                 initial_size: int = EVALUATION_SAMPLE_INITIAL_SIZE):
+        rng = random.Random(seed)
+        self.sizes = sizes
+        self.stats = stats
+        self.target = target
+        self.stratum_target = stratum_target
+        self.level = level
+        self.min_per_stratum = max(2, min_per_stratum)
+        self.initial_size = initial_size
+        self.total = sum(sizes)
+        self.drawn = [0] * len(sizes)
+        self._orders = [rng.sample(range(size), size) for size in sizes]
+        self._z = NormalDist().inv_cdf(0.5 + level / 2)
+
+    @property
+    def sample_size(self) -> int:
+        return sum(self.drawn)
+
+    def _variance_of_mean(self, h: int) -> float:
+        size, stats = self.sizes[h], self.stats[h]
+        if stats.count >= size:
+            return 0.0
+        if stats.variance is None:
+            return math.inf
+        return stats.variance / stats.count * (1 - stats.count / size)
+
+    def stratum_half_width(self, h: int) -> float:
+        return self._z * math.sqrt(self._variance_of_mean(h))
+
+    def half_width(self) -> float:
+        variance = sum((self.sizes[h] / self.total) ** 2 * self._variance_of_mean(h)
+                       for h in range(len(self.sizes)) if self.sizes[h])
+        return self._z * math.sqrt(variance)
+
+    def mean(self) -> float:
+        """Stratified estimate of the population mean, over the strata with scores"""
+        scored = [h for h in range(len(self.sizes)) if self.stats[h].count]
+        weight = sum(self.sizes[h] for h in scored)
+        return sum(self.sizes[h] * self.stats[h].mean for h in scored) / weight if weight else 0.0
+
+    def _stratum_met(self, h: int) -> bool:
+        return self.stratum_target is None or self.stratum_half_width(h) <= self.stratum_target
+
+    def next_draws(self) -> List[List[int]]:
+        """
+        Mark the next items of each stratum as drawn and return their positions in
+        the stratum; every list is empty once the targets are met or nothing is left
+        """
+        if not self.sample_size:
+            wanted = [min(size, max(self.min_per_stratum, math.ceil(self.initial_size * size / self.total)))
+                      for size in self.sizes]
+        else:
+            overall_met = self.half_width() <= self.target
+            if overall_met and all(self._stratum_met(h) for h in range(len(self.sizes))):
+                return [[] for _ in self.sizes]
+            z2 = self._z ** 2
+            # Sample size that would meet the overall target under proportional allocation
+            pooled = sum(self.sizes[h] / self.total * (self.stats[h].variance or 0.0) for h in range(len(self.sizes)))
+            needed = z2 * pooled / self.target ** 2
+            wanted = []
+            for h, size in enumerate(self.sizes):
+                want = math.ceil(size / self.total * needed) if not overall_met else 0
+                if not self._stratum_met(h):
+                    variance = self.stats[h].variance
+                    if variance is None:
+                        want = max(want, self.drawn[h] + self.min_per_stratum)
+                    else:
+                        n0 = z2 * variance / self.stratum_target ** 2
+                        want = max(want, math.ceil(n0 / (1 + n0 / size)))
+                wanted.append(min(size, want, 2 * self.drawn[h]))
+            if all(want <= drawn for want, drawn in zip(wanted, self.drawn)):
+                # The variance estimates say the sample suffices but the interval disagrees;
+                # grow the strata still short by a quarter
+                wanted = [
+                    min(size, drawn + max(1, drawn // 4)) if not overall_met or not self._stratum_met(h) else drawn
+                    for h, (size, drawn) in enumerate(zip(self.sizes, self.drawn))
+                ]
+        draws = []
+        for h, want in enumerate(wanted):
+            start = self.drawn[h]
+            draws.append(self._orders[h][start:max(start, want)])
+            self.drawn[h] = max(start, want)
+        return draws
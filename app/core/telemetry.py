@@ -65,6 +65,10 @@ class TelemetryManager:
         self.event_queue = []
         self.queue_lock = threading.Lock()
         self.max_queue_size = 100
+
+        # Running token totals of the requests followed by a live job progress report
+        self._tracked_tokens: Dict[str, List[int]] = {}
+        self._tracked_lock = threading.Lock()
         
         # Start background thread for batch processing
         self.batch_thread = threading.Thread(target=self._batch_processor, daemon=True)
@@ -113,9 +117,14 @@ class TelemetryManager:
                     success BOOLEAN,
                     error TEXT,
                     inference_type TEXT,
+                    tokens_cache_read INTEGER,
+                    tokens_cache_write INTEGER,
+                    server_latency_ms REAL,
+                    stop_reason TEXT,
                     FOREIGN KEY (request_id) REFERENCES api_requests (id)
                 )
                 ''')
+                self._add_missing_columns(cursor, 'llm_operations', self.LLM_OPERATION_USAGE_COLUMNS)
                 
                 # Job metrics table
                 cursor.execute('''
@@ -148,6 +157,50 @@ class TelemetryManager:
                 )
                 ''')
                 
+                # Concurrency limit changes from the AIMD controllers
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS concurrency_events (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT,
+                    model_id TEXT,
+                    event TEXT,
+                    old_limit INTEGER,
+                    new_limit INTEGER,
+                    in_flight INTEGER
+                )
+                ''')
+                
+                # Estimated vs provider-reported prompt tokens
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS token_estimates (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT,
+                    model_id TEXT,
+                    estimated_tokens INTEGER,
+                    actual_tokens INTEGER,
+                    error_pct REAL
+                )
+                ''')
+                
+                # Generation calls: batches and the remainder re-batches they needed
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS generation_batches (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT,
+                    request_id TEXT,
+                    model_id TEXT,
+                    structured_output BOOLEAN,
+                    batch_size INTEGER,
+                    valid_items INTEGER,
+                    fallback_calls INTEGER,
+                    requested_items INTEGER,
+                    rebatch_round INTEGER,
+                    duplicate_items INTEGER,
+                    omit_tokens_saved INTEGER
+                )
+                ''')
+                self._add_missing_columns(cursor, 'generation_batches', self.GENERATION_BATCH_REBATCH_COLUMNS)
+                
                 # User interactions table
                 cursor.execute('''
                 CREATE TABLE IF NOT EXISTS user_interactions (
@@ -164,6 +217,30 @@ class TelemetryManager:
         except Exception as e:
             logger.error(f"Error initializing telemetry database: {str(e)}")
     
+    # Usage columns added after the llm_operations table first shipped
+    LLM_OPERATION_USAGE_COLUMNS = {
+        'tokens_cache_read': 'INTEGER',
+        'tokens_cache_write': 'INTEGER',
+        'server_latency_ms': 'REAL',
+        'stop_reason': 'TEXT',
+    }
+
+    # Re-batch and dedup columns added after the generation_batches table first shipped
+    GENERATION_BATCH_REBATCH_COLUMNS = {
+        'requested_items': 'INTEGER',
+        'rebatch_round': 'INTEGER',
+        'duplicate_items': 'INTEGER',
+        'omit_tokens_saved': 'INTEGER',
+    }
+
+    @staticmethod
+    def _add_missing_columns(cursor, table: str, columns: Dict[str, str]):
+        """Add columns to a table created by an older version of this module"""
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        for name, column_type in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
     @contextmanager
     def _get_db_connection(self):
         """Get a connection to the SQLite database"""
@@ -276,7 +353,11 @@ class TelemetryManager:
                             latency_ms: Optional[float] = None,
                             success: bool = True,
                             error: Optional[str] = None,
-                            inference_type: Optional[str] = "aws_bedrock"):
+                            inference_type: Optional[str] = "aws_bedrock",
+                            tokens_cache_read: Optional[int] = None,
+                            tokens_cache_write: Optional[int] = None,
+                            server_latency_ms: Optional[float] = None,
+                            stop_reason: Optional[str] = None):
         """
         Record an LLM operation with performance metrics
         
@@ -290,6 +371,10 @@ class TelemetryManager:
             success: Whether the operation succeeded
             error: Error message if any
             inference_type: The inference type (aws_bedrock, CAII, etc.)
+            tokens_cache_read: Input tokens read from the prompt cache
+            tokens_cache_write: Input tokens written to the prompt cache
+            server_latency_ms: Latency reported by the provider, excluding network time
+            stop_reason: Why generation stopped (end_turn, max_tokens, length, ...)
         """
         operation_id = str(uuid.uuid4())
         timestamp = datetime.now(timezone.utc).isoformat()
@@ -305,13 +390,37 @@ class TelemetryManager:
             'latency_ms': latency_ms,
             'success': 1 if success else 0,
             'error': error,
-            'inference_type': inference_type
+            'inference_type': inference_type,
+            'tokens_cache_read': tokens_cache_read,
+            'tokens_cache_write': tokens_cache_write,
+            'server_latency_ms': server_latency_ms,
+            'stop_reason': stop_reason
         }
         
         self._queue_event('llm_operations', data)
+        if request_id in self._tracked_tokens:
+            with self._tracked_lock:
+                totals = self._tracked_tokens.get(request_id)
+                if totals is not None:
+                    totals[0] += tokens_input or 0
+                    totals[1] += tokens_output or 0
         
         if not success:
             logger.error(f"LLM Operation Error: {model_id} - {operation_type} - {error}")
+
+    def track_request_tokens(self, request_id: str):
+        """Keep in-memory token totals for request_id, so progress reports need no query"""
+        with self._tracked_lock:
+            self._tracked_tokens.setdefault(request_id, [0, 0])
+
+    def untrack_request_tokens(self, request_id: str):
+        with self._tracked_lock:
+            self._tracked_tokens.pop(request_id, None)
+
+    def get_request_token_totals(self, request_id: str) -> Dict[str, int]:
+        with self._tracked_lock:
+            tokens_input, tokens_output = self._tracked_tokens.get(request_id, (0, 0))
+        return {"tokens_input": tokens_input, "tokens_output": tokens_output}
     
     def record_job_start(self,
                         request_id: str,
@@ -405,6 +514,80 @@ class TelemetryManager:
         
         self._queue_event('system_metrics', data)
     
+    def record_concurrency_change(self,
+                                  timestamp: str,
+                                  model_id: str,
+                                  event: str,
+                                  old_limit: int,
+                                  new_limit: int,
+                                  in_flight: int):
+        """Record a change of a model's adaptive concurrency limit"""
+        data = {
+            'id': str(uuid.uuid4()),
+            'timestamp': timestamp,
+            'model_id': model_id,
+            'event': event,
+            'old_limit': old_limit,
+            'new_limit': new_limit,
+            'in_flight': in_flight
+        }
+        
+        self._queue_event('concurrency_events', data)
+        
+        if event == "decrease":
+            logger.warning(f"Concurrency limit for {model_id} reduced {old_limit} -> {new_limit}")
+    
+    def record_token_estimate(self,
+                              model_id: str,
+                              estimated_tokens: int,
+                              actual_tokens: int):
+        """Record a local prompt token estimate against the count the provider reported"""
+        data = {
+            'id': str(uuid.uuid4()),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'model_id': model_id,
+            'estimated_tokens': estimated_tokens,
+            'actual_tokens': actual_tokens,
+            'error_pct': (estimated_tokens - actual_tokens) * 100.0 / actual_tokens
+        }
+        
+        self._queue_event('token_estimates', data)
+    
+    def record_generation_batch(self,
+                                request_id: Optional[str],
+                                model_id: str,
+                                structured_output: bool,
+                                batch_size: int,
+                                valid_items: int,
+                                requested_items: Optional[int] = None,
+                                rebatch_round: int = 0,
+                                duplicate_items: int = 0,
+                                omit_tokens_saved: int = 0):
+        """
+        Record one generation call: a batch (round 0) or a remainder re-batch.
+
+        batch_size is the number of items the call had to deliver and requested_items
+        what the prompt asked for, which is larger when a re-batch over-requests.
+        duplicate_items counts valid items dropped as near-duplicates and
+        omit_tokens_saved the prompt tokens the omit hint saved over the full list.
+        """
+        data = {
+            'id': str(uuid.uuid4()),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'request_id': request_id,
+            'model_id': model_id,
+            'structured_output': 1 if structured_output else 0,
+            'batch_size': batch_size,
+            'valid_items': valid_items,
+            'fallback_calls': 1 if rebatch_round else 0,
+            'requested_items': requested_items if requested_items is not None else batch_size,
+            'rebatch_round': rebatch_round,
+            'duplicate_items': duplicate_items,
+            'omit_tokens_saved': omit_tokens_saved
+        }
+        
+        self._queue_event('generation_batches', data)
+    
     def record_user_interaction(self,
                                session_id: str,
                                interaction_type: str,
@@ -491,6 +674,13 @@ class TelemetryManager:
                     AVG(latency_ms) as avg_latency,
                     AVG(tokens_input) as avg_tokens_input,
                     AVG(tokens_output) as avg_tokens_output,
+                    SUM(tokens_input) as total_tokens_input,
+                    SUM(tokens_output) as total_tokens_output,
+                    SUM(tokens_cache_read) as total_tokens_cache_read,
+                    AVG(server_latency_ms) as avg_server_latency,
+                    SUM(tokens_output) * 1000.0 / NULLIF(SUM(CASE WHEN tokens_output IS NOT NULL
+                        THEN latency_ms END), 0) as output_tokens_per_second,
+                    SUM(CASE WHEN stop_reason IN ('max_tokens', 'length') THEN 1 ELSE 0 END) as truncated_count,
                     SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END) as error_count
                 FROM llm_operations
                 WHERE timestamp >= datetime('now', ?)
@@ -590,6 +780,235 @@ class TelemetryManager:
             logger.error(f"Error getting system metrics: {str(e)}")
             return []
         
+    def get_concurrency_history(self, 
+                                hours: int = 24, 
+                                model_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the history of adaptive concurrency limit changes
+        
+        Args:
+            hours: Number of hours to look back
+            model_id: Filter by specific model
+        
+        Returns:
+            List of limit change records
+        """
+        try:
+            with self._get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                SELECT timestamp, model_id, event, old_limit, new_limit, in_flight
+                FROM concurrency_events
+                WHERE timestamp >= datetime('now', ?)
+                """
+                
+                params = [f'-{hours} hours']
+                
+                if model_id:
+                    query += " AND model_id = ?"
+                    params.append(model_id)
+                
+                query += " ORDER BY timestamp"
+                
+                cursor.execute(query, params)
+                results = [dict(row) for row in cursor.fetchall()]
+                return results
+        except Exception as e:
+            logger.error(f"Error getting concurrency history: {str(e)}")
+            return []
+        
+    def get_token_estimate_accuracy(self, 
+                                    days: int = 7, 
+                                    model_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the accuracy of local prompt token estimates per model
+        
+        Args:
+            days: Number of days to look back
+            model_id: Filter by specific model
+        
+        Returns:
+            List of per-model statistics; positive bias means over-estimation
+        """
+        try:
+            with self._get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                SELECT 
+                    model_id,
+                    COUNT(*) as samples,
+                    AVG(error_pct) as bias_pct,
+                    AVG(ABS(error_pct)) as mean_abs_error_pct,
+                    MAX(ABS(error_pct)) as max_abs_error_pct,
+                    SUM(CASE WHEN error_pct < 0 THEN 1 ELSE 0 END) as underestimates
+                FROM token_estimates
+                WHERE timestamp >= datetime('now', ?)
+                """
+                
+                params = [f'-{days} days']
+                
+                if model_id:
+                    query += " AND model_id = ?"
+                    params.append(model_id)
+                
+                query += " GROUP BY model_id ORDER BY samples DESC"
+                
+                cursor.execute(query, params)
+                results = [dict(row) for row in cursor.fetchall()]
+                return results
+        except Exception as e:
+            logger.error(f"Error getting token estimate accuracy: {str(e)}")
+            return []
+        
+    def get_fallback_statistics(self, 
+                                days: int = 7, 
+                                model_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get remainder re-batch calls per generation job, with and without structured output
+        
+        Args:
+            days: Number of days to look back
+            model_id: Filter by specific model
+        
+        Returns:
+            List of per-model, per-mode statistics
+        """
+        try:
+            with self._get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                SELECT 
+                    model_id,
+                    structured_output,
+                    COUNT(DISTINCT request_id) as jobs,
+                    COUNT(*) as calls,
+                    SUM(fallback_calls) as fallback_calls,
+                    SUM(fallback_calls) * 1.0 / NULLIF(COUNT(DISTINCT request_id), 0) as fallback_calls_per_job,
+                    SUM(valid_items) * 1.0 / NULLIF(SUM(batch_size), 0) as batch_yield,
+                    COUNT(*) * 1.0 / NULLIF(SUM(valid_items), 0) as calls_per_valid_item
+                FROM generation_batches
+                WHERE timestamp >= datetime('now', ?)
+                """
+                
+                params = [f'-{days} days']
+                
+                if model_id:
+                    query += " AND model_id = ?"
+                    params.append(model_id)
+                
+                query += " GROUP BY model_id, structured_output ORDER BY model_id, structured_output"
+                
+                cursor.execute(query, params)
+                results = [dict(row) for row in cursor.fetchall()]
+                return results
+        except Exception as e:
+            logger.error(f"Error getting fallback statistics: {str(e)}")
+            return []
+
+    def get_generation_call_efficiency(self, 
+                                       days: int = 7, 
+                                       model_id: Optional[str] = None,
+                                       request_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get generation calls per valid item and near-duplicates dropped for each job
+        
+        Args:
+            days: Number of days to look back
+            model_id: Filter by specific model
+            request_id: Filter by specific job request
+        
+        Returns:
+            List of per-job statistics, most recent first
+        """
+        try:
+            with self._get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                SELECT 
+                    request_id,
+                    model_id,
+                    MIN(timestamp) as started_at,
+                    COUNT(*) as calls,
+                    SUM(fallback_calls) as rebatch_calls,
+                    MAX(COALESCE(rebatch_round, 0)) as max_rebatch_round,
+                    SUM(COALESCE(requested_items, batch_size)) as requested_items,
+                    SUM(valid_items) as valid_items,
+                    COUNT(*) * 1.0 / NULLIF(SUM(valid_items), 0) as calls_per_valid_item,
+                    SUM(COALESCE(duplicate_items, 0)) as duplicates_dropped,
+                    SUM(COALESCE(duplicate_items, 0)) * 1.0 / NULLIF(SUM(valid_items) + SUM(COALESCE(duplicate_items, 0)), 0) as dedup_hit_rate,
+                    SUM(COALESCE(omit_tokens_saved, 0)) as input_tokens_saved
+                FROM generation_batches
+                WHERE timestamp >= datetime('now', ?)
+                """
+                
+                params = [f'-{days} days']
+                
+                if model_id:
+                    query += " AND model_id = ?"
+                    params.append(model_id)
+                
+                if request_id:
+                    query += " AND request_id = ?"
+                    params.append(request_id)
+                
+                query += " GROUP BY request_id, model_id ORDER BY started_at DESC"
+                
+                cursor.execute(query, params)
+                results = [dict(row) for row in cursor.fetchall()]
+                return results
+        except Exception as e:
+            logger.error(f"Error getting generation call efficiency: {str(e)}")
+            return []
+        
+    def get_dedup_statistics(self, 
+                             days: int = 7, 
+                             model_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get near-duplicate hit rates and omit-hint input token savings per model
+        
+        Args:
+            days: Number of days to look back
+            model_id: Filter by specific model
+        
+        Returns:
+            List of per-model statistics
+        """
+        try:
+            with self._get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = """
+                SELECT 
+                    model_id,
+                    COUNT(DISTINCT request_id) as jobs,
+                    SUM(valid_items) as valid_items,
+                    SUM(COALESCE(duplicate_items, 0)) as duplicates_dropped,
+                    SUM(COALESCE(duplicate_items, 0)) * 1.0 / NULLIF(SUM(valid_items) + SUM(COALESCE(duplicate_items, 0)), 0) as dedup_hit_rate,
+                    SUM(COALESCE(omit_tokens_saved, 0)) as input_tokens_saved,
+                    AVG(COALESCE(omit_tokens_saved, 0)) as input_tokens_saved_per_call
+                FROM generation_batches
+                WHERE timestamp >= datetime('now', ?)
+                """
+                
+                params = [f'-{days} days']
+                
+                if model_id:
+                    query += " AND model_id = ?"
+                    params.append(model_id)
+                
+                query += " GROUP BY model_id ORDER BY model_id"
+                
+                cursor.execute(query, params)
+                results = [dict(row) for row in cursor.fetchall()]
+                return results
+        except Exception as e:
+            logger.error(f"Error getting dedup statistics: {str(e)}")
+            return []
+        
     def store_job_telemetry_id(self, job_id: str, metrics_id: str):
         """Store job telemetry metrics ID for later reference"""
         try:
@@ -3,6 +3,7 @@ import functools
 import logging
 from typing import Callable, Dict, Any, Optional
 from app.core.telemetry import telemetry_manager
+from app.core.token_estimator import count_tokens
 
 logger = logging.getLogger("telemetry_integration")
 
@@ -133,7 +134,8 @@ def track_job(job_type: str):
 def estimate_token_count(text: Optional[str]) -> Optional[int]:
     """
     Estimate the number of tokens in a text string.
-    This is a rough approximation - about 4 characters per token for English text.
+    Only used where no provider-reported usage is available; model calls made
+    through UnifiedModelHandler record the real counts.
     
     Args:
         text: The text to estimate token count for
@@ -144,8 +146,7 @@ def estimate_token_count(text: Optional[str]) -> Optional[int]:
     if text is None:
         return None
         
-    # Simple approximation: ~4 chars per token for English
-    return len(text) // 4
+    return count_tokens(text)
 def estimate_token_count_for_response(response):
     """Estimate tokens more accurately for various response formats"""
     if response is None:
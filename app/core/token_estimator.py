@@ -0,0 +1,141 @@
+import math
+import re
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.core.config import (
+    get_model_family,
+    ModelFamily,
+    MODEL_TOKEN_LIMITS,
+    MODEL_FAMILY_TOKEN_LIMITS,
+    DEFAULT_TOKEN_LIMITS,
+)
+from app.core.telemetry import telemetry_manager
+
+# Tokens the chat template adds around a single user message
+MESSAGE_OVERHEAD_TOKENS = 8
+# Headroom kept between the estimated prompt and the context window
+SAFETY_MARGIN = 0.1
+# Smallest maxTokens worth sending when the prompt nearly fills the context
+MIN_OUTPUT_TOKENS = 256
+
+
+class TokenizerProfile(NamedTuple):
+    """How many characters of each kind a family's tokenizer packs into one token"""
+    word_chars: int
+    digits: int
+    symbols: int
+
+
+# Claude, Llama 3 and Qwen use large BPE vocabularies that keep common words
+# whole; Llama 3 and Claude group digits by three while Qwen and Mistral's 32k
+# SentencePiece vocabulary split them one by one, and Mistral breaks words
+# and punctuation more often.
+TOKENIZER_PROFILES: Dict[ModelFamily, TokenizerProfile] = {
+    ModelFamily.CLAUDE: TokenizerProfile(word_chars=5, digits=3, symbols=2),
+    ModelFamily.LLAMA: TokenizerProfile(word_chars=5, digits=3, symbols=2),
+    ModelFamily.MISTRAL: TokenizerProfile(word_chars=4, digits=1, symbols=1),
+    ModelFamily.QWEN: TokenizerProfile(word_chars=5, digits=1, symbols=2),
+}
+DEFAULT_PROFILE = TokenizerProfile(word_chars=4, digits=2, symbols=2)
+
+_piece_patterns: Dict[TokenizerProfile, "re.Pattern"] = {}
+
+
+def _piece_pattern(profile: TokenizerProfile) -> "re.Pattern":
+    """
+    Regex whose matches approximate the profile's tokens: letter runs cut every
+    word_chars, digit runs every `digits`, ASCII punctuation every `symbols`,
+    one per newline run and one per non-ASCII character. Spaces fold into the
+    following word, as they do in BPE vocabularies.
+    """
+    pattern = _piece_patterns.get(profile)
+    if pattern is None:
+        pattern = re.compile(
+            rf"[A-Za-z]{{1,{profile.word_chars}}}|[0-9]{{1,{profile.digits}}}"
+            rf"|[!-/:-@\[-`{{-~]{{1,{profile.symbols}}}|\n+|[^\x00-\x7f]"
+        )
+        _piece_patterns[profile] = pattern
+    return pattern
+
+
+def count_tokens(text: str, profile: TokenizerProfile = DEFAULT_PROFILE) -> int:
+    """Estimate the token count of text for a tokenizer profile, without calibration"""
+    if not text:
+        return 0
+    return len(_piece_pattern(profile).findall(text))
+
+
+def get_token_limits(model_id: str) -> Tuple[int, int]:
+    """(context_window, max_output_tokens) for a model"""
+    for pattern, limits in MODEL_TOKEN_LIMITS:
+        if pattern in model_id:
+            break
+    else:
+        limits = MODEL_FAMILY_TOKEN_LIMITS.get(get_model_family(model_id), DEFAULT_TOKEN_LIMITS)
+    return limits["context_window"], limits["max_output_tokens"]
+
+
+class TokenEstimator:
+    """
+    Local prompt-size estimates used to plan maxTokens before calling a model.
+
+    Estimates come from the model family's tokenizer profile and are scaled by
+    a per-model correction learned from the input token counts the provider
+    reports, so they converge on the real tokenizer after a few calls. Every
+    observation is recorded in telemetry as estimated vs actual tokens.
+    """
+
+    def __init__(self, smoothing: float = 0.2, min_correction: float = 0.5, max_correction: float = 2.0):
+        self.smoothing = smoothing
+        self.min_correction = min_correction
+        self.max_correction = max_correction
+        self._corrections: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, model_id: str, text: str) -> int:
+        """Estimated input tokens of a single-message prompt for model_id"""
+        profile = TOKENIZER_PROFILES.get(get_model_family(model_id), DEFAULT_PROFILE)
+        raw = count_tokens(text, profile) + MESSAGE_OVERHEAD_TOKENS
+        with self._lock:
+            correction = self._corrections.get(model_id, 1.0)
+        return int(math.ceil(raw * correction))
+
+    def plan_max_tokens(self, model_id: str, input_tokens: int, requested: int) -> int:
+        """
+        Largest maxTokens the model accepts for this prompt, at most `requested`.
+
+        Keeps SAFETY_MARGIN of the estimated prompt as headroom inside the
+        context window and never goes below MIN_OUTPUT_TOKENS (unless requested is lower).
+        """
+        context_window, max_output = get_token_limits(model_id)
+        available = context_window - int(input_tokens * (1 + SAFETY_MARGIN))
+        return max(min(MIN_OUTPUT_TOKENS, requested), min(requested, max_output, available))
+
+    def observe(self, model_id: str, estimated: int, actual: Optional[int]) -> None:
+        """Feed back the provider-reported input tokens for an estimate"""
+        if not actual or not estimated:
+            return
+        with self._lock:
+            correction = self._corrections.get(model_id, 1.0)
+            observed = correction * actual / estimated
+            correction += self.smoothing * (observed - correction)
+            self._corrections[model_id] = min(self.max_correction, max(self.min_correction, correction))
+        telemetry_manager.record_token_estimate(model_id, estimated, actual)
+
+    def correction(self, model_id: str) -> float:
+        with self._lock:
+            return self._corrections.get(model_id, 1.0)
+
+
+_token_estimator: Optional[TokenEstimator] = None
+_token_estimator_lock = threading.Lock()
+
+
+def get_token_estimator() -> TokenEstimator:
+    """Return the process-wide token estimator"""
+    global _token_estimator
+    with _token_estimator_lock:
+        if _token_estimator is None:
+            _token_estimator = TokenEstimator()
+        return _token_estimator
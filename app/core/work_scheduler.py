@@ -0,0 +1,117 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.core.config import GENERATION_LANE_MAX_IN_FLIGHT
+
+
+class WorkLane(ABC):
+    """
+    A sequence of work units that share state, such as the batches of one topic.
+
+    Subclasses hand out units with next_unit() while has_work() is true; a
+    lane may gain new work when one of its units finishes.
+    """
+
+    @abstractmethod
+    def has_work(self) -> bool:
+        """Whether next_unit() can be called now"""
+
+    def remaining_units(self) -> int:
+        """Estimate of the units still to issue, used to start long lanes first"""
+        return 1
+
+    @abstractmethod
+    def next_unit(self) -> Awaitable:
+        """The awaitable of the lane's next unit of work"""
+
+
+class WorkUnitScheduler:
+    """
+    Runs the units of many lanes over one shared in-flight budget.
+
+    Whenever a unit finishes, free capacity is refilled from the lane with the
+    fewest units in flight, breaking ties toward the lane with the most work
+    left. A lane therefore runs strictly in order (one unit at a time) unless
+    no other lane can use the capacity; then up to max_in_flight_per_lane of
+    its units overlap, so a single large topic no longer serializes the job.
+    The first unit to raise cancels the rest and the exception propagates.
+    """
+
+    def __init__(self, capacity: Callable[[], int], max_in_flight_per_lane: int = GENERATION_LANE_MAX_IN_FLIGHT):
+        self.capacity = capacity
+        self.max_in_flight_per_lane = max(1, max_in_flight_per_lane)
+        self.max_in_flight = 0
+
+    def _pick(self, lanes: Sequence[WorkLane], in_flight: List[int]) -> Optional[int]:
+        best = None
+        best_key = None
+        for i, lane in enumerate(lanes):
+            if in_flight[i] >= self.max_in_flight_per_lane or not lane.has_work():
+                continue
+            key = (in_flight[i], -lane.remaining_units())
+            if best_key is None or key < best_key:
+                best, best_key = i, key
+        return best
+
+    async def run(self, lanes: Sequence[WorkLane]) -> None:
+        tasks: Dict[asyncio.Task, int] = {}
+        in_flight = [0] * len(lanes)
+        try:
+            while True:
+                while len(tasks) < max(1, self.capacity()):
+                    i = self._pick(lanes, in_flight)
+                    if i is None:
+                        break
+                    tasks[asyncio.ensure_future(lanes[i].next_unit())] = i
+                    in_flight[i] += 1
+                self.max_in_flight = max(self.max_in_flight, len(tasks))
+                if not tasks:
+                    return
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    in_flight[tasks.pop(task)] -= 1
+                    task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class OrderedInputLane(WorkLane):
+    """
+    Input rows read lazily from an iterable and processed as scheduler units.
+
+    process(index, input) runs one row; results are handed to on_result(index, result)
+    (synchronously) in input order. At most max_pending rows are issued but not yet
+    handed on, so memory stays constant however many rows the input holds.
+    """
+
+    _END = object()
+
+    def __init__(self, rows: Iterable[Any], process: Callable[[int, Any], Awaitable[Any]],
+                 on_result: Callable[[int, Any], None], max_pending: int):
+        self.issued = 0
+        self.max_pending = max(1, max_pending)
+        self._rows = iter(rows)
+        self._next = next(self._rows, self._END)
+        self._process = process
+        self._on_result = on_result
+        self._done: Dict[int, Any] = {}
+        self._next_out = 0
+
+    def has_work(self) -> bool:
+        return self._next is not self._END and self.issued - self._next_out < self.max_pending
+
+    def next_unit(self) -> Awaitable[None]:
+        index, row = self.issued, self._next
+        self.issued += 1
+        self._next = next(self._rows, self._END)
+        return self._unit(index, row)
+
+    async def _unit(self, index: int, row: Any) -> None:
+        self._done[index] = await self._process(index, row)
+        while self._next_out in self._done:
+            self._on_result(self._next_out, self._done.pop(self._next_out))
+            self._next_out += 1
@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict
 from botocore.config import Config
 from fastapi import FastAPI, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from asyncio import TimeoutError, wait_for
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -50,8 +50,12 @@ from app.core.prompt_templates import PromptBuilder, PromptHandler
 from app.core.config import UseCase, USE_CASE_CONFIGS
 from app.core.database import DatabaseManager
 from app.core.exceptions import APIError, InvalidModelError, ModelHandlerError
+from app.core.progress import read_progress
+from app.core.result_writer import ensure_json_array
 from app.services.model_alignment import ModelAlignment
 from app.core.model_handlers import create_handler, UnifiedModelHandler
+from app.core.response_cache import get_response_cache
+from app.core.concurrency import get_concurrency_snapshots
 from app.services.aws_bedrock import get_bedrock_client
 from app.migrations.alembic_manager import AlembicMigrationManager
 from app.core.config import responses, caii_check
@@ -362,7 +366,7 @@ async def get_dataset_size(request:JsonDataSize):
         file_paths = request.input_path
         for path in file_paths:
             try:
-                with open(path) as f:
+                with open(ensure_json_array(path)) as f:
                     data = json.load(f)
                     if not data:
                         raise ValueError(f"Empty JSON data in file: {path}")
@@ -411,7 +415,7 @@ async def get_dataset_size(request: RelativePath):
         path = request.path
       
         try:
-            with open(path) as f:
+            with open(ensure_json_array(path)) as f:
                 data = json.load(f)
                 
                     
@@ -543,6 +547,81 @@ async def generate_freeform_data(request: SynthesisRequest):
 
         return synthesis_job.generate_job(freeform_request, core, mem, request_id=request_id, freeform = freeform)
 
+def _sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(deep_sanitize_nans(data)))}\n\n"
+
+
+def _stream_generation(generate) -> StreamingResponse:
+    """
+    Run generate(on_item, on_topic) in the background and relay its progress as
+    server-sent events: `item` for each validated item, `topic` when a topic is
+    finished, then `complete` with the final status and export path, or `error`.
+    Results were already streamed, so `complete` leaves them out. The stream is
+    not subject to the request timeout of global_middleware once it has started;
+    if the client disconnects, generation is cancelled.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_topic(topic: str, items: int, errors: List[str]):
+        queue.put_nowait(_sse_event("topic", {"topic": topic, "items": items, "errors": errors or None}))
+
+    async def run():
+        try:
+            result = await generate(lambda item: queue.put_nowait(_sse_event("item", item)), on_topic)
+            result.pop("results", None)
+            queue.put_nowait(_sse_event("complete", result))
+        except APIError as e:
+            queue.put_nowait(_sse_event("error", {"status": "failed", "error": e.message}))
+        except Exception as e:
+            queue.put_nowait(_sse_event("error", {"status": "failed", "error": str(e)}))
+        finally:
+            queue.put_nowait(None)
+
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post("/synthesis/generate/stream", include_in_schema=True,
+    responses=responses,
+    description="Generate question-answer pairs as a stream of server-sent events")
+async def generate_examples_stream(request: SynthesisRequest):
+    """Preview generation that streams each pair as it validates instead of returning them all at the end"""
+    request_id = str(uuid.uuid4())
+
+    if request.inference_type == "CAII":
+        caii_check(request.caii_endpoint)
+
+    if request.input_path:
+        # Rows have no topics, so only item events precede completion
+        return _stream_generation(lambda on_item, on_topic: synthesis_service.generate_result(
+            request, is_demo=True, request_id=request_id, on_item=on_item))
+    return _stream_generation(lambda on_item, on_topic: synthesis_service.generate_examples(
+        request, is_demo=True, request_id=request_id, on_item=on_item, on_topic=on_topic))
+
+
+@app.post("/synthesis/freeform/stream", include_in_schema=True,
+    responses=responses,
+    description="Generate freeform structured data as a stream of server-sent events")
+async def generate_freeform_data_stream(request: SynthesisRequest):
+    """Preview freeform generation that streams each item as it validates instead of returning them all at the end"""
+    request_id = str(uuid.uuid4())
+
+    if request.inference_type == "CAII":
+        caii_check(request.caii_endpoint)
+
+    return _stream_generation(lambda on_item, on_topic: synthesis_service.generate_freeform(
+        request, is_demo=True, request_id=request_id, on_item=on_item, on_topic=on_topic))
+
+
 @app.post("/synthesis/evaluate", 
     include_in_schema=True,
     responses=responses,
@@ -557,7 +636,7 @@ async def evaluate_examples(request: EvaluationRequest):
    
     is_demo = request.is_demo
     if is_demo:
-       return evaluator_service.evaluate_results(request, request_id=request_id)
+       return await evaluator_service.evaluate_results(request, request_id=request_id)
     
     else:
         return synthesis_job.evaluate_job(request, request_id=request_id)
@@ -577,7 +656,7 @@ async def evaluate_freeform(request: EvaluationRequest):
    
     is_demo = getattr(request, 'is_demo', True)
     if is_demo:
-        return evaluator_service.evaluate_row_data(request, request_id=request_id)
+        return await evaluator_service.evaluate_row_data(request, request_id=request_id)
     else:
         request_dict = request.model_dump()
         freeform = True
@@ -631,6 +710,31 @@ async def generate_alignment_data(
 
 
 
+@app.post("/jobs/{job_id}/resume", include_in_schema=True,
+          responses=responses,
+          description="Resume a failed generation or evaluation job from its checkpoint")
+async def resume_job(job_id: str):
+    """Re-run a failed job; units it finished before failing are not sent to the model again"""
+    try:
+        return synthesis_job.resume_job(job_id)
+    except APIError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+@app.get("/jobs/{job_id}/progress", include_in_schema=True,
+         responses=responses,
+         description="Live progress of a generation or evaluation job")
+async def get_job_progress(job_id: str):
+    """Units done/total, valid items, fallback calls, throughput and ETA, as last published by the job"""
+    job_name = db_manager.get_job_name(job_id)
+    if job_name is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    progress = read_progress(job_name)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_name} has not reported progress yet")
+    return progress
+
+
 @app.post("/export_results", include_in_schema=True)
 async def export_results(request:Export_synth):
     try: 
@@ -656,7 +760,7 @@ async def create_custom_prompt(request: CustomPromptRequest, request_id = None):
                 example_path= request.example_path
             )
         print(prompt)
-        prompt_gen = model_handler.generate_response(prompt, request_id=request_id)
+        prompt_gen = await model_handler.agenerate_response(prompt, request_id=request_id)
 
         return {"generated_prompt":prompt_gen}
     except Exception as e:
@@ -731,6 +835,16 @@ async def get_model_parameters() -> Dict:
         }
     }
 
+@app.get("/model/cache/stats", include_in_schema=True)
+async def get_response_cache_stats() -> Dict:
+    """Hit/miss counters and size of the model response cache"""
+    return get_response_cache().stats()
+
+@app.get("/model/concurrency", include_in_schema=True)
+async def get_model_concurrency(model_id: Optional[str] = None) -> Dict:
+    """Current adaptive concurrency limit and recent limit changes per model"""
+    return {"models": get_concurrency_snapshots(model_id)}
+
 
 
 @app.post("/complete_gen_prompt")
@@ -778,7 +892,7 @@ async def complete_prompt(request: SynthesisRequest):
 
             # Proceed only if path was successfully retrieved
             try:
-                with open(path) as f:
+                with open(ensure_json_array(path)) as f:
                     data = json.load(f)
 
                     # Assuming data is a list of dicts
@@ -837,7 +951,7 @@ async def complete_prompt(request: EvaluationRequest):
       
 
         if request.technique == Technique.Freeform:
-            with open(request.import_path, 'r') as file:
+            with open(ensure_json_array(request.import_path), 'r') as file:
                 data = json.load(file)
             
                 # Ensure data is a list of rows
@@ -852,7 +966,7 @@ async def complete_prompt(request: EvaluationRequest):
   
         elif request.technique == Technique.SFT or request.technique == Technique.Custom_Workflow:
                   
-                with open(request.import_path, 'r') as file:
+                with open(ensure_json_array(request.import_path), 'r') as file:
                     data = json.load(file)
                 qa_pairs =  [{
                 request.output_key: item.get(request.output_key, ''),  # Use get() with default value
@@ -969,7 +1083,7 @@ async def get_generation_by_filename(file_name: str):
 
 @app.get("/dataset_details/{file_path}", include_in_schema=True)
 async def get_dataset(file_path: str):
-    with open(file_path) as f:
+    with open(ensure_json_array(file_path)) as f:
             data = json.load(f)
     
    
@@ -977,6 +1091,10 @@ async def get_dataset(file_path: str):
             for key in data:
                 if key != "Overall_Average" and isinstance(data[key], dict):
                     data[key]["evaluated_pairs"] = data[key]["evaluated_pairs"][:100]
+            # Streaming mode evaluations only keep a preview per topic; every result is in results_path
+            results_path = (db_manager.get_evaldata_by_filename(os.path.basename(file_path)) or {}).get('results_path')
+            if results_path and os.path.exists(results_path):
+                return {"evaluation": data, "results_path": results_path}
             return {"evaluation": data}
             
     elif 'qa_pairs' in file_path:
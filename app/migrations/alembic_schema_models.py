@@ -57,6 +57,10 @@ class EvaluationMetadataModel(Base):
     job_name = Column(Text, unique=True)
     job_status = Column(Text)
     job_creator_name = Column(Text)
+    average_score_ci_half_width = Column(Float)
+    ci_level = Column(Float)
+    sample_size = Column(Integer)
+    results_path = Column(Text)
 
 class ExportMetadataModel(Base):
     __tablename__ = 'export_metadata'
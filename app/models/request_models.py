@@ -137,6 +137,10 @@ class SynthesisRequest(BaseModel):
     schema: Optional[str] = None  # Added schema field
     custom_prompt: Optional[str] = None 
     display_name: Optional[str] = None 
+    structured_output: bool = Field(
+        default=False,
+        description="Request items through a JSON schema (Bedrock tool use, CAII response_format) instead of parsing free text"
+    )
     
     # Optional model parameters with defaults
     model_params: Optional[ModelParameters] = Field(
@@ -207,6 +211,30 @@ class EvaluationRequest(BaseModel):
     display_name: Optional[str] = None 
     output_key: Optional[str] = 'Prompt'
     output_value: Optional[str] = 'Completion'
+    eval_batch_size: Optional[int] = Field(
+        default=None, ge=1,
+        description="QA pairs or rows scored per model call, sharing one rubric prompt; defaults to EVALUATION_BATCH_SIZE"
+    )
+    reuse_evaluations: bool = Field(
+        default=True,
+        description="Reuse stored scores of unchanged pairs or rows judged with the same settings instead of scoring them again"
+    )
+
+    # Sampling mode: judge a stratified random sample instead of every pair or row
+    ci_half_width: Optional[float] = Field(
+        default=None, gt=0,
+        description="Enables sampling mode: grow a sample stratified by topic until the confidence interval half-width of Overall_Average is at most this"
+    )
+    topic_ci_half_width: Optional[float] = Field(
+        default=None, gt=0,
+        description="In sampling mode, also grow each topic's sample until its average's half-width is at most this"
+    )
+    ci_level: float = Field(default=0.95, gt=0, lt=1, description="Confidence level of the sampling mode intervals")
+    sample_seed: int = Field(default=0, description="Seed of the sampling order, so a resumed job draws the same sample")
+    stream_results: bool = Field(
+        default=False,
+        description="Read the import file incrementally and append evaluated items to a JSONL file; always on for .jsonl imports"
+    )
 
     # Export configuration
     export_type: str = "local"  # "local" or "s3"
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional, Dict, Any, List
 from app.core.telemetry import telemetry_manager
+from app.core.concurrency import get_concurrency_snapshots
 
 router = APIRouter(prefix="/telemetry", tags=["telemetry"])
 
@@ -136,6 +137,83 @@ async def get_system_metrics(
         "history": metrics
     }
 
+@router.get("/concurrency")
+async def get_concurrency(
+    hours: int = Query(24, ge=1, le=168, description="Number of hours to look back"),
+    model_id: Optional[str] = Query(None, description="Filter by specific model")
+) -> Dict[str, Any]:
+    """
+    Get current adaptive concurrency limits and their change history
+    
+    Returns:
+        Dict with live controller state and persisted limit changes
+    """
+    return {
+        "current": get_concurrency_snapshots(model_id),
+        "history": telemetry_manager.get_concurrency_history(hours=hours, model_id=model_id)
+    }
+
+@router.get("/token-estimates")
+async def get_token_estimates(
+    days: int = Query(7, ge=1, le=90, description="Number of days to look back"),
+    model_id: Optional[str] = Query(None, description="Filter by specific model")
+) -> Dict[str, Any]:
+    """
+    Get the error of local prompt token estimates against provider-reported usage
+    
+    Returns:
+        Dict with per-model estimate error statistics
+    """
+    return {
+        "models": telemetry_manager.get_token_estimate_accuracy(days=days, model_id=model_id)
+    }
+
+@router.get("/fallbacks")
+async def get_fallbacks(
+    days: int = Query(7, ge=1, le=90, description="Number of days to look back"),
+    model_id: Optional[str] = Query(None, description="Filter by specific model")
+) -> Dict[str, Any]:
+    """
+    Get remainder re-batch calls per generation job, split by structured output mode
+    
+    Returns:
+        Dict with per-model fallback statistics
+    """
+    return {
+        "models": telemetry_manager.get_fallback_statistics(days=days, model_id=model_id)
+    }
+
+@router.get("/generation-efficiency")
+async def get_generation_efficiency(
+    days: int = Query(7, ge=1, le=90, description="Number of days to look back"),
+    model_id: Optional[str] = Query(None, description="Filter by specific model"),
+    request_id: Optional[str] = Query(None, description="Filter by specific job request")
+) -> Dict[str, Any]:
+    """
+    Get generation calls per valid item for each job, including remainder re-batches
+    
+    Returns:
+        Dict with per-job call statistics
+    """
+    return {
+        "jobs": telemetry_manager.get_generation_call_efficiency(days=days, model_id=model_id, request_id=request_id)
+    }
+
+@router.get("/dedup")
+async def get_dedup(
+    days: int = Query(7, ge=1, le=90, description="Number of days to look back"),
+    model_id: Optional[str] = Query(None, description="Filter by specific model")
+) -> Dict[str, Any]:
+    """
+    Get near-duplicate hit rates and the input tokens saved by the omit hint
+    
+    Returns:
+        Dict with per-model dedup statistics
+    """
+    return {
+        "models": telemetry_manager.get_dedup_statistics(days=days, model_id=model_id)
+    }
+
 @router.get("/export-data")
 async def export_telemetry_data(
     data_type: str = Query(..., description="Type of data to export: 'api', 'model', 'job', 'system', 'all'"),
@@ -31,44 +31,61 @@ import json
 from app.models.request_models import EvaluationRequest, ModelParameters
 
 from app.services.evaluator_service import EvaluatorService
+from app.core.checkpoint import JobCheckpoint
+from app.core.progress import JobProgress
 import asyncio
 import nest_asyncio  
 
 # Enable nested event loop
 nest_asyncio.apply()
 
-async def run_eval(request, job_name, request_id):
+async def run_eval(request, job_name, request_id, checkpoint=None, progress=None):
     try:
         
         job = EvaluatorService()
-        result = job.evaluate_results(request,job_name, is_demo=False, request_id=request_id)
+        result = await job.evaluate_results(request,job_name, is_demo=False, request_id=request_id,
+                                            checkpoint=checkpoint, progress=progress)
         return result
     except Exception as e:
         print(f"Error in evaluation: {e}")
         raise
 
-async def run_freeform_eval(request, job_name, request_id):
+async def run_freeform_eval(request, job_name, request_id, checkpoint=None, progress=None):
     """Run freeform data synthesis job"""
     try:
         job = EvaluatorService()
-        result = job.evaluate_row_data(request, job_name, is_demo=False, request_id=request_id)
+        result = await job.evaluate_row_data(request, job_name, is_demo=False, request_id=request_id,
+                                             checkpoint=checkpoint, progress=progress)
         return result
     except Exception as e:
         print(f"Error in freeform synthesis: {e}")
         raise
 
 if __name__ == "__main__":
+    progress = None
     try:
         #print(sys.argv[1], '\n')
         file_name = os.environ.get('file_name', '')   # Get filename from arguments
-
-        # Read JSON file
-        with open(file_name, 'r') as f:
-            params = json.load(f)
+        resume_job = os.environ.get('resume_job', '')  # Set when re-running a failed job
+
+        if resume_job:
+            # The params file is gone after the first run; the checkpoint kept a copy
+            checkpoint = JobCheckpoint(resume_job)
+            params = checkpoint.get_meta('params')
+            if params is None:
+                raise ValueError(f"No checkpoint found to resume job {resume_job}")
+        else:
+            # Read JSON file
+            with open(file_name, 'r') as f:
+                params = json.load(f)
+            checkpoint = JobCheckpoint(params['job_name'])
+            checkpoint.set_meta('params', params)
         job_name = params.pop('job_name')
         request_id = params.pop('request_id')
+        progress = JobProgress(job_name, "evaluate", request_id)
         print(params)
-        os.remove(file_name)
+        if not resume_job:
+            os.remove(file_name)
         # Check if this is a freeform generation request
         is_freeform = params.pop('generation_type', None) == 'freeform'
         
@@ -82,11 +99,16 @@ if __name__ == "__main__":
         # Run appropriate synthesis based on type
         if is_freeform:
             print("Running freeform data generation job")
-            result = loop.run_until_complete(run_freeform_eval(request, job_name, request_id))  
+            result = loop.run_until_complete(run_freeform_eval(request, job_name, request_id, checkpoint, progress))  
         else:
-            result = loop.run_until_complete(run_eval(request, job_name, request_id))
+            result = loop.run_until_complete(run_eval(request, job_name, request_id, checkpoint, progress))
+        # The job's output is complete, so there is nothing left to resume
+        checkpoint.discard()
+        progress.finish("completed")
         #print(result)
         
     except Exception as e:
+        if progress is not None:
+            progress.finish("failed")
         print(f"Error: {e}")
         sys.exit(1)
\ No newline at end of file
@@ -32,51 +32,70 @@ else:
 import json
 from app.models.request_models import SynthesisRequest
 from app.services.synthesis_service import SynthesisService
+from app.core.checkpoint import JobCheckpoint
+from app.core.progress import JobProgress
 import asyncio
 import nest_asyncio  # Add this import
 
 # Enable nested event loop
 nest_asyncio.apply()
 
-async def run_synthesis(request, job_name, request_id):
+async def run_synthesis(request, job_name, request_id, checkpoint=None, progress=None):
     """Run standard synthesis job for question-answer pairs"""
     try:
         job = SynthesisService()
         if request.input_path:
-            result = await job.generate_result(request, job_name, is_demo=False, request_id=request_id)
+            result = await job.generate_result(request, job_name, is_demo=False, request_id=request_id,
+                                               checkpoint=checkpoint, progress=progress)
         else:
-            result = await job.generate_examples(request, job_name, is_demo=False, request_id=request_id)
+            result = await job.generate_examples(request, job_name, is_demo=False, request_id=request_id,
+                                                 checkpoint=checkpoint, progress=progress)
         
         return result
     except Exception as e:
         print(f"Error in synthesis: {e}")
         raise
 
-async def run_freeform_synthesis(request, job_name, request_id):
+async def run_freeform_synthesis(request, job_name, request_id, checkpoint=None, progress=None):
     """Run freeform data synthesis job"""
     try:
         job = SynthesisService()
-        result = await job.generate_freeform(request, job_name, is_demo=False, request_id=request_id)
+        result = await job.generate_freeform(request, job_name, is_demo=False, request_id=request_id,
+                                             checkpoint=checkpoint, progress=progress)
         return result
     except Exception as e:
         print(f"Error in freeform synthesis: {e}")
         raise
 
 if __name__ == "__main__":
+    progress = None
     try:
         file_name = os.environ.get('file_name', '')   # Get filename from environment variables
-
-        # Read JSON file
-        with open(file_name, 'r') as f:
-            params = json.load(f)
+        resume_job = os.environ.get('resume_job', '')  # Set when re-running a failed job
+
+        if resume_job:
+            # The params file is gone after the first run; the checkpoint kept a copy
+            checkpoint = JobCheckpoint(resume_job)
+            params = checkpoint.get_meta('params')
+            if params is None:
+                raise ValueError(f"No checkpoint found to resume job {resume_job}")
+            print(f"Resuming job: {resume_job}")
+        else:
+            # Read JSON file
+            with open(file_name, 'r') as f:
+                params = json.load(f)
+            checkpoint = JobCheckpoint(params['job_name'])
+            checkpoint.set_meta('params', params)
         
         job_name = params.pop('job_name')
         request_id  = params.pop('request_id')
         print(f"Starting job: {job_name}")
+        progress = JobProgress(job_name, "generate", request_id)
         print(f"Parameters: {params}")
         
         # Clean up the params file after reading
-        os.remove(file_name)
+        if not resume_job:
+            os.remove(file_name)
         
         # Check if this is a freeform generation request
         is_freeform = params.pop('generation_type', None) == 'freeform'
@@ -94,14 +113,19 @@ if __name__ == "__main__":
         # Run appropriate synthesis based on type
         if is_freeform:
             print("Running freeform data generation job")
-            result = loop.run_until_complete(run_freeform_synthesis(request, job_name, request_id))
+            result = loop.run_until_complete(run_freeform_synthesis(request, job_name, request_id, checkpoint, progress))
         else:
             print("Running standard question-answer generation job")
-            result = loop.run_until_complete(run_synthesis(request, job_name, request_id))
+            result = loop.run_until_complete(run_synthesis(request, job_name, request_id, checkpoint, progress))
             
+        # The job's output is complete, so there is nothing left to resume
+        checkpoint.discard()
+        progress.finish("completed")
         print(f"Job completed successfully: {result}")
         
     except Exception as e:
+        if progress is not None:
+            progress.finish("failed")
         print(f"Error in job execution: {e}")
         traceback.print_exc()
         sys.exit(1)
\ No newline at end of file
@@ -1,30 +1,216 @@
 import boto3
 from typing import Dict, List, Optional, Any
-from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Callable, Awaitable, Iterable, Iterator, Tuple
 from app.models.request_models import Example, ModelParameters, EvaluationRequest
 from app.core.model_handlers import create_handler
 from app.core.prompt_templates import PromptBuilder, PromptHandler
 from app.services.aws_bedrock import get_bedrock_client
 from app.core.database import DatabaseManager
-from app.core.config import UseCase, Technique, get_model_family
+from app.core.config import UseCase, Technique, get_model_family, EVALUATION_MAX_IN_FLIGHT, EVALUATION_BATCH_SIZE, EVALUATION_BATCH_RETRY_ROUNDS, EVALUATION_STORE_ENABLED, EVALUATION_STREAM_MAX_PENDING, EVALUATION_STREAM_PREVIEW_ITEMS
 from app.services.check_guardrail import ContentGuardrail
 from app.core.exceptions import APIError, InvalidModelError, ModelHandlerError
 import os
 from datetime import datetime, timezone
 import json
 import logging
+import math
 from logging.handlers import RotatingFileHandler
 from app.core.telemetry_integration import track_llm_operation
-from functools import partial
+from app.core.checkpoint import JobCheckpoint
+from app.core.progress import JobProgress
+from app.core.evaluation_store import EvaluationStore, get_evaluation_store
+from app.core.concurrency import get_concurrency_controller
+from app.core.work_scheduler import WorkLane, WorkUnitScheduler, OrderedInputLane
+from app.core.result_writer import JsonlResultWriter, ensure_json_array, iter_jsonl, iter_result_file
+from app.core.sampling import RunningStats, StratifiedSample
+
+class _EvaluationStats:
+    """
+    Score statistics of one topic (or of all rows), updated as each evaluation completes.
+    With keep_items set, only that many evaluated and failed items are kept as a preview
+    and the rest are only counted.
+    """
+
+    def __init__(self, kind: str = "pairs", keep_items: Optional[int] = None):
+        self.kind = kind
+        self.keep_items = keep_items
+        self.scored = 0
+        self.score_sum = 0.0
+        self.min_score = None
+        self.max_score = None
+        self.running = RunningStats()
+        self.evaluated_count = 0
+        self.failed_count = 0
+        self._evaluated: Dict[int, Dict] = {}
+        self._failed: Dict[int, Dict] = {}
+
+    @staticmethod
+    def _numeric_score(score) -> Optional[float]:
+        """The score as a number, converting numeric strings such as "4"; None if it is not one"""
+        if isinstance(score, bool):
+            return None
+        if isinstance(score, (int, float)):
+            return score if math.isfinite(score) else None
+        try:
+            value = float(score)
+        except (TypeError, ValueError):
+            return None
+        return value if math.isfinite(value) else None
+
+    def add(self, index: int, result: Dict):
+        self.evaluated_count += 1
+        if self.keep_items is None or len(self._evaluated) < self.keep_items:
+            self._evaluated[index] = result
+        evaluation = result.get("evaluation", {})
+        score = evaluation.get("score")
+        if score is not None:
+            numeric = self._numeric_score(score)
+            if numeric is None:
+                # Scored 0 like a reply without a score, so one malformed reply cannot fail the job
+                evaluation["justification"] = f"The evaluation returned a non-numeric score: {score!r}"
+                numeric = 0
+            # Written back so the totals computed from the kept items are numeric too
+            evaluation["score"] = score = numeric
+            self.scored += 1
+            self.score_sum += score
+            self.min_score = score if self.min_score is None else min(self.min_score, score)
+            self.max_score = score if self.max_score is None else max(self.max_score, score)
+            self.running.add(score)
+
+    def add_failure(self, index: int, item: Dict, error: str) -> Dict:
+        failure = {"error": error, self.kind[:-1]: item}
+        self.failed_count += 1
+        if self.keep_items is None or len(self._failed) < self.keep_items:
+            self._failed[index] = failure
+        return failure
+
+    @classmethod
+    def combine(cls, parts: List["_EvaluationStats"], kind: str) -> "_EvaluationStats":
+        """Statistics of all the parts' items, which must have distinct indices"""
+        combined = cls(kind)
+        for part in parts:
+            combined.scored += part.scored
+            combined.score_sum += part.score_sum
+            combined.evaluated_count += part.evaluated_count
+            combined.failed_count += part.failed_count
+            for bound, pick in (("min_score", min), ("max_score", max)):
+                values = [v for v in (getattr(combined, bound), getattr(part, bound)) if v is not None]
+                setattr(combined, bound, pick(values) if values else None)
+            combined._evaluated.update(part._evaluated)
+            combined._failed.update(part._failed)
+        combined.running = RunningStats.combine([part.running for part in parts])
+        return combined
+
+    def as_dict(self) -> Dict:
+        """The statistics in the topic_stats layout, with items in input order"""
+        evaluated = [self._evaluated[i] for i in sorted(self._evaluated)]
+        failed = [self._failed[i] for i in sorted(self._failed)]
+        return {
+            "average_score": round(self.score_sum / self.scored, 2) if self.scored else 0,
+            "min_score": self.min_score if self.scored else 0,
+            "max_score": self.max_score if self.scored else 0,
+            f"evaluated_{self.kind}": evaluated,
+            f"failed_{self.kind}": failed,
+            "total_evaluated": self.evaluated_count,
+            "total_failed": self.failed_count
+        }
+
+
+class _StoredEvaluations:
+    """
+    Evaluations of earlier runs with the same judge, reused for items whose content is
+    unchanged, and the counts of items this run reused from the store, scored fresh and
+    took from the job checkpoint of a previous attempt (resumed).
+    """
+
+    def __init__(self, store: Optional[EvaluationStore], judge_key: str, content: Callable[[Dict], Any]):
+        self.store = store
+        self.judge_key = judge_key
+        self._content = content
+        self.reused = 0
+        self.scored = 0
+        self.resumed = 0
+
+    def lookup(self, items: List[Dict]) -> Dict[int, Dict]:
+        """Stored results of the items, by position in items"""
+        if self.store is None:
+            return {}
+        keys = [EvaluationStore.content_key(self._content(item)) for item in items]
+        found = self.store.get_many(self.judge_key, keys)
+        return {k: found[key] for k, key in enumerate(keys) if key in found}
+
+    def save(self, items: List[Dict], results: List[Dict]):
+        # Every failure path reports a score of 0, so those results are scored again next time
+        if self.store is None:
+            return
+        self.store.put_many(self.judge_key, {
+            EvaluationStore.content_key(self._content(item)): result
+            for item, result in zip(items, results)
+            if not isinstance(result["evaluation"]["score"], bool)
+            and isinstance(result["evaluation"]["score"], (int, float)) and result["evaluation"]["score"] != 0
+        })
+
+
+class _EvaluationLane(WorkLane):
+    """
+    The items of one topic (or the rows of a dataset) as evaluation work units of
+    batch_size consecutive items each.
+
+    All lanes of a job share one WorkUnitScheduler, so a large topic uses capacity
+    small ones leave idle. Each result is folded into the lane's statistics as soon
+    as it completes; a model error stops the job, any other error fails only its unit.
+    """
+
+    def __init__(self, items: List[Dict], evaluate: Callable[[List[int], List[Dict]], Awaitable[List[Dict]]],
+                 stats: _EvaluationStats, logger: logging.Logger, batch_size: int = 1,
+                 positions: Optional[List[int]] = None):
+        self.items = items
+        self.stats = stats
+        self.batch_size = max(1, batch_size)
+        # Indices of the items in their full dataset, when the lane covers a sample of it
+        self.positions = positions
+        self._evaluate = evaluate
+        self._logger = logger
+        self._next = 0
+
+    def _count(self) -> int:
+        return len(self.items) if self.positions is None else len(self.positions)
+
+    def has_work(self) -> bool:
+        return self._next < self._count()
+
+    def remaining_units(self) -> int:
+        return -(-(self._count() - self._next) // self.batch_size)
+
+    def next_unit(self) -> Awaitable[None]:
+        indices = list(range(self._next, min(self._next + self.batch_size, self._count())))
+        self._next = indices[-1] + 1
+        if self.positions is not None:
+            indices = [self.positions[i] for i in indices]
+        return self._unit(indices)
+
+    async def _unit(self, indices: List[int]) -> None:
+        items = [self.items[i] for i in indices]
+        try:
+            results = await self._evaluate(indices, items)
+        except ModelHandlerError:
+            raise
+        except Exception as e:
+            error_msg = f"Error processing evaluation result: {str(e)}"
+            self._logger.error(error_msg)
+            for index, item in zip(indices, items):
+                self.stats.add_failure(index, item, error_msg)
+            return
+        for index, result in zip(indices, results):
+            self.stats.add(index, result)
+
 
 class EvaluatorService:
     """Service for evaluating generated QA pairs using Claude with parallel processing"""
     
-    def __init__(self, max_workers: int = 4):
+    def __init__(self):
         self.bedrock_client = get_bedrock_client()
         self.db = DatabaseManager()
-        self.max_workers = max_workers
         self.guard = ContentGuardrail()
         self._setup_logging()
 
@@ -58,7 +244,7 @@ class EvaluatorService:
 
     
     #@track_llm_operation("evaluate_single_pair")
-    def evaluate_single_pair(self, qa_pair: Dict, model_handler, request: EvaluationRequest, request_id=None) -> Dict:
+    async def evaluate_single_pair(self, qa_pair: Dict, model_handler, request: EvaluationRequest, request_id=None) -> Dict:
         """Evaluate a single QA pair"""
         try:
             # Default error response
@@ -100,9 +286,9 @@ class EvaluatorService:
                 return error_response
 
             try:
-                response = model_handler.generate_response(prompt, request_id=request_id)
+                response = await model_handler.agenerate_response(prompt, request_id=request_id)
             except ModelHandlerError as e:
-                self.logger.error(f"ModelHandlerError in generate_response: {str(e)}")
+                self.logger.error(f"ModelHandlerError in agenerate_response: {str(e)}")
                 raise  
             except Exception as e:
                 error_msg = f"Error generating model response: {str(e)}"
@@ -146,90 +332,72 @@ class EvaluatorService:
             self.logger.error(f"Critical error in evaluate_single_pair: {str(e)}")
             return error_response
         
-    #@track_llm_operation("evaluate_topic")
-    def evaluate_topic(self, topic: str, qa_pairs: List[Dict], model_handler, request: EvaluationRequest, request_id=None) -> Dict:
-        """Evaluate all QA pairs for a given topic in parallel"""
+    async def evaluate_pair_batch(self, qa_pairs: List[Dict], model_handler, request: EvaluationRequest, request_id=None) -> Dict[int, Dict]:
+        """
+        Evaluate several QA pairs in one call; returns the results by position in qa_pairs.
+        Pairs the reply left out or malformed are missing from the result.
+        """
+        prompt_pairs = [
+            {"id": str(k), "question": pair[request.output_key], "solution": pair[request.output_value]}
+            for k, pair in enumerate(qa_pairs)
+            if all(key in pair for key in [request.output_key, request.output_value])
+        ]
+        if not prompt_pairs:
+            return {}
         try:
-            self.logger.info(f"Starting evaluation for topic: {topic} with {len(qa_pairs)} QA pairs")
-            evaluated_pairs = []
-            failed_pairs = []
-
-            try:
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    try:
-                        evaluate_func = partial(
-                            self.evaluate_single_pair,
-                            model_handler=model_handler,
-                            request=request, request_id=request_id
-                        )
-                        
-                        future_to_pair = {
-                            executor.submit(evaluate_func, pair): pair 
-                            for pair in qa_pairs
-                        }
-                        
-                        for future in as_completed(future_to_pair):
-                            try:
-                                result = future.result()
-                                evaluated_pairs.append(result)
-                            except ModelHandlerError:
-                                raise  
-                            except Exception as e:
-                                error_msg = f"Error processing future result: {str(e)}"
-                                self.logger.error(error_msg)
-                                failed_pairs.append({
-                                    "error": error_msg,
-                                    "pair": future_to_pair[future]
-                                })
-                                
-                    except Exception as e:
-                        error_msg = f"Error in parallel execution: {str(e)}"
-                        self.logger.error(error_msg)
-                        raise
+            self.logger.info(f"Evaluating {len(prompt_pairs)} QA pairs in one call")
+            prompt = PromptBuilder.build_batch_eval_prompt(
+                request.model_id,
+                request.use_case,
+                prompt_pairs,
+                request.examples,
+                request.custom_prompt
+            )
+            response = await model_handler.agenerate_response(prompt, request_id=request_id)
+        except ModelHandlerError as e:
+            self.logger.error(f"ModelHandlerError in agenerate_response: {str(e)}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Error in batched QA pair evaluation: {str(e)}")
+            return {}
 
-            except ModelHandlerError:
-                raise              
-            except Exception as e:
-                error_msg = f"Error in ThreadPoolExecutor setup: {str(e)}"
-                self.logger.error(error_msg)
-                raise
+        return {
+            k: {
+                "question": qa_pairs[k][request.output_key],
+                "solution": qa_pairs[k][request.output_value],
+                "evaluation": evaluation
+            }
+            for k, evaluation in self._parse_batch_evaluations(response, [p["id"] for p in prompt_pairs]).items()
+        }
 
-            try:
-                # Calculate statistics only from successful evaluations
-                scores = [pair["evaluation"]["score"] for pair in evaluated_pairs if pair.get("evaluation", {}).get("score") is not None]
-                
-                if scores:
-                    average_score = sum(scores) / len(scores)
-                    average_score = round(average_score, 2)
-                    min_score = min(scores)
-                    max_score = max(scores)
-                else:
-                    average_score = min_score = max_score = 0
-
-                topic_stats = {
-                    "average_score": average_score,
-                    "min_score": min_score,
-                    "max_score": max_score,
-                    "evaluated_pairs": evaluated_pairs,
-                    "failed_pairs": failed_pairs,
-                    "total_evaluated": len(evaluated_pairs),
-                    "total_failed": len(failed_pairs)
-                }
-                
-                self.logger.info(f"Completed evaluation for topic: {topic}. Average score: {topic_stats['average_score']:.2f}")
-                return topic_stats
+    @staticmethod
+    def _parse_batch_evaluations(response, ids: List[str]) -> Dict[int, Dict]:
+        """Evaluations of a batched reply by item position, keeping only well-formed entries for requested ids"""
+        evaluations = {}
+        for entry in response or []:
+            if not isinstance(entry, dict) or str(entry.get("id")) not in ids:
+                continue
+            score = entry.get("score")
+            if isinstance(score, bool) or not isinstance(score, (int, float)):
+                continue
+            evaluations.setdefault(int(entry["id"]), {
+                "score": score,
+                "justification": entry.get("justification", "No justification provided")
+            })
+        return evaluations
 
-            except Exception as e:
-                error_msg = f"Error calculating topic statistics: {str(e)}"
-                self.logger.error(error_msg)
-                return {
-                    "average_score": 0,
-                    "min_score": 0,
-                    "max_score": 0,
-                    "evaluated_pairs": evaluated_pairs,
-                    "failed_pairs": failed_pairs,
-                    "error": error_msg
-                }
+    #@track_llm_operation("evaluate_topic")
+    async def evaluate_topic(self, topic: str, qa_pairs: List[Dict], model_handler, request: EvaluationRequest, request_id=None,
+                             checkpoint: Optional[JobCheckpoint] = None, unit_prefix: str = "",
+                             progress: Optional[JobProgress] = None, stored: Optional[_StoredEvaluations] = None) -> Dict:
+        """Evaluate all QA pairs for a given topic in parallel; with a checkpoint, pair j is unit `<unit_prefix>/<j>`"""
+        try:
+            self.logger.info(f"Starting evaluation for topic: {topic} with {len(qa_pairs)} QA pairs")
+            lane = self._pair_lane(qa_pairs, model_handler, request, request_id, checkpoint, unit_prefix, progress, stored)
+            await self._run_lanes([lane], request.model_id)
+            topic_stats = lane.stats.as_dict()
+            self.logger.info(f"Completed evaluation for topic: {topic}. Average score: {topic_stats['average_score']:.2f}")
+            return topic_stats
         except ModelHandlerError:
             raise  
         except Exception as e:
@@ -243,9 +411,286 @@ class EvaluatorService:
                 "failed_pairs": [],
                 "error": error_msg
             }
+
+    def _pair_lane(self, qa_pairs: List[Dict], model_handler, request: EvaluationRequest, request_id,
+                   checkpoint: Optional[JobCheckpoint], unit_prefix: str, progress: Optional[JobProgress],
+                   stored: Optional[_StoredEvaluations] = None, stats: Optional[_EvaluationStats] = None,
+                   positions: Optional[List[int]] = None) -> _EvaluationLane:
+        """
+        A lane evaluating one topic's QA pairs, or those at positions; with a checkpoint,
+        pair j is unit `<unit_prefix>/<j>`
+        """
+        done = checkpoint.completed_units(unit_prefix + "/") if checkpoint is not None else {}
+        return _EvaluationLane(
+            qa_pairs,
+            lambda indices, pairs: self._checkpointed(
+                checkpoint, done, [f"{unit_prefix}/{j}" for j in indices], pairs,
+                lambda pair: self.evaluate_single_pair(pair, model_handler, request, request_id=request_id),
+                lambda pairs: self.evaluate_pair_batch(pairs, model_handler, request, request_id=request_id),
+                progress=progress, stored=stored),
+            stats or _EvaluationStats("pairs"),
+            self.logger,
+            batch_size=request.eval_batch_size or EVALUATION_BATCH_SIZE,
+            positions=positions,
+        )
+
+    def _row_lane(self, rows: List[Dict[str, Any]], model_handler, request: EvaluationRequest, request_id,
+                  checkpoint: Optional[JobCheckpoint], progress: Optional[JobProgress],
+                  stored: Optional[_StoredEvaluations] = None, stats: Optional[_EvaluationStats] = None,
+                  positions: Optional[List[int]] = None) -> _EvaluationLane:
+        """A lane evaluating the data rows, or those at positions; with a checkpoint, row i is unit `row/<i>`"""
+        done = checkpoint.completed_units("row/") if checkpoint is not None else {}
+        return _EvaluationLane(
+            rows,
+            lambda indices, batch: self._checkpointed(
+                checkpoint, done, [f"row/{i}" for i in indices], batch,
+                lambda row: self.evaluate_single_row(row, model_handler, request, request_id=request_id),
+                lambda batch: self.evaluate_row_batch(batch, model_handler, request, request_id=request_id),
+                progress=progress, stored=stored),
+            stats or _EvaluationStats("rows"),
+            self.logger,
+            batch_size=request.eval_batch_size or EVALUATION_BATCH_SIZE,
+            positions=positions,
+        )
+
+    async def _evaluate_sample(self, strata: List[List[int]], stats: List[_EvaluationStats],
+                               make_lane: Callable[[int, List[int]], _EvaluationLane], request: EvaluationRequest,
+                               progress: Optional[JobProgress] = None) -> StratifiedSample:
+        """
+        Sampling mode: evaluate a stratified random sample, in rounds, until the request's
+        confidence interval targets are met. strata holds the item indices of each topic,
+        stats the statistics they accumulate in, and make_lane(h, indices) builds the lane
+        that evaluates those items of topic h.
+        """
+        sample = StratifiedSample([len(stratum) for stratum in strata], [s.running for s in stats],
+                                  request.ci_half_width, request.topic_ci_half_width,
+                                  level=request.ci_level, seed=request.sample_seed)
+        while True:
+            draws = sample.next_draws()
+            if not any(draws):
+                break
+            if progress is not None:
+                progress.add_units(sum(len(drawn) for drawn in draws))
+            await self._run_lanes(
+                [make_lane(h, [strata[h][k] for k in drawn]) for h, drawn in enumerate(draws) if drawn],
+                request.model_id)
+            self.logger.info(f"Sampled {sample.sample_size} of {sample.total} items, "
+                             f"CI half-width {sample.half_width():.3f} at level {request.ci_level}")
+        return sample
+
+    @staticmethod
+    def _finite(value: float) -> Optional[float]:
+        """Rounded value for JSON and the database; None while an interval is still unbounded"""
+        return round(value, 4) if math.isfinite(value) else None
+
+    def _sampling_summary(self, sample: Optional[StratifiedSample], request: EvaluationRequest) -> Dict:
+        """The achieved interval of a sampling mode run, stored next to Overall_Average; empty otherwise"""
+        if sample is None:
+            return {}
+        return {
+            "ci_half_width": self._finite(sample.half_width()),
+            "ci_level": request.ci_level,
+            "sample_size": sample.sample_size,
+            "population_size": sample.total,
+        }
+
+    async def _run_lanes(self, lanes: List[_EvaluationLane], model_id: str):
+        """Evaluate every unit of the lanes over one budget of EVALUATION_MAX_IN_FLIGHT calls"""
+        controller = get_concurrency_controller(model_id)
+        scheduler = WorkUnitScheduler(capacity=lambda: min(EVALUATION_MAX_IN_FLIGHT, int(controller.limit)))
+        await scheduler.run(lanes)
+
+    def _stored_evaluations(self, request: EvaluationRequest, model_params: ModelParameters, kind: str) -> _StoredEvaluations:
+        """
+        Reuse of earlier evaluations for a run over QA pairs or rows. The judge prompt is
+        fingerprinted by rendering its template around an empty item.
+        """
+        if kind == "pairs":
+            judge_prompt = PromptBuilder.build_eval_prompt(
+                request.model_id, request.use_case, "", "", request.examples, request.custom_prompt)
+            content = lambda pair: [pair.get(request.output_key), pair.get(request.output_value)]
+        else:
+            judge_prompt = PromptBuilder.build_freeform_eval_prompt(
+                request.model_id, request.use_case, {}, request.examples, request.custom_prompt)
+            content = lambda row: row
+        store = get_evaluation_store() if EVALUATION_STORE_ENABLED and request.reuse_evaluations else None
+        judge_key = EvaluationStore.judge_key(request.model_id, request.inference_type, judge_prompt, model_params)
+        return _StoredEvaluations(store, judge_key, content)
+
+    async def _checkpointed(self, checkpoint: Optional[JobCheckpoint], done: Dict[str, List[Dict]], unit_ids: List[str],
+                            items: List[Dict], evaluate_one, evaluate_many, progress: Optional[JobProgress] = None,
+                            stored: Optional[_StoredEvaluations] = None) -> List[Dict]:
+        """
+        Evaluate items, reusing the results a previous run of the job checkpointed for their
+        unit ids, then those stored for unchanged items by earlier runs with the same judge.
+
+        The others go to evaluate_many together. Items its reply leaves out are asked
+        again together for up to EVALUATION_BATCH_RETRY_ROUNDS rounds, then with
+        evaluate_one each. Every result is recorded under its own unit id.
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        pending = []
+        for k, unit_id in enumerate(unit_ids):
+            if unit_id in done:
+                results[k] = done[unit_id][0]
+                if progress is not None:
+                    progress.resumed(1, 1)
+            else:
+                pending.append(k)
+        fresh = []
+
+        def record(k: int, result: Dict, fallback: bool):
+            results[k] = result
+            if checkpoint is not None:
+                checkpoint.record_unit(unit_ids[k], [result])
+            if progress is not None:
+                progress.unit_done(1, fallback=fallback)
+            fresh.append(k)
+
+        if stored is not None:
+            stored.resumed += len(items) - len(pending)
+            if pending:
+                found = stored.lookup([items[k] for k in pending])
+                for position, k in enumerate(pending):
+                    if position in found:
+                        results[k] = found[position]
+                        if checkpoint is not None:
+                            checkpoint.record_unit(unit_ids[k], [found[position]])
+                        if progress is not None:
+                            progress.resumed(1, 1)
+                stored.reused += len(found)
+                pending = [k for position, k in enumerate(pending) if position not in found]
+
+        rounds = 0
+        while len(pending) > 1 and rounds <= EVALUATION_BATCH_RETRY_ROUNDS:
+            evaluated = await evaluate_many([items[k] for k in pending])
+            missing = []
+            for position, k in enumerate(pending):
+                if position in evaluated:
+                    record(k, evaluated[position], fallback=rounds > 0)
+                else:
+                    missing.append(k)
+            if missing:
+                self.logger.warning(f"Batched evaluation left out {len(missing)} of {len(pending)} items (round {rounds})")
+            pending = missing
+            rounds += 1
+        for k in pending:
+            record(k, await evaluate_one(items[k]), fallback=rounds > 0)
+        if stored is not None and fresh:
+            stored.scored += len(fresh)
+            stored.save([items[k] for k in fresh], [results[k] for k in fresh])
+        return results
+
+    @staticmethod
+    def _streaming(request: EvaluationRequest) -> bool:
+        """Whether the import is evaluated in streaming mode; sampling mode needs the whole file"""
+        return request.ci_half_width is None and (request.stream_results or request.import_path.endswith(".jsonl"))
+
+    @staticmethod
+    def _iter_import(path: str) -> Iterator[Any]:
+        """The items of a JSONL or JSON array import file, read one at a time"""
+        return iter_result_file(path)
+
+    def _load_import(self, path: str) -> Any:
+        if path.endswith(".jsonl"):
+            return list(iter_jsonl(path))
+        with open(ensure_json_array(path), 'r') as file:
+            return json.load(file)
+
+    @staticmethod
+    def _evaluated_output_path(prefix: str, checkpoint: Optional[JobCheckpoint]) -> str:
+        """A new timestamped summary file name, or the one a resumed job chose first"""
+        time_file = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3]
+        output_path = f"{prefix}_{time_file}_evaluated.json"
+        if checkpoint is not None:
+            output_path = checkpoint.output_file(output_path)
+        return output_path
+
+    @staticmethod
+    def _overall_average(parts: Iterable[_EvaluationStats]) -> float:
+        parts = list(parts)
+        scored = sum(part.scored for part in parts)
+        return round(sum(part.score_sum for part in parts) / scored, 2) if scored else 0
+
+    async def _stream_evaluations(self, items: Iterable[Tuple[Any, Dict]], unit_prefix: str, evaluate_one, evaluate_many,
+                                  stats_for: Callable[[Any], _EvaluationStats], results_path: str,
+                                  request: EvaluationRequest, checkpoint: Optional[JobCheckpoint] = None,
+                                  progress: Optional[JobProgress] = None, stored: Optional[_StoredEvaluations] = None,
+                                  record_key: Optional[str] = None) -> int:
+        """
+        Streaming mode: evaluate (key, item) tuples as they are read, in units of
+        eval_batch_size consecutive items, and append every result to a JSONL file at
+        results_path in input order. Results are folded into stats_for(key) and, with a
+        record_key, written with the key under it. Item i is unit `<unit_prefix>/<i>`.
+
+        Only EVALUATION_STREAM_MAX_PENDING units are read ahead of the oldest unfinished
+        one, so memory stays flat however large the import is. Returns the item count.
+        """
+        batch_size = request.eval_batch_size or EVALUATION_BATCH_SIZE
+        if progress is not None:
+            progress.set_total(0)
+
+        def chunks() -> Iterator[List[Tuple[int, Any, Dict]]]:
+            chunk = []
+            for index, (key, item) in enumerate(items):
+                chunk.append((index, key, item))
+                if len(chunk) == batch_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        async def process(_, chunk: List[Tuple[int, Any, Dict]]):
+            unit_ids = [f"{unit_prefix}/{index}" for index, _, _ in chunk]
+            done = {}
+            if checkpoint is not None:
+                for unit_id in unit_ids:
+                    outputs = checkpoint.unit_outputs(unit_id)
+                    if outputs is not None:
+                        done[unit_id] = outputs
+            if progress is not None:
+                progress.add_units(len(chunk))
+            try:
+                results = await self._checkpointed(checkpoint, done, unit_ids, [item for _, _, item in chunk],
+                                                   evaluate_one, evaluate_many, progress=progress, stored=stored)
+            except ModelHandlerError:
+                raise
+            except Exception as e:
+                error_msg = f"Error processing evaluation result: {str(e)}"
+                self.logger.error(error_msg)
+                return chunk, error_msg
+            return chunk, results
+
+        count = 0
+        with JsonlResultWriter(results_path) as writer:
+            def on_result(_, outcome):
+                nonlocal count
+                chunk, results = outcome
+                for k, (index, key, item) in enumerate(chunk):
+                    stats = stats_for(key)
+                    if isinstance(results, str):
+                        record = stats.add_failure(index, item, results)
+                    else:
+                        record = results[k]
+                        stats.add(index, record)
+                    writer.write({record_key: key, **record} if record_key else record)
+                    count += 1
+
+            lane = OrderedInputLane(chunks(), process, on_result, max_pending=EVALUATION_STREAM_MAX_PENDING)
+            controller = get_concurrency_controller(request.model_id)
+            scheduler = WorkUnitScheduler(capacity=lambda: min(EVALUATION_MAX_IN_FLIGHT, int(controller.limit)),
+                                          max_in_flight_per_lane=lane.max_pending)
+            await scheduler.run([lane])
+        self.logger.info(f"Streamed {count} evaluated items to {results_path}")
+        return count
+
     #@track_llm_operation("evaluate_results")
-    def evaluate_results(self, request: EvaluationRequest, job_name=None,is_demo: bool = True, request_id=None) -> Dict:
-        """Evaluate all QA pairs with parallel processing"""
+    async def evaluate_results(self, request: EvaluationRequest, job_name=None,is_demo: bool = True, request_id=None,
+                               checkpoint: Optional[JobCheckpoint] = None, progress: Optional[JobProgress] = None) -> Dict:
+        """
+        Evaluate all QA pairs with parallel processing; a checkpoint lets a failed job resume
+        and progress counts every evaluated pair
+        """
         try:
             self.logger.info(f"Starting evaluation process - Demo Mode: {is_demo}")
             
@@ -260,70 +705,126 @@ class EvaluatorService:
                 caii_endpoint =  request.caii_endpoint
             )
             
-            self.logger.info(f"Loading QA pairs from: {request.import_path}")
-            with open(request.import_path, 'r') as file:
-                data = json.load(file)
+            model_name = get_model_family(request.model_id).split('.')[-1]
+            output_path = self._evaluated_output_path(f"qa_pairs_{model_name}", checkpoint)
+            stored = self._stored_evaluations(request, model_params, "pairs")
+            sample = None
+            sampling = {}
+            results_path = None
+            if self._streaming(request):
+                # Pairs are evaluated as they are read and appended to a JSONL file;
+                # only running statistics and a preview per topic stay in memory
+                results_path = os.path.splitext(output_path)[0] + ".jsonl"
+                self.logger.info(f"Streaming QA pairs from: {request.import_path} to {results_path}")
+                topic_stats: Dict[Any, _EvaluationStats] = {}
+                qa_pairs = (
+                    (item.get('Seeds'), {
+                        request.output_key: item.get(request.output_key, ''),
+                        request.output_value: item.get(request.output_value, '')
+                    })
+                    for item in self._iter_import(request.import_path)
+                )
+                try:
+                    await self._stream_evaluations(
+                        qa_pairs, "pair",
+                        lambda pair: self.evaluate_single_pair(pair, model_handler, request, request_id=request_id),
+                        lambda pairs: self.evaluate_pair_batch(pairs, model_handler, request, request_id=request_id),
+                        lambda topic: topic_stats.setdefault(topic, _EvaluationStats("pairs", keep_items=EVALUATION_STREAM_PREVIEW_ITEMS)),
+                        results_path, request, checkpoint=checkpoint, progress=progress, stored=stored, record_key='Seeds')
+                except ModelHandlerError as e:
+                    self.logger.error(f"ModelHandlerError in topic evaluation: {str(e)}")
+                    raise APIError(f"Model evaluation failed: {str(e)}")
+                evaluated_results = {topic: stats.as_dict() for topic, stats in topic_stats.items()}
+                evaluated_results['Overall_Average'] = overall_average = self._overall_average(topic_stats.values())
+                self.logger.info(f"Evaluation completed. Overall average score: {overall_average:.2f}")
+            else:
+                self.logger.info(f"Loading QA pairs from: {request.import_path}")
+                data = self._load_import(request.import_path)
             
-            evaluated_results = {}
-            all_scores = []
-
-            transformed_data = {
-                            "results": {},
-                           }
-            for item in data:
-                topic = item.get('Seeds')
+                evaluated_results = {}
+                all_scores = []
+
+                transformed_data = {
+                                "results": {},
+                               }
+                for item in data:
+                    topic = item.get('Seeds')
                 
-                # Create topic list if it doesn't exist
-                if topic not in transformed_data['results']:
-                    transformed_data['results'][topic] = []
+                    # Create topic list if it doesn't exist
+                    if topic not in transformed_data['results']:
+                        transformed_data['results'][topic] = []
                     
-                # Create QA pair
-                qa_pair = {
-                request.output_key: item.get(request.output_key, ''),  # Use get() with default value
-                request.output_value: item.get(request.output_value, '')   # Use get() with default value
-            }
-                
-                # Add to appropriate topic list
-                transformed_data['results'][topic].append(qa_pair)
-            
-            self.logger.info(f"Processing {len(transformed_data['results'])} topics with {self.max_workers} workers")
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                future_to_topic = {
-                    executor.submit(
-                        self.evaluate_topic,
-                        topic,
-                        qa_pairs,
-                        model_handler,
-                        request, request_id=request_id
-                    ): topic
-                    for topic, qa_pairs in transformed_data['results'].items()
+                    # Create QA pair
+                    qa_pair = {
+                    request.output_key: item.get(request.output_key, ''),  # Use get() with default value
+                    request.output_value: item.get(request.output_value, '')   # Use get() with default value
                 }
                 
-                for future in as_completed(future_to_topic):
-                    try:
-                        topic = future_to_topic[future]
-                        topic_stats = future.result()
-                        evaluated_results[topic] = topic_stats
-                        all_scores.extend([
-                            pair["evaluation"]["score"] 
-                            for pair in topic_stats["evaluated_pairs"]
-                        ])
-                    except ModelHandlerError as e:
-                        self.logger.error(f"ModelHandlerError in future processing: {str(e)}")
-                        raise APIError(f"Model evaluation failed: {str(e)}")
-
+                    # Add to appropriate topic list
+                    transformed_data['results'][topic].append(qa_pair)
             
-            overall_average = sum(all_scores) / len(all_scores) if all_scores else 0
-            overall_average = round(overall_average, 2)
-            evaluated_results['Overall_Average'] = overall_average
-            
-            self.logger.info(f"Evaluation completed. Overall average score: {overall_average:.2f}")
+                self.logger.info(f"Processing {len(transformed_data['results'])} topics concurrently")
+                topics = list(transformed_data['results'].keys())
+                if progress is not None:
+                    if request.ci_half_width is None:
+                        progress.set_total(len(data), items=len(data))
+                    else:
+                        progress.set_total(0)
+                # Every (topic, pair) is a unit of one shared scheduler; topic statistics
+                # accumulate as their pairs complete
+                try:
+                    if request.ci_half_width is None:
+                        lanes = [
+                            self._pair_lane(transformed_data['results'][topic], model_handler, request, request_id,
+                                            checkpoint, f"topic/{i}", progress, stored)
+                            for i, topic in enumerate(topics)
+                        ]
+                        await self._run_lanes(lanes, request.model_id)
+                        all_topic_stats = [lane.stats.as_dict() for lane in lanes]
+                    else:
+                        topic_stats_parts = [_EvaluationStats("pairs") for _ in topics]
+                        sample = await self._evaluate_sample(
+                            [list(range(len(transformed_data['results'][topic]))) for topic in topics],
+                            topic_stats_parts,
+                            lambda i, positions: self._pair_lane(
+                                transformed_data['results'][topics[i]], model_handler, request, request_id,
+                                checkpoint, f"topic/{i}", progress, stored, stats=topic_stats_parts[i], positions=positions),
+                            request, progress)
+                        all_topic_stats = [
+                            {**part.as_dict(),
+                             "population_size": sample.sizes[i],
+                             "sample_size": sample.drawn[i],
+                             "ci_half_width": self._finite(sample.stratum_half_width(i))}
+                            for i, part in enumerate(topic_stats_parts)
+                        ]
+                except ModelHandlerError as e:
+                    self.logger.error(f"ModelHandlerError in topic evaluation: {str(e)}")
+                    raise APIError(f"Model evaluation failed: {str(e)}")
+
+                for topic, topic_stats in zip(topics, all_topic_stats):
+                    evaluated_results[topic] = topic_stats
+                    all_scores.extend([
+                        pair["evaluation"]["score"] 
+                        for pair in topic_stats["evaluated_pairs"]
+                    ])
+
             
+                overall_average = sum(all_scores) / len(all_scores) if all_scores else 0
+                if sample is not None:
+                    # A sample drawn unevenly across topics is weighted back to the topic sizes
+                    overall_average = sample.mean()
+                overall_average = round(overall_average, 2)
+                evaluated_results['Overall_Average'] = overall_average
+                sampling = self._sampling_summary(sample, request)
+                evaluated_results.update(sampling)
             
+                self.logger.info(f"Evaluation completed. Overall average score: {overall_average:.2f}")
+                if sampling:
+                    self.logger.info(f"Sampled {sampling['sample_size']} of {sampling['population_size']} pairs, "
+                                     f"CI half-width {sampling['ci_half_width']} at level {sampling['ci_level']}")
+            self.logger.info(f"Reused {stored.reused} stored evaluations, resumed {stored.resumed} checkpointed "
+                             f"and scored {stored.scored} pairs fresh")
             timestamp = datetime.now(timezone.utc).isoformat()
-            time_file = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3] 
-            model_name = get_model_family(request.model_id).split('.')[-1]
-            output_path = f"qa_pairs_{model_name}_{time_file}_evaluated.json"
             
             self.logger.info(f"Saving evaluation results to: {output_path}")
             with open(output_path, 'w') as f:
@@ -356,7 +857,11 @@ class EvaluatorService:
                 'display_name': request.display_name,
                 'local_export_path': output_path,
                 'examples': examples_str,
-                'Overall_Average': overall_average
+                'Overall_Average': overall_average,
+                'average_score_ci_half_width': sampling.get('ci_half_width'),
+                'ci_level': sampling.get('ci_level'),
+                'sample_size': sampling.get('sample_size'),
+                'results_path': results_path
             }
             
             self.logger.info("Saving evaluation metadata to database")
@@ -367,18 +872,30 @@ class EvaluatorService:
                 return {
                     "status": "completed",
                     "result": evaluated_results,
-                    "output_path": output_path
+                    "output_path": output_path,
+                    "reused_evaluations": stored.reused,
+                    "fresh_evaluations": stored.scored,
+                    "resumed_evaluations": stored.resumed,
+                    **({"results_path": results_path} if results_path else {}),
+                    **sampling
                 }
             else:
 
                 
                 job_status = "ENGINE_SUCCEEDED"
                 evaluate_file_name = os.path.basename(output_path)
-                self.db.update_job_evaluate(job_name, evaluate_file_name, output_path, timestamp, overall_average, job_status)
+                self.db.update_job_evaluate(job_name, evaluate_file_name, output_path, timestamp, overall_average, job_status,
+                                            ci_half_width=sampling.get('ci_half_width'), ci_level=sampling.get('ci_level'),
+                                            sample_size=sampling.get('sample_size'), results_path=results_path)
                 self.db.backup_and_restore_db()
                 return {
                     "status": "completed",
-                    "output_path": output_path
+                    "output_path": output_path,
+                    "reused_evaluations": stored.reused,
+                    "fresh_evaluations": stored.scored,
+                    "resumed_evaluations": stored.resumed,
+                    **({"results_path": results_path} if results_path else {}),
+                    **sampling
                 }
         except APIError:
             raise   
@@ -401,7 +918,7 @@ class EvaluatorService:
                 
                 raise
 
-    def evaluate_single_row(self, row: Dict[str, Any], model_handler, request: EvaluationRequest, request_id = None) -> Dict:
+    async def evaluate_single_row(self, row: Dict[str, Any], model_handler, request: EvaluationRequest, request_id = None) -> Dict:
         """Evaluate a single data row"""
         try:
             # Default error response
@@ -434,9 +951,9 @@ class EvaluatorService:
                 return error_response
 
             try:
-                response = model_handler.generate_response(prompt, request_id=request_id)
+                response = await model_handler.agenerate_response(prompt, request_id=request_id)
             except ModelHandlerError as e:
-                self.logger.error(f"ModelHandlerError in generate_response: {str(e)}")
+                self.logger.error(f"ModelHandlerError in agenerate_response: {str(e)}")
                 raise  
             except Exception as e:
                 error_msg = f"Error generating model response: {str(e)}"
@@ -479,90 +996,46 @@ class EvaluatorService:
             self.logger.error(f"Critical error in evaluate_single_row: {str(e)}")
             return error_response
         
-    #@track_llm_operation("evaluate_all_rows")
-    def evaluate_rows(self, rows: List[Dict[str, Any]], model_handler, request: EvaluationRequest, request_id=None) -> Dict:
-        """Evaluate all data rows in parallel"""
+    async def evaluate_row_batch(self, rows: List[Dict[str, Any]], model_handler, request: EvaluationRequest, request_id=None) -> Dict[int, Dict]:
+        """
+        Evaluate several data rows in one call; returns the results by position in rows.
+        Rows the reply left out or malformed are missing from the result.
+        """
+        prompt_rows = [{"id": str(k), "row": row} for k, row in enumerate(rows)]
         try:
-            self.logger.info(f"Starting row evaluation with {len(rows)} rows")
-            evaluated_rows = []
-            failed_rows = []
-
-            try:
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    try:
-                        evaluate_func = partial(
-                            self.evaluate_single_row,
-                            model_handler=model_handler,
-                            request=request, request_id=request_id
-                        )
-                        
-                        future_to_row = {
-                            executor.submit(evaluate_func, row): row 
-                            for row in rows
-                        }
-                        
-                        for future in as_completed(future_to_row):
-                            try:
-                                result = future.result()
-                                evaluated_rows.append(result)
-                            except ModelHandlerError:
-                                raise  
-                            except Exception as e:
-                                error_msg = f"Error processing future result: {str(e)}"
-                                self.logger.error(error_msg)
-                                failed_rows.append({
-                                    "error": error_msg,
-                                    "row": future_to_row[future]
-                                })
-                                
-                    except Exception as e:
-                        error_msg = f"Error in parallel execution: {str(e)}"
-                        self.logger.error(error_msg)
-                        raise
-
-            except ModelHandlerError:
-                raise              
-            except Exception as e:
-                error_msg = f"Error in ThreadPoolExecutor setup: {str(e)}"
-                self.logger.error(error_msg)
-                raise
+            self.logger.info(f"Evaluating {len(rows)} rows in one call")
+            prompt = PromptBuilder.build_freeform_batch_eval_prompt(
+                request.model_id,
+                request.use_case,
+                prompt_rows,
+                request.examples,
+                request.custom_prompt
+            )
+            response = await model_handler.agenerate_response(prompt, request_id=request_id)
+        except ModelHandlerError as e:
+            self.logger.error(f"ModelHandlerError in agenerate_response: {str(e)}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Error in batched row evaluation: {str(e)}")
+            return {}
 
-            try:
-                # Calculate statistics only from successful evaluations
-                scores = [row["evaluation"]["score"] for row in evaluated_rows if row.get("evaluation", {}).get("score") is not None]
-                
-                if scores:
-                    average_score = sum(scores) / len(scores)
-                    average_score = round(average_score, 2)
-                    min_score = min(scores)
-                    max_score = max(scores)
-                else:
-                    average_score = min_score = max_score = 0
-
-                evaluation_stats = {
-                    "average_score": average_score,
-                    "min_score": min_score,
-                    "max_score": max_score,
-                    "evaluated_rows": evaluated_rows,
-                    "failed_rows": failed_rows,
-                    "total_evaluated": len(evaluated_rows),
-                    "total_failed": len(failed_rows)
-                }
-                
-                self.logger.info(f"Completed row evaluation. Average score: {evaluation_stats['average_score']:.2f}")
-                return evaluation_stats
+        return {
+            k: {"row": rows[k], "evaluation": evaluation}
+            for k, evaluation in self._parse_batch_evaluations(response, [r["id"] for r in prompt_rows]).items()
+        }
 
-            except Exception as e:
-                error_msg = f"Error calculating evaluation statistics: {str(e)}"
-                self.logger.error(error_msg)
-                return {
-                    "average_score": 0,
-                    "min_score": 0,
-                    "max_score": 0,
-                    "evaluated_rows": evaluated_rows,
-                    "failed_rows": failed_rows,
-                    "error": error_msg
-                }
+    #@track_llm_operation("evaluate_all_rows")
+    async def evaluate_rows(self, rows: List[Dict[str, Any]], model_handler, request: EvaluationRequest, request_id=None,
+                            checkpoint: Optional[JobCheckpoint] = None, progress: Optional[JobProgress] = None,
+                            stored: Optional[_StoredEvaluations] = None) -> Dict:
+        """Evaluate all data rows in parallel; with a checkpoint, row i is unit `row/<i>`"""
+        try:
+            self.logger.info(f"Starting row evaluation with {len(rows)} rows")
+            lane = self._row_lane(rows, model_handler, request, request_id, checkpoint, progress, stored)
+            await self._run_lanes([lane], request.model_id)
+            evaluation_stats = lane.stats.as_dict()
+            self.logger.info(f"Completed row evaluation. Average score: {evaluation_stats['average_score']:.2f}")
+            return evaluation_stats
         except ModelHandlerError:
             raise  
         except Exception as e:
@@ -578,8 +1051,12 @@ class EvaluatorService:
             }
         
     #@track_llm_operation("evaluate_freeform_data")
-    def evaluate_row_data(self, request: EvaluationRequest, job_name=None, is_demo: bool = True, request_id = None) -> Dict:
-        """Evaluate rows of data with parallel processing"""
+    async def evaluate_row_data(self, request: EvaluationRequest, job_name=None, is_demo: bool = True, request_id = None,
+                                checkpoint: Optional[JobCheckpoint] = None, progress: Optional[JobProgress] = None) -> Dict:
+        """
+        Evaluate rows of data with parallel processing; a checkpoint lets a failed job resume
+        and progress counts every evaluated row
+        """
         try:
             self.logger.info(f"Starting row evaluation process - Demo Mode: {is_demo}")
             
@@ -594,27 +1071,69 @@ class EvaluatorService:
                 caii_endpoint=request.caii_endpoint
             )
             
-            self.logger.info(f"Loading data rows from: {request.import_path}")
-            with open(request.import_path, 'r') as file:
-                data = json.load(file)
-            
-            # Ensure data is a list of rows
-            rows = data if isinstance(data, list) else [data]
-            
-            # Evaluate all rows
-            evaluated_results = self.evaluate_rows(rows, model_handler, request, request_id=request_id)
-            all_scores = [row["evaluation"]["score"] for row in evaluated_results["evaluated_rows"]]
-            
-            overall_average = sum(all_scores) / len(all_scores) if all_scores else 0
-            overall_average = round(overall_average, 2)
+            model_name = get_model_family(request.model_id).split('.')[-1]
+            output_path = self._evaluated_output_path(f"row_data_{model_name}", checkpoint)
+            stored = self._stored_evaluations(request, model_params, "rows")
+            sample = None
+            results_path = None
+            if self._streaming(request):
+                # Rows are evaluated as they are read and appended to a JSONL file;
+                # only running statistics and a preview stay in memory
+                results_path = os.path.splitext(output_path)[0] + ".jsonl"
+                self.logger.info(f"Streaming data rows from: {request.import_path} to {results_path}")
+                row_stats = _EvaluationStats("rows", keep_items=EVALUATION_STREAM_PREVIEW_ITEMS)
+                await self._stream_evaluations(
+                    ((None, row) for row in self._iter_import(request.import_path)), "row",
+                    lambda row: self.evaluate_single_row(row, model_handler, request, request_id=request_id),
+                    lambda rows: self.evaluate_row_batch(rows, model_handler, request, request_id=request_id),
+                    lambda _: row_stats,
+                    results_path, request, checkpoint=checkpoint, progress=progress, stored=stored)
+                evaluated_results = row_stats.as_dict()
+                overall_average = self._overall_average([row_stats])
+            else:
+                self.logger.info(f"Loading data rows from: {request.import_path}")
+                data = self._load_import(request.import_path)
+
+                # Ensure data is a list of rows
+                rows = data if isinstance(data, list) else [data]
+
+                # Evaluate all rows
+                if request.ci_half_width is None:
+                    if progress is not None:
+                        progress.set_total(len(rows), items=len(rows))
+                    evaluated_results = await self.evaluate_rows(rows, model_handler, request, request_id=request_id,
+                                                                 checkpoint=checkpoint, progress=progress, stored=stored)
+                else:
+                    if progress is not None:
+                        progress.set_total(0)
+                    # Rows are stratified by the topic they were generated from, when they carry one
+                    strata: Dict[Any, List[int]] = {}
+                    for i, row in enumerate(rows):
+                        seed = row.get('Seeds') if isinstance(row, dict) else None
+                        strata.setdefault(json.dumps(seed, sort_keys=True, default=str), []).append(i)
+                    stratum_stats = [_EvaluationStats("rows") for _ in strata]
+                    sample = await self._evaluate_sample(
+                        list(strata.values()),
+                        stratum_stats,
+                        lambda h, positions: self._row_lane(rows, model_handler, request, request_id, checkpoint, progress,
+                                                            stored, stats=stratum_stats[h], positions=positions),
+                        request, progress)
+                    evaluated_results = _EvaluationStats.combine(stratum_stats, "rows").as_dict()
+                all_scores = [row["evaluation"]["score"] for row in evaluated_results["evaluated_rows"]]
+
+                overall_average = sum(all_scores) / len(all_scores) if all_scores else 0
+                if sample is not None:
+                    overall_average = sample.mean()
+                overall_average = round(overall_average, 2)
             evaluated_results['Overall_Average'] = overall_average
+            sampling = self._sampling_summary(sample, request)
+            evaluated_results.update(sampling)
             
             self.logger.info(f"Row evaluation completed. Overall average score: {overall_average:.2f}")
+            self.logger.info(f"Reused {stored.reused} stored evaluations, resumed {stored.resumed} checkpointed "
+                             f"and scored {stored.scored} rows fresh")
             
             timestamp = datetime.now(timezone.utc).isoformat()
-            time_file = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3] 
-            model_name = get_model_family(request.model_id).split('.')[-1]
-            output_path = f"row_data_{model_name}_{time_file}_evaluated.json"
             
             self.logger.info(f"Saving row evaluation results to: {output_path}")
             with open(output_path, 'w') as f:
@@ -646,6 +1165,10 @@ class EvaluatorService:
                 'local_export_path': output_path,
                 'examples': examples_str,
                 'Overall_Average': overall_average,
+                'average_score_ci_half_width': sampling.get('ci_half_width'),
+                'ci_level': sampling.get('ci_level'),
+                'sample_size': sampling.get('sample_size'),
+                'results_path': results_path,
                 'evaluation_type': 'row'
             }
             
@@ -656,16 +1179,28 @@ class EvaluatorService:
                 return {
                     "status": "completed",
                     "result": evaluated_results,
-                    "output_path": output_path
+                    "output_path": output_path,
+                    "reused_evaluations": stored.reused,
+                    "fresh_evaluations": stored.scored,
+                    "resumed_evaluations": stored.resumed,
+                    **({"results_path": results_path} if results_path else {}),
+                    **sampling
                 }
             else:
                 job_status = "ENGINE_SUCCEEDED"
                 evaluate_file_name = os.path.basename(output_path)
-                self.db.update_job_evaluate(job_name, evaluate_file_name, output_path, timestamp, overall_average, job_status)
+                self.db.update_job_evaluate(job_name, evaluate_file_name, output_path, timestamp, overall_average, job_status,
+                                            ci_half_width=sampling.get('ci_half_width'), ci_level=sampling.get('ci_level'),
+                                            sample_size=sampling.get('sample_size'), results_path=results_path)
                 self.db.backup_and_restore_db()
                 return {
                     "status": "completed",
-                    "output_path": output_path
+                    "output_path": output_path,
+                    "reused_evaluations": stored.reused,
+                    "fresh_evaluations": stored.scored,
+                    "resumed_evaluations": stored.resumed,
+                    **({"results_path": results_path} if results_path else {}),
+                    **sampling
                 }
         except APIError:
             raise      
@@ -16,6 +16,7 @@ from app.models.request_models import  Export_synth
 
 from app.core.database import DatabaseManager
 from app.services.s3_export import export_to_s3
+from app.core.result_writer import ensure_json_array, iter_jsonl
 
 import logging
 from logging.handlers import RotatingFileHandler
@@ -106,6 +107,10 @@ class Export_Service:
         try:
             export_paths = {}
             file_name = os.path.basename(request.file_path)
+            # A streaming mode evaluation exports every result from its JSONL file, not the preview summary
+            results_path = (self.db.get_evaldata_by_filename(file_name) or {}).get('results_path')
+            if not (results_path and os.path.exists(results_path)):
+                results_path = None
             
             for export_type in request.export_type:
                 # S3 Export
@@ -116,11 +121,11 @@ class Export_Service:
                     try:
                         # Get bucket and key from request
                         bucket_name = request.s3_config.bucket
-                        key = request.s3_config.key or file_name
+                        key = request.s3_config.key or (os.path.basename(results_path) if results_path else file_name)
                         
                         # Override with display_name if provided
                         if request.display_name and not request.s3_config.key:
-                            key = f"{request.display_name}.json"
+                            key = f"{request.display_name}.jsonl" if results_path else f"{request.display_name}.json"
                         
                         
                         
@@ -128,7 +133,7 @@ class Export_Service:
                         create_bucket = getattr(request.s3_config, 'create_if_not_exists', True)
                         
                         s3_result = export_to_s3(
-                            file_path=request.file_path,
+                            file_path=results_path or ensure_json_array(request.file_path),
                             bucket_name=bucket_name,
                             key=key,
                             create_bucket=create_bucket
@@ -151,8 +156,11 @@ class Export_Service:
                 elif export_type == "huggingface" and request.hf_config:
                     # We still need to read the file for HuggingFace export
                     try:
-                        with open(request.file_path, 'r') as f:
-                            output_data = json.load(f)
+                        if results_path:
+                            output_data = list(iter_jsonl(results_path))
+                        else:
+                            with open(ensure_json_array(request.file_path), 'r') as f:
+                                output_data = json.load(f)
                     except FileNotFoundError:
                         raise HTTPException(status_code=404, detail=f"File not found: {request.file_path}")
                     except json.JSONDecodeError as e:
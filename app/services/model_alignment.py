@@ -1,9 +1,6 @@
 import logging
 from logging.handlers import RotatingFileHandler
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from functools import partial
-
 import asyncio
 from datetime import datetime, timezone
 from typing import Dict, Optional
@@ -15,7 +12,7 @@ from app.services.aws_bedrock import get_bedrock_client
 from app.core.model_handlers import create_handler
 from app.core.database import DatabaseManager
 from app.core.exceptions import APIError
-import json
+from app.core.result_writer import iter_json_array
 
 class ModelAlignment:
     """Service for aligning model outputs through synthesis and evaluation"""
@@ -86,39 +83,21 @@ class ModelAlignment:
             model_handler = create_handler(synthesis_request.model_id, self.bedrock_client, model_params = model_params, inference_type = synthesis_request.inference_type, caii_endpoint =  synthesis_request.caii_endpoint, custom_p = True)
 
             path = synthesis_request.input_path
-            inputs = []
-            initial_response = []
-            with open(path[0]) as f:
-                data = json.load(f)
-                inputs.extend(item.get(synthesis_request.output_key, '') for item in data)
-                initial_response.extend(item.get(synthesis_request.output_value, '') for item in data)
-
-            MAX_WORKERS = 5
-            
-            
-            # Create thread pool
-            print(MAX_WORKERS)
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                # Create futures for each input
-                input_futures = [
-                    loop.run_in_executor(
-                        executor,
-                        lambda x: asyncio.run(self.synthesis_service.process_single_input(x, model_handler, synthesis_request)),
-                        input
-                    )
-                    for input in inputs
-                ]
-                
-                # Wait for all futures to complete
-                final_output = await asyncio.gather(*input_futures)
-            
+            result = []
+
+            async def process_row(index, row):
+                item = await self.synthesis_service.process_single_input(
+                    row.get(synthesis_request.output_key, ''), model_handler, synthesis_request)
+                return {
+                    synthesis_request.output_key: item['question'],
+                    synthesis_request.output_value: row.get(synthesis_request.output_value, ''),
+                    "Alternate_Completion": item['solution']
+                }
 
-            result = [{
-                            synthesis_request.output_key: item['question'],  
-                            synthesis_request.output_value: init_resp,  
-                            "Alternate_Completion": item['solution']
-                        } for item, init_resp in zip(final_output, initial_response)]
+            # Rows stream from the input file through a bounded window and keep input order
+            await self.synthesis_service.run_inputs(
+                iter_json_array(path[0]), process_row,
+                lambda index, item: result.append(item), synthesis_request.model_id)
             return result
         
         except Exception as e:
@@ -151,41 +130,40 @@ class ModelAlignment:
             }
                 qa_pairs.append(qa_pair)
                 
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                try:
-                    # Create list of futures for parallel execution
-                    evaluated_pairs = []
-                    failed_pairs = []
-                    futures = [
-                        executor.submit(
-                            self.evaluator_service.evaluate_single_pair,
+            try:
+                # Evaluate all pairs concurrently; results keep the input order
+                evaluated_pairs = []
+                failed_pairs = []
+                results = await asyncio.gather(
+                    *[
+                        self.evaluator_service.evaluate_single_pair(
                             qa_pair=pair,
                             model_handler=model_handler,
                             request=evaluation_request
-                        ) 
+                        )
                         for pair in qa_pairs
-                    ]
-                    
-                    # Process completed futures
-                    for future in as_completed(futures):
-                        try:
-                            result = future.result()
-                            evaluated_pairs.append(result)
-                        except Exception as e:
-                            error_msg = f"Error processing evaluation result: {str(e)}"
-                            self.logger.error(error_msg)
-                            failed_pairs.append({
-                                "error": error_msg,
-                                "pair": qa_pairs[futures.index(future)]  # Get original pair that failed
-                            })
-                    scores = [pair["evaluation"]["score"] for pair in evaluated_pairs if pair.get("evaluation", {}).get("score") is not None]  
-
-                    return scores
-                    
-                except Exception as e:
-                    error_msg = f"Error in parallel evaluation execution: {str(e)}"
-                    self.logger.error(error_msg)
-                    raise
+                    ],
+                    return_exceptions=True
+                )
+
+                for pair, result in zip(qa_pairs, results):
+                    if isinstance(result, Exception):
+                        error_msg = f"Error processing evaluation result: {str(result)}"
+                        self.logger.error(error_msg)
+                        failed_pairs.append({
+                            "error": error_msg,
+                            "pair": pair
+                        })
+                    else:
+                        evaluated_pairs.append(result)
+                scores = [pair["evaluation"]["score"] for pair in evaluated_pairs if pair.get("evaluation", {}).get("score") is not None]  
+
+                return scores
+                
+            except Exception as e:
+                error_msg = f"Error in parallel evaluation execution: {str(e)}"
+                self.logger.error(error_msg)
+                raise
 
     async def model_alignment(self,
         synthesis_request: SynthesisRequest,
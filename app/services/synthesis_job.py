@@ -17,6 +17,8 @@ from app.services.aws_bedrock import get_bedrock_client
 from app.migrations.alembic_manager import AlembicMigrationManager
 from app.core.config import responses, caii_check
 from app.core.path_manager import PathManager
+from app.core.checkpoint import JobCheckpoint
+from app.core.result_writer import ensure_json_array
 from app.core.telemetry import telemetry_manager
 from app.core.telemetry_integration import track_job
 import cmlapi
@@ -205,6 +207,20 @@ class SynthesisJob:
         self.db_manager.save_evaluation_metadata(metadata)
         return {"job_name": job_name, "job_id": job_run.job_id}
 
+    def resume_job(self, job_id: str) -> Dict[str, str]:
+        """Re-run a failed generation or evaluation job, reusing the work its checkpoint recorded"""
+        job = self.client_cml.get_job(self.project_id, job_id)
+        if not JobCheckpoint.exists(job.name):
+            raise APIError(f"Job {job.name} has no checkpoint to resume from", status_code=404)
+
+        # The job script reads its parameters back from the checkpoint
+        self.client_cml.create_job_run(
+            cmlapi.CreateJobRunRequest(environment={'resume_job': job.name}),
+            project_id=self.project_id,
+            job_id=job_id
+        )
+        return {"job_name": job.name, "job_id": job_id}
+
     #@track_job("export")
     # In the file containing synthesis_job
     def export_job(self, request: Any, cpu: int = 2, memory: int = 4) -> Dict[str, str]:
@@ -279,7 +295,7 @@ class SynthesisJob:
             inputs = []
             for path in request.input_path:
                 try:
-                    with open(path) as f:
+                    with open(ensure_json_array(path)) as f:
                         data = json.load(f)
                         inputs.extend(item.get(request.input_key, '') for item in data)
                 except Exception as e:
@@ -3,12 +3,12 @@ import json
 import uuid
 import time
 import csv
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Callable, Any, Awaitable, Iterable, Iterator
+import inspect
 import uuid
 from datetime import datetime, timezone
 import os
 from huggingface_hub import HfApi, HfFolder, Repository
-from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 import math
 import asyncio
@@ -20,8 +20,15 @@ import numpy as np
 
 from app.models.request_models import SynthesisRequest, Example, ModelParameters
 from app.core.model_handlers import create_handler
+from app.core.concurrency import get_concurrency_controller
+from app.core.work_scheduler import WorkLane, WorkUnitScheduler, OrderedInputLane
+from app.core.dedup import MinHashIndex
+from app.core.result_writer import JsonlResultWriter, iter_result_file
+from app.core.checkpoint import JobCheckpoint
+from app.core.progress import JobProgress
+from app.core.token_estimator import count_tokens
 from app.core.prompt_templates import PromptBuilder, PromptHandler
-from app.core.config import UseCase, Technique, get_model_family
+from app.core.config import UseCase, Technique, get_model_family, QA_PAIR_SCHEMA, freeform_item_schema, GENERATION_REBATCH_MAX_ROUNDS, GENERATION_REBATCH_MARGIN, GENERATION_OMIT_HINT_TOKENS, GENERATE_RESULT_MAX_PENDING
 from app.services.aws_bedrock import get_bedrock_client
 from app.core.database import DatabaseManager
 from app.services.check_guardrail import ContentGuardrail
@@ -29,14 +36,133 @@ from app.services.doc_extraction import DocumentProcessor
 import logging
 from logging.handlers import RotatingFileHandler
 import traceback
+from app.core.telemetry import telemetry_manager
 from app.core.telemetry_integration import track_llm_operation
 import uuid 
 
 
+class _TopicLane(WorkLane):
+    """
+    The batches of one topic as scheduler work units.
+
+    Units share the topic's omit list, results and remaining count; each
+    claims its batch size when issued so overlapping units never ask for
+    more than the topic still needs. A unit that comes back short queues one
+    remainder unit for the missing items, for up to max_rounds rounds.
+    Lanes of one job share a dedup index so duplicates across topics are dropped too,
+    and a result writer that receives outputs as they validate; without
+    keep_results (non-demo jobs) the lane only counts what it hands to the writer.
+    With a checkpoint, every accepted batch is recorded as unit `<unit_prefix>/<n>`,
+    and a job progress report is told about each finished batch. on_done (sync or
+    async) is called once with the lane when its last unit finishes.
+    """
+
+    def __init__(self, topic: str, num_questions: int, batch_size: int,
+                 run_batch: Callable[["_TopicLane", int, int, int], Awaitable[int]],
+                 max_rounds: int = GENERATION_REBATCH_MAX_ROUNDS, dedup: Optional[MinHashIndex] = None,
+                 writer: Optional[JsonlResultWriter] = None, keep_results: bool = True,
+                 checkpoint: Optional[JobCheckpoint] = None, unit_prefix: str = "",
+                 progress: Optional[JobProgress] = None,
+                 on_done: Optional[Callable[["_TopicLane"], Any]] = None):
+        self.topic = topic
+        self.batch_size = batch_size
+        self.max_rounds = max_rounds
+        self.questions_remaining = num_questions
+        self._num_questions = num_questions
+        self.omit_questions: List[str] = []
+        self.results: List[Dict] = []
+        self.output: List[Dict] = []
+        self.errors: List[str] = []
+        self.dedup = dedup if dedup is not None else MinHashIndex()
+        self.writer = writer
+        self.keep_results = keep_results
+        self.checkpoint = checkpoint
+        self.unit_prefix = unit_prefix
+        self.progress = progress
+        self.on_done = on_done
+        self.accepted = 0
+        self.calls = 0
+        self.omit_tokens_saved = 0
+        self._run_batch = run_batch
+        self._unissued = num_questions
+        self._remainders: List[Tuple[int, int]] = []
+        self._claimed = 0
+        self._recorded_units = 0
+        self._finished = False
+
+    def has_work(self) -> bool:
+        return bool(self._unissued > 0 or self._remainders) and self.questions_remaining - self._claimed > 0
+
+    def remaining_units(self) -> int:
+        return math.ceil(self._unissued / self.batch_size) + len(self._remainders)
+
+    def next_unit(self) -> Awaitable[None]:
+        # Remainders of earlier batches go first so the topic fills in order
+        batch_idx = self._num_questions - self._unissued
+        if self._remainders:
+            missing, rebatch_round = self._remainders.pop(0)
+            batch_size = min(missing, self.questions_remaining - self._claimed)
+        else:
+            rebatch_round = 0
+            batch_size = min(self.batch_size, self._unissued, self.questions_remaining - self._claimed)
+            self._unissued -= batch_size
+        self._claimed += batch_size
+        return self._unit(batch_idx, batch_size, rebatch_round)
+
+    async def _unit(self, batch_idx: int, batch_size: int, rebatch_round: int) -> None:
+        accepted = 0
+        self.calls += 1
+        try:
+            accepted = await self._run_batch(self, batch_idx, batch_size, rebatch_round)
+        finally:
+            self._claimed -= batch_size
+        if self.progress is not None:
+            self.progress.unit_done(accepted, fallback=rebatch_round > 0)
+        if accepted < batch_size and rebatch_round < self.max_rounds:
+            self._remainders.append((batch_size - accepted, rebatch_round + 1))
+            if self.progress is not None:
+                self.progress.add_units()
+        if self.on_done is not None and not self._finished and self._claimed == 0 and not self.has_work():
+            self._finished = True
+            done = self.on_done(self)
+            if inspect.isawaitable(done):
+                await done
+
+    def add_results(self, results: List[Dict], outputs: List[Dict]):
+        """Account for validated items and hand their outputs to the writer"""
+        self.questions_remaining -= len(results)
+        self.accepted += len(results)
+        if self.keep_results:
+            self.results.extend(results)
+            self.output.extend(outputs)
+        if self.writer is not None:
+            self.writer.write_many(outputs)
+        if self.checkpoint is not None:
+            self.checkpoint.record_unit(f"{self.unit_prefix}/{self._recorded_units}", outputs)
+            self._recorded_units += 1
+
+    def restore(self, units: List[List[Dict]], dedup_text: Callable[[Dict], str]):
+        """Replay the batches a previous run of the job checkpointed for this topic"""
+        outputs = [output for unit in units for output in unit]
+        results = [{k: v for k, v in output.items() if k != 'Topic'} for output in outputs]
+        for result in results:
+            self.dedup.add_if_new(dedup_text(result))
+        self.omit_questions = (self.omit_questions + [dedup_text(result) for result in results])[-100:]
+        self._unissued = max(0, self._unissued - len(results))
+        self._recorded_units = len(units)
+        checkpoint, self.checkpoint = self.checkpoint, None
+        try:
+            self.add_results(results, outputs)
+        finally:
+            self.checkpoint = checkpoint
+
+    def result(self) -> Tuple[str, List[Dict], List[str], List[Dict]]:
+        return self.topic, self.results, self.errors, self.output
+
+
 class SynthesisService:
     """Service for generating synthetic QA pairs"""
     QUESTIONS_PER_BATCH = 5  # Maximum questions per batch
-    MAX_CONCURRENT_TOPICS = 5  # Limit concurrent I/O operations
 
 
     def __init__(self):
@@ -82,16 +208,19 @@ class SynthesisService:
 
     
     #@track_llm_operation("process_single_topic")
-    def process_single_topic(self, topic: str, model_handler: any, request: SynthesisRequest, num_questions: int, request_id=None) -> Tuple[str, List[Dict], List[str], List[Dict]]:
+    async def process_single_topic(self, topic: str, model_handler: any, request: SynthesisRequest, num_questions: int, request_id=None, on_item: Optional[Callable[[Dict], Any]] = None) -> Tuple[str, List[Dict], List[str], List[Dict]]:
         """
         Process a single topic to generate questions and solutions.
-        Attempts batch processing first (default 5 questions), falls back to single question processing if batch fails.
+        Attempts batch processing first (default 5 questions), then re-batches the questions
+        a batch came up short in one call per round, up to GENERATION_REBATCH_MAX_ROUNDS rounds.
         
         Args:
             topic: The topic to generate questions for
             model_handler: Handler for the AI model
             request: The synthesis request object
             num_questions: Total number of questions to generate
+            on_item: Optional callback (sync or async); when set, responses are streamed
+                and each valid output item is passed to it as soon as it is parsed
         
         Returns:
             Tuple containing:
@@ -103,161 +232,13 @@ class SynthesisService:
         Raises:
             ModelHandlerError: When there's an error in model generation that should stop processing
         """
-        topic_results = []
-        topic_output = []
-        topic_errors = []
-        questions_remaining = num_questions
-        omit_questions = []
-        
+        lane = _TopicLane(topic, num_questions, self.QUESTIONS_PER_BATCH,
+                          partial(self._process_topic_batch, model_handler=model_handler, request=request,
+                                  request_id=request_id, on_item=on_item))
         try:
             # Process questions in batches
-            for batch_idx in range(0, num_questions, self.QUESTIONS_PER_BATCH):
-                if questions_remaining <= 0:
-                    break
-                    
-                batch_size = min(self.QUESTIONS_PER_BATCH, questions_remaining)
-                self.logger.info(f"Processing topic: {topic}, attempting batch {batch_idx+1}-{batch_idx+batch_size}")
-                
-                try:
-                    # Attempt batch processing
-                    prompt = PromptBuilder.build_prompt(
-                        model_id=request.model_id,
-                        use_case=request.use_case,
-                        topic=topic,
-                        num_questions=batch_size,
-                        omit_questions=omit_questions,
-                        examples=request.examples or [],
-                        technique=request.technique,
-                        schema=request.schema,
-                        custom_prompt=request.custom_prompt,
-                    )
-                   # print("prompt :", prompt)
-                    batch_qa_pairs = None
-                    try:
-                        batch_qa_pairs = model_handler.generate_response(prompt, request_id=request_id)
-                    except ModelHandlerError as e:
-                        self.logger.warning(f"Batch processing failed: {str(e)}")
-                        if isinstance(e, JSONParsingError):
-                            # For JSON parsing errors, fall back to single processing
-                            self.logger.info("JSON parsing failed, falling back to single processing")
-                            continue
-                        else:
-                            # For other model errors, propagate up
-                            raise
-                    
-                    if batch_qa_pairs:
-                        # Process batch results
-                        valid_pairs = []
-                        valid_outputs = []
-                        invalid_count = 0
-                        
-                        for pair in batch_qa_pairs:
-                            if self._validate_qa_pair(pair):
-                                valid_pairs.append({
-                                    "question": pair["question"],
-                                    "solution": pair["solution"]
-                                })
-                                valid_outputs.append({
-                                    "Topic": topic,
-                                    "question": pair["question"],
-                                    "solution": pair["solution"]
-                                })
-                                omit_questions.append(pair["question"])
-                            #else:
-                        invalid_count = batch_size - len(valid_pairs)
-                        
-                        if valid_pairs:
-                            topic_results.extend(valid_pairs)
-                            topic_output.extend(valid_outputs)
-                            questions_remaining -= len(valid_pairs)
-                            omit_questions = omit_questions[-100:]  # Keep last 100 questions
-                            self.logger.info(f"Successfully generated {len(valid_pairs)} questions in batch for topic {topic}")
-                        print("invalid_count:", invalid_count, '\n', "batch_size: ", batch_size, '\n', "valid_pairs: ", len(valid_pairs))
-                        # If all pairs were valid, skip fallback
-                        if invalid_count <= 0:
-                            continue
-                    
-                        else:
-                            # Fall back to single processing for remaining or failed questions
-                            self.logger.info(f"Falling back to single processing for remaining questions in topic {topic}")
-                            remaining_batch = invalid_count
-                            print("remaining_batch:", remaining_batch, '\n', "batch_size: ", batch_size, '\n', "valid_pairs: ", len(valid_pairs))
-                            for _ in range(remaining_batch):
-                                if questions_remaining <= 0:
-                                    break
-                                    
-                                try:
-                                    # Single question processing
-                                    prompt = PromptBuilder.build_prompt(
-                                        model_id=request.model_id,
-                                        use_case=request.use_case,
-                                        topic=topic,
-                                        num_questions=1,
-                                        omit_questions=omit_questions,
-                                        examples=request.examples or [],
-                                        technique=request.technique,
-                                        schema=request.schema,
-                                        custom_prompt=request.custom_prompt,
-                                    )
-                                    
-                                    try:
-                                        single_qa_pairs = model_handler.generate_response(prompt, request_id=request_id)
-                                    except ModelHandlerError as e:
-                                        self.logger.warning(f"Batch processing failed: {str(e)}")
-                                        if isinstance(e, JSONParsingError):
-                                            # For JSON parsing errors, fall back to single processing
-                                            self.logger.info("JSON parsing failed, falling back to single processing")
-                                            continue
-                                        else:
-                                            # For other model errors, propagate up
-                                            raise
-                                    
-                                    if single_qa_pairs and len(single_qa_pairs) > 0:
-                                        pair = single_qa_pairs[0]
-                                        if self._validate_qa_pair(pair):
-                                            validated_pair = {
-                                                "question": pair["question"],
-                                                "solution": pair["solution"]
-                                            }
-                                            validated_output = {
-                                                "Topic": topic,
-                                                "question": pair["question"],
-                                                "solution": pair["solution"]
-                                            }
-                                            
-                                            topic_results.append(validated_pair)
-                                            topic_output.append(validated_output)
-                                            omit_questions.append(pair["question"])
-                                            omit_questions = omit_questions[-100:]
-                                            questions_remaining -= 1
-                                            
-                                            self.logger.info(f"Successfully generated single question for topic {topic}")
-                                        else:
-                                            error_msg = f"Invalid QA pair structure in single processing for topic {topic}"
-                                            self.logger.warning(error_msg)
-                                            topic_errors.append(error_msg)
-                                    else:
-                                        error_msg = f"No QA pair generated in single processing for topic {topic}"
-                                        self.logger.warning(error_msg)
-                                        topic_errors.append(error_msg)
-                                        
-                                except ModelHandlerError:
-                                    # Re-raise ModelHandlerError to propagate up
-                                    raise
-                                except Exception as e:
-                                    error_msg = f"Error in single processing for topic {topic}: {str(e)}"
-                                    self.logger.error(error_msg)
-                                    topic_errors.append(error_msg)
-                                    continue
-                                    
-                except ModelHandlerError:
-                    # Re-raise ModelHandlerError to propagate up
-                    raise
-                except Exception as e:
-                    error_msg = f"Error processing batch for topic {topic}: {str(e)}"
-                    self.logger.error(error_msg)
-                    topic_errors.append(error_msg)
-                    continue
+            while lane.has_work():
+                await lane.next_unit()
                     
         except ModelHandlerError:
             # Re-raise ModelHandlerError to propagate up
@@ -265,13 +246,110 @@ class SynthesisService:
         except Exception as e:
             error_msg = f"Critical error processing topic {topic}: {str(e)}"
             self.logger.error(error_msg)
-            topic_errors.append(error_msg)
+            lane.errors.append(error_msg)
             
-        return topic, topic_results, topic_errors, topic_output
-               
+        return lane.result()
+
+    async def _process_topic_batch(self, lane: "_TopicLane", batch_idx: int, batch_size: int, rebatch_round: int,
+                                   model_handler: any, request: SynthesisRequest, request_id=None,
+                                   on_item: Optional[Callable[[Dict], Any]] = None) -> int:
+        """
+        Generate one batch of a topic. Results, errors and the omit list are kept on the lane;
+        questions that near-duplicate any question of the job are dropped by lane.dedup.
+
+        rebatch_round is 0 for a regular batch; a remainder re-batch (round 1 and up)
+        asks for a margin more than batch_size and keeps the first batch_size valid items.
+
+        Returns:
+            Number of valid QA pairs accepted, at most batch_size
+
+        Raises:
+            ModelHandlerError: When there's an error in model generation that should stop processing
+        """
+        topic = lane.topic
+        num_requested = self._rebatch_request_size(batch_size, rebatch_round)
+        if rebatch_round:
+            self.logger.info(f"Re-batching {batch_size} missing questions for topic {topic} "
+                             f"(round {rebatch_round}, requesting {num_requested})")
+        else:
+            self.logger.info(f"Processing topic: {topic}, attempting batch {batch_idx+1}-{batch_idx+batch_size}")
         
-    async def generate_examples(self, request: SynthesisRequest , job_name = None, is_demo: bool = True, request_id= None) -> Dict:
-        """Generate examples based on request parameters"""
+        valid_pairs = []
+        duplicates = 0
+        omit_hint, omit_tokens_saved = self._omit_hint(lane.omit_questions)
+        try:
+            prompt = PromptBuilder.build_prompt(
+                model_id=request.model_id,
+                use_case=request.use_case,
+                topic=topic,
+                num_questions=num_requested,
+                omit_questions=omit_hint,
+                examples=request.examples or [],
+                technique=request.technique,
+                schema=request.schema,
+                custom_prompt=request.custom_prompt,
+            )
+            batch_qa_pairs = None
+            try:
+                batch_qa_pairs, duplicates = await self._generate_items(
+                    model_handler, prompt, request_id, on_item, partial(self._qa_output, topic),
+                    limit=batch_size, dedup=lane.dedup, dedup_text=self._qa_dedup_text)
+            except ModelHandlerError as e:
+                self.logger.warning(f"Batch processing failed: {str(e)}")
+                if not isinstance(e, JSONParsingError):
+                    # For other model errors, propagate up
+                    raise
+                # For JSON parsing errors, the whole batch is left to the remainder re-batch
+                self.logger.info("JSON parsing failed, re-batching the missing questions")
+            
+            valid_outputs = []
+            for pair in batch_qa_pairs or []:
+                if len(valid_pairs) >= batch_size:
+                    break
+                if self._validate_qa_pair(pair):
+                    valid_pairs.append({
+                        "question": pair["question"],
+                        "solution": pair["solution"]
+                    })
+                    valid_outputs.append({
+                        "Topic": topic,
+                        "question": pair["question"],
+                        "solution": pair["solution"]
+                    })
+                    lane.omit_questions.append(pair["question"])
+            
+            if valid_pairs:
+                lane.add_results(valid_pairs, valid_outputs)
+                lane.omit_questions = lane.omit_questions[-100:]  # Keep last 100 questions
+                self.logger.info(f"Successfully generated {len(valid_pairs)} questions in batch for topic {topic}")
+            if len(valid_pairs) < batch_size and rebatch_round >= lane.max_rounds:
+                error_msg = f"Missing {batch_size - len(valid_pairs)} questions for topic {topic} after {rebatch_round} re-batch rounds"
+                self.logger.warning(error_msg)
+                lane.errors.append(error_msg)
+                            
+        except ModelHandlerError:
+            # Re-raise ModelHandlerError to propagate up
+            raise
+        except Exception as e:
+            error_msg = f"Error processing batch for topic {topic}: {str(e)}"
+            self.logger.error(error_msg)
+            lane.errors.append(error_msg)
+        finally:
+            lane.omit_tokens_saved += omit_tokens_saved
+            self._record_batch(request_id, request, batch_size, num_requested, len(valid_pairs), rebatch_round,
+                               duplicates, omit_tokens_saved)
+        return len(valid_pairs)
+
+
+    async def generate_examples(self, request: SynthesisRequest , job_name = None, is_demo: bool = True, request_id= None, on_item: Optional[Callable[[Dict], Any]] = None,
+                                checkpoint: Optional[JobCheckpoint] = None, progress: Optional[JobProgress] = None,
+                                on_topic: Optional[Callable[[str, int, List[str]], Any]] = None) -> Dict:
+        """
+        Generate examples based on request parameters; on_item receives each item as it streams in,
+        and on_topic(topic, items, errors) each topic as soon as it is finished.
+        With a checkpoint, batches finished by an earlier run of the job are reused and new ones recorded;
+        progress receives a count of every finished batch.
+        """
         try:
             output_key = request.output_key 
             output_value = request.output_value
@@ -283,7 +361,8 @@ class SynthesisService:
             
             # Create model handler
             self.logger.info("Creating model handler")
-            model_handler = create_handler(request.model_id, self.bedrock_client, model_params = model_params, inference_type = request.inference_type, caii_endpoint =  request.caii_endpoint)
+            model_handler = create_handler(request.model_id, self.bedrock_client, model_params = model_params, inference_type = request.inference_type, caii_endpoint =  request.caii_endpoint,
+                                           output_schema = QA_PAIR_SCHEMA if request.structured_output else None)
 
             # Limit topics and questions in demo mode
             if request.doc_paths:
@@ -317,31 +396,55 @@ class SynthesisService:
             # Track results for each topic
             results = {}
             all_errors = []
-            final_output = []
+
+            # Items are appended to a JSONL file as they validate, which is the job
+            # output; the legacy JSON array at file_path is only written when a
+            # reader needs it (ensure_json_array)
+            time_file = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3] 
+            mode_suffix = "test" if is_demo else "final"
+            model_name = get_model_family(request.model_id).split('.')[-1]
+            file_path = f"qa_pairs_{model_name}_{time_file}_{mode_suffix}.json"
+            if checkpoint is not None:
+                file_path = checkpoint.output_file(file_path)
+            source_key = 'Generated_From' if request.doc_paths else 'Seeds'
+            writer = JsonlResultWriter(
+                os.path.splitext(file_path)[0] + ".jsonl",
+                transform=lambda item: {
+                    source_key: item['Topic'],
+                    output_key: item['question'],
+                    output_value: item['solution'] },
+            )
             
-            # Create thread pool
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_TOPICS) as executor:
-                topic_futures = [
-                    loop.run_in_executor(
-                        executor,
-                        self.process_single_topic,
-                        topic,
-                        model_handler,
-                        request,
-                        num_questions,
-                        request_id
-                    )
-                    for topic in topics
-                ]
-                
-                # Wait for all futures to complete
-                try:
-                    completed_topics = await asyncio.gather(*topic_futures)
-                except ModelHandlerError as e:
-                    self.logger.error(f"Model generation failed: {str(e)}")
-                    raise APIError(f"Failed to generate content: {str(e)}")
-                
+            # Every (topic, batch) is a work unit on one scheduler, so a large topic
+            # spreads over capacity that small topics leave idle
+            run_batch = partial(self._process_topic_batch, model_handler=model_handler, request=request,
+                                request_id=request_id, on_item=on_item)
+            dedup = MinHashIndex()
+            lanes = [_TopicLane(topic, num_questions, self.QUESTIONS_PER_BATCH, run_batch, dedup=dedup,
+                                writer=writer, keep_results=is_demo, checkpoint=checkpoint, unit_prefix=f"topic/{i}",
+                                progress=progress, on_done=self._topic_callback(on_topic))
+                     for i, topic in enumerate(topics)]
+            if checkpoint is not None:
+                self._restore_lanes(lanes, checkpoint, self._qa_dedup_text)
+            if progress is not None:
+                progress.set_total(progress.units_done + sum(lane.remaining_units() for lane in lanes),
+                                   items=num_questions * len(topics))
+            controller = get_concurrency_controller(request.model_id)
+            scheduler = WorkUnitScheduler(capacity=lambda: int(controller.limit))
+
+            # Wait for all topics to complete
+            try:
+                await scheduler.run(lanes)
+                completed_topics = [lane.result() for lane in lanes]
+                self._log_call_efficiency(lanes)
+            except ModelHandlerError as e:
+                writer.close()
+                self.logger.error(f"Model generation failed: {str(e)}")
+                raise APIError(f"Failed to generate content: {str(e)}")
+            except BaseException:
+                writer.close()
+                raise
+
             # Process results
             
             for topic, topic_results, topic_errors, topic_output in completed_topics:
@@ -349,33 +452,14 @@ class SynthesisService:
                     all_errors.extend(topic_errors)
                 if topic_results and is_demo:
                     results[topic] = topic_results
-                if topic_output:
-                    final_output.extend(topic_output)
 
             generation_time = time.time() - st
             self.logger.info(f"Generation completed in {generation_time:.2f} seconds")
 
             timestamp = datetime.now(timezone.utc).isoformat()
-            time_file = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3] 
-            mode_suffix = "test" if is_demo else "final"
-            model_name = get_model_family(request.model_id).split('.')[-1]
-            file_path = f"qa_pairs_{model_name}_{time_file}_{mode_suffix}.json"
-            if request.doc_paths:
-                final_output = [{
-                                    'Generated_From': item['Topic'],
-                                    output_key: item['question'],
-                                    output_value: item['solution'] }
-                                 for item in final_output]
-            else:
-                final_output = [{
-                                    'Seeds': item['Topic'],
-                                    output_key: item['question'],
-                                    output_value: item['solution'] }
-                                 for item in final_output]
             output_path = {}
             try:
-                with open(file_path, "w") as f:
-                    json.dump(final_output, indent=2, fp=f)
+                writer.finalize()
             except Exception as e:
                 self.logger.error(f"Error saving results: {str(e)}", exc_info=True)
                 
@@ -453,7 +537,7 @@ class SynthesisService:
                 self.db.update_job_generate(job_name,generate_file_name, output_path['local'], timestamp, job_status)
                 self.db.backup_and_restore_db()
                 return {
-                    "status": "completed" if final_output else "failed",
+                    "status": "completed" if writer.count else "failed",
                     "export_path": output_path
                 }
         except APIError:
@@ -472,6 +556,181 @@ class SynthesisService:
                 raise  # Just re-raise the original exception
 
 
+    async def _generate_items(self, model_handler, prompt: str, request_id, on_item: Optional[Callable[[Dict], Any]],
+                              to_output: Callable[[Dict], Optional[Dict]], limit: Optional[int] = None,
+                              dedup: Optional[MinHashIndex] = None,
+                              dedup_text: Optional[Callable[[Dict], str]] = None) -> Tuple[List[Dict], int]:
+        """
+        Run one generation prompt and return the accepted items and the number of near-duplicates dropped.
+
+        An item is accepted when to_output maps it to an output and, given a dedup
+        index, dedup_text(item) is not a near-duplicate of an item already accepted
+        in the job. At most `limit` items are accepted. Without on_item this is a
+        plain agenerate_response call; with on_item the response is streamed and
+        each accepted item's output is handed to on_item as soon as it is parsed.
+        """
+        accepted = []
+        duplicates = 0
+
+        def accept(item) -> Optional[Dict]:
+            nonlocal duplicates
+            if limit is not None and len(accepted) >= limit:
+                return None
+            output = to_output(item)
+            if output is None:
+                return None
+            if dedup is not None and not dedup.add_if_new(dedup_text(item)):
+                duplicates += 1
+                return None
+            accepted.append(item)
+            return output
+
+        def accept_all(items):
+            for item in items:
+                accept(item)
+
+        # MinHash signatures are CPU work, so dedup checks run off the event loop
+        if on_item is None:
+            items = await model_handler.agenerate_response(prompt, request_id=request_id) or []
+            await asyncio.to_thread(accept_all, items)
+            return accepted, duplicates
+
+        async for item in model_handler.astream_response(prompt, request_id=request_id):
+            output = await asyncio.to_thread(accept, item)
+            if output is not None:
+                emitted = on_item(output)
+                if inspect.isawaitable(emitted):
+                    await emitted
+        return accepted, duplicates
+
+    @staticmethod
+    def _omit_hint(omit_questions: List[str]) -> Tuple[List[str], int]:
+        """
+        Newest already-generated items that fit GENERATION_OMIT_HINT_TOKENS, and the
+        input tokens this saves over sending the whole list. Duplicates that slip
+        past the hint are dropped by the job's dedup index.
+        """
+        hint = []
+        tokens = 0
+        for question in reversed(omit_questions):
+            question_tokens = count_tokens(question) + 1  # " | " separator
+            if tokens + question_tokens > GENERATION_OMIT_HINT_TOKENS:
+                break
+            hint.append(question)
+            tokens += question_tokens
+        hint.reverse()
+        saved = count_tokens(" | ".join(omit_questions)) - count_tokens(" | ".join(hint))
+        return hint, max(saved, 0)
+
+    @staticmethod
+    def _rebatch_request_size(missing: int, rebatch_round: int) -> int:
+        """Items to ask for: exact for a regular batch, plus the margin for a remainder re-batch"""
+        if rebatch_round == 0:
+            return missing
+        return missing + math.ceil(missing * GENERATION_REBATCH_MARGIN)
+
+    def _record_batch(self, request_id, request: SynthesisRequest, batch_size: int, requested_items: int,
+                      valid_items: int, rebatch_round: int, duplicate_items: int = 0, omit_tokens_saved: int = 0):
+        """Record one generation call, either a batch or a remainder re-batch of one"""
+        telemetry_manager.record_generation_batch(
+            request_id, request.model_id, request.structured_output, batch_size, valid_items,
+            requested_items=requested_items, rebatch_round=rebatch_round,
+            duplicate_items=duplicate_items, omit_tokens_saved=omit_tokens_saved
+        )
+
+    @staticmethod
+    def _topic_callback(on_topic: Optional[Callable[[str, int, List[str]], Any]]) -> Optional[Callable[["_TopicLane"], Any]]:
+        """Adapt an on_topic(topic, items, errors) callback to a lane's on_done"""
+        if on_topic is None:
+            return None
+        return lambda lane: on_topic(lane.topic, lane.accepted, list(lane.errors))
+
+    async def run_inputs(self, rows: Iterable[Any], process: Callable[[int, Any], Awaitable[Any]],
+                         on_result: Callable[[int, Any], None], model_id: str,
+                         max_pending: int = GENERATE_RESULT_MAX_PENDING) -> int:
+        """
+        Run process(index, row) for every row, with as many rows in flight as the
+        model's concurrency allows, and hand results to on_result in input order.
+        Rows are pulled from the iterable only as the window of max_pending rows advances.
+        Returns the number of rows processed.
+        """
+        lane = OrderedInputLane(rows, process, on_result, max_pending=max_pending)
+        controller = get_concurrency_controller(model_id)
+        scheduler = WorkUnitScheduler(capacity=lambda: int(controller.limit), max_in_flight_per_lane=lane.max_pending)
+        await scheduler.run([lane])
+        return lane.issued
+
+    def _iter_input_rows(self, file_paths: List[str], input_key: str) -> Iterator[str]:
+        """The input_key value of every row of the input files, streamed one row at a time"""
+        for path in file_paths:
+            try:
+                for item in iter_result_file(path):
+                    yield item.get(input_key, '')
+            except Exception as e:
+                print(f"Error processing {path}: {str(e)}")
+
+    def _restore_lanes(self, lanes: List["_TopicLane"], checkpoint: JobCheckpoint, dedup_text: Callable[[Dict], str]):
+        """Replay each topic's checkpointed batches so a resumed job only generates what is missing"""
+        restored = 0
+        for lane in lanes:
+            units = list(checkpoint.completed_units(lane.unit_prefix + "/").values())
+            if units:
+                lane.restore(units, dedup_text)
+                restored += lane.accepted
+                if lane.progress is not None:
+                    lane.progress.resumed(len(units), lane.accepted)
+        if restored:
+            self.logger.info(f"Resuming job: reusing {restored} checkpointed items")
+
+    def _log_call_efficiency(self, lanes: List["_TopicLane"]):
+        """Log generation calls per valid item and dedup savings for a job; the per-call rows are in telemetry"""
+        calls = sum(lane.calls for lane in lanes)
+        valid_items = sum(lane.accepted for lane in lanes)
+        calls_per_item = calls / valid_items if valid_items else float('inf')
+        self.logger.info(f"Made {calls} generation calls for {valid_items} valid items "
+                         f"({calls_per_item:.2f} calls per valid item)")
+        if lanes:
+            dedup = lanes[0].dedup
+            self.logger.info(f"Dropped {dedup.duplicates} near-duplicates of {dedup.checked} valid items "
+                             f"({dedup.hit_rate:.1%}); omit hint saved "
+                             f"{sum(lane.omit_tokens_saved for lane in lanes)} input tokens")
+
+    def _qa_output(self, topic: str, pair: Dict) -> Optional[Dict]:
+        if not self._validate_qa_pair(pair):
+            return None
+        return {"Topic": topic, "question": pair["question"], "solution": pair["solution"]}
+
+    def _freeform_output(self, topic: str, item: Dict) -> Optional[Dict]:
+        if not self._validate_freeform_item(item):
+            return None
+        output_item = {"Topic": topic}
+        output_item.update(item)
+        return output_item
+
+    @staticmethod
+    def _qa_dedup_text(pair: Dict) -> str:
+        return pair["question"]
+
+    @staticmethod
+    def _freeform_identifier(item: Dict) -> Tuple[str, str]:
+        """Key and value of the field that names a freeform item, or two blanks if it has none"""
+        for potential_key in ["id", "name", "title", "question", "prompt", "key"]:
+            if potential_key in item and isinstance(item[potential_key], str):
+                return potential_key, item[potential_key]
+        # If no suitable identifier found among preferred keys, look for any string value
+        for key, value in item.items():
+            if isinstance(value, str) and value.strip():
+                return key, value
+        return "", ""
+
+    @classmethod
+    def _freeform_dedup_text(cls, item: Dict) -> str:
+        """
+        Only the identifier field is compared: categorical columns shared by
+        distinct rows would otherwise push them past the similarity threshold.
+        """
+        return cls._freeform_identifier(item)[1]
+
     def _validate_qa_pair(self, pair: Dict) -> bool:
         """Validate a question-answer pair"""
         return (
@@ -495,9 +754,9 @@ class SynthesisService:
                 custom_prompt=request.custom_prompt,
             )
             try:
-                result = model_handler.generate_response(prompt, request_id=request_id)
+                result = await model_handler.agenerate_response(prompt, request_id=request_id)
             except ModelHandlerError as e:
-                self.logger.error(f"ModelHandlerError in generate_response: {str(e)}")
+                self.logger.error(f"ModelHandlerError in agenerate_response: {str(e)}")
                 raise
                     
             return {"question": input, "solution": result}
@@ -508,7 +767,14 @@ class SynthesisService:
             self.logger.error(f"Error processing input: {str(e)}")
             raise APIError(f"Failed to process input: {str(e)}")
 
-    async def generate_result(self, request: SynthesisRequest , job_name = None, is_demo: bool = True, request_id=None) -> Dict:
+    async def generate_result(self, request: SynthesisRequest , job_name = None, is_demo: bool = True, request_id=None,
+                              checkpoint: Optional[JobCheckpoint] = None, progress: Optional[JobProgress] = None,
+                              on_item: Optional[Callable[[Dict], Any]] = None) -> Dict:
+        """
+        Generate a result for every input row; with a checkpoint, rows finished by an
+        earlier run of the job are reused and new ones recorded. Each row is one progress unit.
+        on_item (sync or async) receives each row's result as soon as it is ready.
+        """
         try:
             self.logger.info(f"Starting example generation - Demo Mode: {is_demo}")
             
@@ -520,56 +786,75 @@ class SynthesisService:
             self.logger.info("Creating model handler")
             model_handler = create_handler(request.model_id, self.bedrock_client, model_params = model_params, inference_type = request.inference_type, caii_endpoint =  request.caii_endpoint, custom_p = True)
 
-            inputs = []
             file_paths = request.input_path
-            for path in file_paths:
-                try:
-                    with open(path) as f:
-                        data = json.load(f)
-                        inputs.extend(item.get(request.input_key, '') for item in data)
-                except Exception as e:
-                    print(f"Error processing {path}: {str(e)}")
-            MAX_WORKERS = 5
-            
-            
-            # Create thread pool
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                # Create futures for each input
-                input_futures = [
-                    loop.run_in_executor(
-                        executor,
-                        lambda x: asyncio.run(self.process_single_input(x, model_handler, request, request_id)),
-                        input
-                    )
-                    for input in inputs
-                ]
-                
-                # Wait for all futures to complete
-                try:
-                    final_output = await asyncio.gather(*input_futures)
-                except ModelHandlerError as e:
-                    self.logger.error(f"Model generation failed: {str(e)}")
-                    raise APIError(f"Failed to generate content: {str(e)}")
-                
-         
-            
-            
-            timestamp = datetime.now(timezone.utc).isoformat()
+
+            # Results are appended to a JSONL file in input order as they complete
             time_file = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3] 
             mode_suffix = "test" if is_demo else "final"
             model_name = get_model_family(request.model_id).split('.')[-1]
             file_path = f"qa_pairs_{model_name}_{time_file}_{mode_suffix}.json"
+            if checkpoint is not None:
+                file_path = checkpoint.output_file(file_path)
             input_key = request.output_key or request.input_key
-            result = [{
-                                
+            writer = JsonlResultWriter(
+                os.path.splitext(file_path)[0] + ".jsonl",
+                transform=lambda item: {
                                 input_key: item['question'],
-                                request.output_value: item['solution'] }
-                             for item in final_output]
+                                request.output_value: item['solution'] },
+            )
+
+            done_rows = checkpoint.count_units("row/") if checkpoint is not None else 0
+            if done_rows:
+                self.logger.info(f"Resuming job: reusing {done_rows} finished rows")
+            if progress is not None:
+                # Counting is one more streaming pass over the inputs, which is cheap next to generating
+                total_rows = sum(1 for _ in self._iter_input_rows(file_paths, request.input_key))
+                progress.resumed(done_rows, done_rows)
+                progress.set_total(total_rows, items=total_rows)
+
+            async def process_row(index, input):
+                item = None
+                if done_rows:
+                    outputs = checkpoint.unit_outputs(f"row/{index}")
+                    item = outputs[0] if outputs else None
+                if item is None:
+                    item = await self.process_single_input(input, model_handler, request, request_id)
+                    if checkpoint is not None:
+                        checkpoint.record_unit(f"row/{index}", [item])
+                    if progress is not None:
+                        progress.unit_done(1)
+                if on_item is not None:
+                    emitted = on_item(item)
+                    if inspect.isawaitable(emitted):
+                        await emitted
+                return item
+
+            # Only demo responses return the results; jobs keep them on disk
+            final_output = []
+
+            def write_row(index, item):
+                writer.write(item)
+                if is_demo:
+                    final_output.append(item)
+
+            try:
+                total_count = await self.run_inputs(self._iter_input_rows(file_paths, request.input_key),
+                                                    process_row, write_row, request.model_id)
+            except ModelHandlerError as e:
+                writer.close()
+                self.logger.error(f"Model generation failed: {str(e)}")
+                raise APIError(f"Failed to generate content: {str(e)}")
+            except BaseException:
+                writer.close()
+                raise
+
+         
+            
+            
+            timestamp = datetime.now(timezone.utc).isoformat()
             output_path = {}
             try:
-                with open(file_path, "w") as f:
-                    json.dump(result, indent=2, fp=f)
+                writer.finalize()
             except Exception as e:
                 self.logger.error(f"Error saving results: {str(e)}", exc_info=True)
                 
@@ -623,7 +908,7 @@ class SynthesisService:
                 'num_questions':getattr(request, 'num_questions', None),
                 'topics': topic_str,
                 'examples': examples_str,
-                "total_count":len(inputs),
+                "total_count":total_count,
                 'schema': schema_str,
                 'doc_paths': doc_paths_str,
                 'input_path':input_path_str,
@@ -650,7 +935,7 @@ class SynthesisService:
                 self.db.update_job_generate(job_name,generate_file_name, output_path['local'], timestamp, job_status)
                 self.db.backup_and_restore_db()
                 return {
-                    "status": "completed" if final_output else "failed",
+                    "status": "completed" if writer.count else "failed",
                     "export_path": output_path
                 }
 
@@ -669,16 +954,19 @@ class SynthesisService:
                 raise  # Just re-raise the original exception
 
     #@track_llm_operation("process_single_freeform") 
-    def process_single_freeform(self, topic: str, model_handler: any, request: SynthesisRequest, num_questions: int, request_id=None) -> Tuple[str, List[Dict], List[str], List[Dict]]:
+    async def process_single_freeform(self, topic: str, model_handler: any, request: SynthesisRequest, num_questions: int, request_id=None, on_item: Optional[Callable[[Dict], Any]] = None) -> Tuple[str, List[Dict], List[str], List[Dict]]:
         """
         Process a single topic to generate freeform data.
-        Attempts batch processing first (default batch size), falls back to single item processing if batch fails.
+        Attempts batch processing first (default batch size), then re-batches the items
+        a batch came up short in one call per round, up to GENERATION_REBATCH_MAX_ROUNDS rounds.
         
         Args:
             topic: The topic to generate freeform data for
             model_handler: Handler for the AI model
             request: The synthesis request object
             num_questions: Total number of data items to generate
+            on_item: Optional callback (sync or async); when set, responses are streamed
+                and each valid output item is passed to it as soon as it is parsed
         
         Returns:
             Tuple containing:
@@ -690,197 +978,13 @@ class SynthesisService:
         Raises:
             ModelHandlerError: When there's an error in model generation that should stop processing
         """
-        topic_results = []
-        topic_output = []
-        topic_errors = []
-        questions_remaining = num_questions
-        omit_questions = []
-        
+        lane = _TopicLane(topic, num_questions, self.QUESTIONS_PER_BATCH,
+                          partial(self._process_freeform_batch, model_handler=model_handler, request=request,
+                                  request_id=request_id, on_item=on_item))
         try:
             # Process data in batches
-            for batch_idx in range(0, num_questions, self.QUESTIONS_PER_BATCH):
-                if questions_remaining <= 0:
-                    break
-                    
-                batch_size = min(self.QUESTIONS_PER_BATCH, questions_remaining)
-                self.logger.info(f"Processing topic: {topic}, attempting batch {batch_idx+1}-{batch_idx+batch_size}")
-                
-                try:
-                    # Attempt batch processing
-                    prompt = PromptBuilder.build_freeform_prompt(
-                        model_id=request.model_id,
-                        use_case=request.use_case,
-                        topic=topic,
-                        num_questions=batch_size,
-                        omit_questions=omit_questions,
-                        example_custom=request.example_custom or [],
-                        example_path=request.example_path,
-                        custom_prompt=request.custom_prompt,
-                        schema=request.schema,
-                    )
-                    #print(prompt)
-                    batch_items = None
-                    try:
-                        batch_items = model_handler.generate_response(prompt, request_id=request_id)
-                    except ModelHandlerError as e:
-                        self.logger.warning(f"Batch processing failed: {str(e)}")
-                        if isinstance(e, JSONParsingError):
-                            # For JSON parsing errors, fall back to single processing
-                            self.logger.info("JSON parsing failed, falling back to single processing")
-                            continue
-                        else:
-                            # For other model errors, propagate up
-                            raise
-                    
-                    if batch_items:
-                        # Process batch results
-                        valid_items = []
-                        valid_outputs = []
-                        invalid_count = 0
-                        
-                        for item in batch_items:
-                            if self._validate_freeform_item(item):
-                                valid_items.append(item)
-                                
-                                # Create a new dict with Topic field added
-                                output_item = {"Topic": topic}
-                                output_item.update(item)
-                                valid_outputs.append(output_item)
-                                
-                                # Initialize item_identifier variable
-                                item_identifier = None 
-                                    # First try the specific potential keys
-                                for potential_key in ["id", "name", "title", "question", "prompt", "key"]:
-                                    if potential_key in item and isinstance(item[potential_key], str):
-                                        #item_identifier = item[potential_key]
-                                        item_identifier = f"{potential_key} : {item[potential_key]} "
-                                        break
-                                
-                                # If no suitable identifier found among preferred keys, look for any string value
-                                if not item_identifier:
-                                    for key, value in item.items():
-                                        if isinstance(value, str) and value.strip():  # Check for non-empty string
-                                            #item_identifier = value
-                                            item_identifier = f"{key} : {value} "
-                                            break
-                                
-                                # If still no string value found, use a blank string
-                                if not item_identifier:
-                                    item_identifier = ""
-                                        
-                                omit_questions.append(item_identifier)
-                        #print("topic :", topic, '\n',omit_questions)        
-                            
-                        invalid_count = batch_size - len(valid_items)
-                        
-                        if valid_items:
-                            topic_results.extend(valid_items)
-                            topic_output.extend(valid_outputs)
-                            questions_remaining -= len(valid_items)
-                            omit_questions = omit_questions[-100:]  # Keep last 100 items
-                            self.logger.info(f"Successfully generated {len(valid_items)} items in batch for topic {topic}")
-                        
-                        print("invalid_count:", invalid_count, '\n', "batch_size: ", batch_size, '\n', "valid_items: ", len(valid_items))
-                        # If all items were valid, skip fallback
-                        if invalid_count <= 0:
-                            continue
-                    
-                        # Fall back to single processing for remaining or failed items
-                        self.logger.info(f"Falling back to single processing for remaining items in topic {topic}")
-                        remaining_batch = invalid_count
-                        print("remaining_batch:", remaining_batch, '\n', "batch_size: ", batch_size, '\n', "valid_items: ", len(valid_items))
-                        
-                        for _ in range(remaining_batch):
-                            if questions_remaining <= 0:
-                                break
-                                
-                            try:
-                                # Single item processing
-                                prompt = PromptBuilder.build_freeform_prompt(
-                                     model_id=request.model_id,
-                                        use_case=request.use_case,
-                                        topic=topic,
-                                        num_questions=batch_size,
-                                        omit_questions=omit_questions,
-                                        example_custom=request.example_custom or [],
-                                        example_path=request.example_path,
-                                        custom_prompt=request.custom_prompt,
-                                        schema=request.schema,
-                                )
-                                
-                                try:
-                                    single_items = model_handler.generate_response(prompt, request_id=request_id)
-                                except ModelHandlerError as e:
-                                    self.logger.warning(f"Single processing failed: {str(e)}")
-                                    if isinstance(e, JSONParsingError):
-                                        self.logger.info("JSON parsing failed in single processing")
-                                        continue
-                                    else:
-                                        # For other model errors, propagate up
-                                        raise
-                                
-                                if single_items and len(single_items) > 0:
-                                    item = single_items[0]
-                                    if self._validate_freeform_item(item):
-                                        # Create a new dict with Topic field added
-                                        output_item = {"Topic": topic}
-                                        output_item.update(item)
-                                        
-                                        topic_results.append(item)
-                                        topic_output.append(output_item)
-                                        
-                                        # Initialize item_identifier variable
-                                        item_identifier = None 
-                                       # First try the specific potential keys
-                                        for potential_key in ["id", "name", "title", "question", "prompt", "key"]:
-                                            if potential_key in item and isinstance(item[potential_key], str):
-                                                #item_identifier = item[potential_key]
-                                                item_identifier = f"{potential_key} : {item[potential_key]} "
-                                                break
-                                        
-                                        # If no suitable identifier found among preferred keys, look for any string value
-                                        if not item_identifier:
-                                            for key, value in item.items():
-                                                if isinstance(value, str) and value.strip():  # Check for non-empty string
-                                                    #item_identifier = value
-                                                    item_identifier = f"{key} : {value} "
-                                                    break
-                                        
-                                        # If still no string value found, use a blank string
-                                        if not item_identifier:
-                                            item_identifier = ""
-                                                
-                                        omit_questions.append(item_identifier)
-                                        omit_questions = omit_questions[-100:]
-                                        
-                                        questions_remaining -= 1
-                                        self.logger.info(f"Successfully generated single item for topic {topic}")
-                                    else:
-                                        error_msg = f"Invalid item structure in single processing for topic {topic}"
-                                        self.logger.warning(error_msg)
-                                        topic_errors.append(error_msg)
-                                else:
-                                    error_msg = f"No item generated in single processing for topic {topic}"
-                                    self.logger.warning(error_msg)
-                                    topic_errors.append(error_msg)
-                                    
-                            except ModelHandlerError:
-                                # Re-raise ModelHandlerError to propagate up
-                                raise
-                            except Exception as e:
-                                error_msg = f"Error in single processing for topic {topic}: {str(e)}"
-                                self.logger.error(error_msg)
-                                topic_errors.append(error_msg)
-                                raise
-                                
-                except ModelHandlerError:
-                    # Re-raise ModelHandlerError to propagate up
-                    raise
-                except Exception as e:
-                    error_msg = f"Error processing batch for topic {topic}: {str(e)}"
-                    self.logger.error(error_msg)
-                    topic_errors.append(error_msg)
-                    raise
+            while lane.has_work():
+                await lane.next_unit()
                     
         except ModelHandlerError:
             # Re-raise ModelHandlerError to propagate up
@@ -888,10 +992,103 @@ class SynthesisService:
         except Exception as e:
             error_msg = f"Critical error processing topic {topic}: {str(e)}"
             self.logger.error(error_msg)
-            topic_errors.append(error_msg)
+            lane.errors.append(error_msg)
             raise
             
-        return topic, topic_results, topic_errors, topic_output
+        return lane.result()
+
+    async def _process_freeform_batch(self, lane: "_TopicLane", batch_idx: int, batch_size: int, rebatch_round: int,
+                                      model_handler: any, request: SynthesisRequest, request_id=None,
+                                      on_item: Optional[Callable[[Dict], Any]] = None) -> int:
+        """
+        Generate one batch of freeform items for a topic. Results, errors and the omit list are kept
+        on the lane; items that near-duplicate any item of the job are dropped by lane.dedup.
+
+        rebatch_round is 0 for a regular batch; a remainder re-batch (round 1 and up)
+        asks for a margin more than batch_size and keeps the first batch_size valid items.
+
+        Returns:
+            Number of valid items accepted, at most batch_size
+
+        Raises:
+            ModelHandlerError: When there's an error in model generation that should stop processing
+        """
+        topic = lane.topic
+        num_requested = self._rebatch_request_size(batch_size, rebatch_round)
+        if rebatch_round:
+            self.logger.info(f"Re-batching {batch_size} missing items for topic {topic} "
+                             f"(round {rebatch_round}, requesting {num_requested})")
+        else:
+            self.logger.info(f"Processing topic: {topic}, attempting batch {batch_idx+1}-{batch_idx+batch_size}")
+
+        valid_items = []
+        duplicates = 0
+        omit_hint, omit_tokens_saved = self._omit_hint(lane.omit_questions)
+        try:
+            prompt = PromptBuilder.build_freeform_prompt(
+                model_id=request.model_id,
+                use_case=request.use_case,
+                topic=topic,
+                num_questions=num_requested,
+                omit_questions=omit_hint,
+                example_custom=request.example_custom or [],
+                example_path=request.example_path,
+                custom_prompt=request.custom_prompt,
+                schema=request.schema,
+            )
+            #print(prompt)
+            batch_items = None
+            try:
+                batch_items, duplicates = await self._generate_items(
+                    model_handler, prompt, request_id, on_item, partial(self._freeform_output, topic),
+                    limit=batch_size, dedup=lane.dedup, dedup_text=self._freeform_dedup_text)
+            except ModelHandlerError as e:
+                self.logger.warning(f"Batch processing failed: {str(e)}")
+                if not isinstance(e, JSONParsingError):
+                    # For other model errors, propagate up
+                    raise
+                # For JSON parsing errors, the whole batch is left to the remainder re-batch
+                self.logger.info("JSON parsing failed, re-batching the missing items")
+
+            valid_outputs = []
+            for item in batch_items or []:
+                if len(valid_items) >= batch_size:
+                    break
+                if self._validate_freeform_item(item):
+                    valid_items.append(item)
+
+                    # Create a new dict with Topic field added
+                    output_item = {"Topic": topic}
+                    output_item.update(item)
+                    valid_outputs.append(output_item)
+
+                    identifier_key, identifier_value = self._freeform_identifier(item)
+                    item_identifier = f"{identifier_key} : {identifier_value} " if identifier_key else ""
+                    lane.omit_questions.append(item_identifier)
+            #print("topic :", topic, '\n',lane.omit_questions)        
+
+            if valid_items:
+                lane.add_results(valid_items, valid_outputs)
+                lane.omit_questions = lane.omit_questions[-100:]  # Keep last 100 items
+                self.logger.info(f"Successfully generated {len(valid_items)} items in batch for topic {topic}")
+            if len(valid_items) < batch_size and rebatch_round >= lane.max_rounds:
+                error_msg = f"Missing {batch_size - len(valid_items)} items for topic {topic} after {rebatch_round} re-batch rounds"
+                self.logger.warning(error_msg)
+                lane.errors.append(error_msg)
+
+        except ModelHandlerError:
+            # Re-raise ModelHandlerError to propagate up
+            raise
+        except Exception as e:
+            error_msg = f"Error processing batch for topic {topic}: {str(e)}"
+            self.logger.error(error_msg)
+            lane.errors.append(error_msg)
+            raise
+        finally:
+            lane.omit_tokens_saved += omit_tokens_saved
+            self._record_batch(request_id, request, batch_size, num_requested, len(valid_items), rebatch_round,
+                               duplicates, omit_tokens_saved)
+        return len(valid_items)
 
     def _validate_freeform_item(self, item: Dict) -> bool:
         """
@@ -900,8 +1097,15 @@ class SynthesisService:
         """
         return isinstance(item, dict) and len(item) > 0
 
-    async def generate_freeform(self, request: SynthesisRequest, job_name=None, is_demo: bool = True, request_id=None) -> Dict:
-        """Generate freeform data based on request parameters"""
+    async def generate_freeform(self, request: SynthesisRequest, job_name=None, is_demo: bool = True, request_id=None, on_item: Optional[Callable[[Dict], Any]] = None,
+                                checkpoint: Optional[JobCheckpoint] = None, progress: Optional[JobProgress] = None,
+                                on_topic: Optional[Callable[[str, int, List[str]], Any]] = None) -> Dict:
+        """
+        Generate freeform data based on request parameters; on_item receives each item as it streams in,
+        and on_topic(topic, items, errors) each topic as soon as it is finished.
+        With a checkpoint, batches finished by an earlier run of the job are reused and new ones recorded;
+        progress receives a count of every finished batch.
+        """
         try:
             output_key = request.output_key 
             output_value = request.output_value
@@ -918,7 +1122,8 @@ class SynthesisService:
                 self.bedrock_client, 
                 model_params=model_params, 
                 inference_type=request.inference_type, 
-                caii_endpoint=request.caii_endpoint
+                caii_endpoint=request.caii_endpoint,
+                output_schema=freeform_item_schema(request.example_custom) if request.structured_output else None
             )
 
             # Handle topics from documents or direct topics
@@ -951,64 +1156,66 @@ class SynthesisService:
             # Track results for each topic
             results = {}
             all_errors = []
-            final_output = []
+
+            # Items are appended to a JSONL file as they validate, as in generate_examples
+            time_file = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3] 
+            mode_suffix = "test" if is_demo else "final"
+            model_name = get_model_family(request.model_id).split('.')[-1]
+            file_path = f"freeform_data_{model_name}_{time_file}_{mode_suffix}.json"
+            if checkpoint is not None:
+                file_path = checkpoint.output_file(file_path)
+            # Transform output based on document paths
+            source_key = 'Generated_From' if request.doc_paths else 'Seeds'
+            writer = JsonlResultWriter(
+                os.path.splitext(file_path)[0] + ".jsonl",
+                transform=lambda item: {
+                    source_key: item['Topic'],
+                    **{k: v for k, v in item.items() if k != 'Topic'} },
+            )
             
-            # Create thread pool
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_TOPICS) as executor:
-                topic_futures = [
-                    loop.run_in_executor(
-                        executor,
-                        self.process_single_freeform,
-                        topic,
-                        model_handler,
-                        request,
-                        num_questions, request_id
-                    )
-                    for topic in topics
-                ]
-                
-                # Wait for all futures to complete
-                try:
-                    completed_topics = await asyncio.gather(*topic_futures)
-                except ModelHandlerError as e:
-                    self.logger.error(f"Model generation failed: {str(e)}")
-                    raise APIError(f"Failed to generate content: {str(e)}")
-                
+            # Every (topic, batch) is a work unit on one scheduler, as in generate_examples
+            run_batch = partial(self._process_freeform_batch, model_handler=model_handler, request=request,
+                                request_id=request_id, on_item=on_item)
+            dedup = MinHashIndex()
+            lanes = [_TopicLane(topic, num_questions, self.QUESTIONS_PER_BATCH, run_batch, dedup=dedup,
+                                writer=writer, keep_results=is_demo, checkpoint=checkpoint, unit_prefix=f"topic/{i}",
+                                progress=progress, on_done=self._topic_callback(on_topic))
+                     for i, topic in enumerate(topics)]
+            if checkpoint is not None:
+                self._restore_lanes(lanes, checkpoint, self._freeform_dedup_text)
+            if progress is not None:
+                progress.set_total(progress.units_done + sum(lane.remaining_units() for lane in lanes),
+                                   items=num_questions * len(topics))
+            controller = get_concurrency_controller(request.model_id)
+            scheduler = WorkUnitScheduler(capacity=lambda: int(controller.limit))
+
+            # Wait for all topics to complete
+            try:
+                await scheduler.run(lanes)
+                completed_topics = [lane.result() for lane in lanes]
+                self._log_call_efficiency(lanes)
+            except ModelHandlerError as e:
+                writer.close()
+                self.logger.error(f"Model generation failed: {str(e)}")
+                raise APIError(f"Failed to generate content: {str(e)}")
+            except BaseException:
+                writer.close()
+                raise
+
             # Process results
             for topic, topic_results, topic_errors, topic_output in completed_topics:
                 if topic_errors:
                     all_errors.extend(topic_errors)
                 if topic_results and is_demo:
                     results[topic] = topic_results
-                if topic_output:
-                    final_output.extend(topic_output)
 
             generation_time = time.time() - st
             self.logger.info(f"Generation completed in {generation_time:.2f} seconds")
 
             timestamp = datetime.now(timezone.utc).isoformat()
-            time_file = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3] 
-            mode_suffix = "test" if is_demo else "final"
-            model_name = get_model_family(request.model_id).split('.')[-1]
-            file_path = f"freeform_data_{model_name}_{time_file}_{mode_suffix}.json"
-            
-            # Transform output based on document paths
-            if request.doc_paths:
-                final_output = [{
-                                'Generated_From': item['Topic'],
-                                **{k: v for k, v in item.items() if k != 'Topic'}
-                            } for item in final_output]
-            else:
-                final_output = [{
-                                'Seeds': item['Topic'],
-                                **{k: v for k, v in item.items() if k != 'Topic'}
-                            } for item in final_output]
-            
             output_path = {}
             try:
-                with open(file_path, "w") as f:
-                    json.dump(final_output, indent=2, fp=f)
+                writer.finalize()
             except Exception as e:
                 self.logger.error(f"Error saving results: {str(e)}", exc_info=True)
                 
@@ -1105,7 +1312,7 @@ class SynthesisService:
                 self.db.update_job_generate(job_name, generate_file_name, output_path['local'], timestamp, job_status)
                 self.db.backup_and_restore_db()
                 return {
-                    "status": "completed" if final_output else "failed",
+                    "status": "completed" if writer.count else "failed",
                     "export_path": output_path
                 }
         except APIError:
@@ -0,0 +1,126 @@
+"""
+Micro-benchmark: tolerant single-pass JSON scan vs. the previous parse cascade.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.json_extraction_benchmark [--repeat N]
+
+The corpus is synthetic: hand-built text reproducing the kinds of malformed
+responses generation and evaluation prompts produce (prose and code fences
+around the array, an element with unescaped quotes, Python-literal objects
+with apostrophes, trailing commas and output truncated at max_tokens,
+including ~8k-token responses). It is not captured model output, so the
+timings compare the two parsers rather than predict production behaviour.
+"""
+import argparse
+import ast
+import json
+import re
+import time
+from typing import Any, Callable, Dict, List
+
+from app.core.json_stream import scan_json_objects
+
+
+def legacy_extract(text: str) -> List[Dict[str, Any]]:
+    """The multi-attempt cascade previously used by UnifiedModelHandler._extract_json_from_text"""
+    try:
+        return _legacy_parse(json.loads(text))
+    except json.JSONDecodeError:
+        pass
+    start_idx = text.find('[')
+    end_idx = text.rfind(']') + 1
+    if start_idx != -1 and end_idx != -1:
+        json_text = text[start_idx:end_idx]
+        try:
+            return _legacy_parse(json.loads(json_text))
+        except json.JSONDecodeError:
+            try:
+                return _legacy_parse(ast.literal_eval(json_text))
+            except (SyntaxError, ValueError):
+                cleaned = (json_text.replace('\n', ' ').replace('\\n', ' ')
+                           .replace("'", '"').replace('\t', ' ').strip())
+                try:
+                    return _legacy_parse(json.loads(cleaned))
+                except json.JSONDecodeError:
+                    pass
+    results = []
+    for score, justification in re.findall(r'"score":\s*(\d+\.?\d*),\s*"justification":\s*"([^"]*)"', text, re.DOTALL):
+        results.append({"score": float(score), "justification": justification.strip()})
+    for question, solution in re.findall(r'"question":\s*"([^"]*)",\s*"solution":\s*"([^"]*)"', text, re.DOTALL):
+        results.append({"question": question.strip(), "solution": solution.strip()})
+    return results or [{"text": text}]
+
+
+def _legacy_parse(parsed: Any) -> List[Dict[str, Any]]:
+    if isinstance(parsed, list):
+        return parsed
+    if isinstance(parsed, dict):
+        return [parsed]
+    return []
+
+
+def tolerant_extract(text: str) -> List[Dict[str, Any]]:
+    """Same entry point as the handler: direct parse, then one tolerant scan"""
+    try:
+        return _legacy_parse(json.loads(text))
+    except json.JSONDecodeError:
+        pass
+    return scan_json_objects(text) or [{"text": text}]
+
+
+def _pair(i: int) -> Dict[str, str]:
+    return {
+        "question": f"Write a SQL query that returns the top {i} customers by revenue for each region.",
+        "solution": ("SELECT region, customer_id, SUM(amount) AS revenue\nFROM orders\n"
+                     f"GROUP BY region, customer_id\nQUALIFY ROW_NUMBER() OVER (PARTITION BY region "
+                     f"ORDER BY revenue DESC) <= {i};\n\nThis uses a window function to rank {{customers}}."),
+    }
+
+
+def build_corpus() -> Dict[str, str]:
+    small = [_pair(i) for i in range(5)]
+    large = [_pair(i) for i in range(120)]  # roughly 8k tokens of output
+    body = json.dumps(small, indent=2)
+    large_body = json.dumps(large, indent=2)
+    freeform = json.dumps([{"customer_name": f"Customer {i}", "region": "EMEA", "notes": f"Ordered {i} items"}
+                           for i in range(40)], indent=2)
+    broken = body.replace('"Write a SQL query', '"Write a "SQL" query', 1)
+    return {
+        "fenced_with_preamble": f"Here are [5] question/solution pairs:\n```json\n{body}\n```\nLet me know!",
+        "unescaped_quotes_in_one_item": broken,
+        "python_literals_with_apostrophes": repr([{"question": "What's a CTE?", "solution": "It's a named subquery."}] * 5),
+        "trailing_comma": body[:-1].rstrip() + ",\n]",
+        "truncated_small": body[:len(body) * 3 // 4],
+        "truncated_8k": "```json\n" + large_body[:len(large_body) - 200],
+        "truncated_freeform_schema": freeform[:len(freeform) - 150],
+        "eval_with_prose": 'My assessment: {"score": 4, "justification": "Correct, but the "QUALIFY" clause is Snowflake-only."}',
+    }
+
+
+def _items_recovered(result: List[Dict[str, Any]]) -> int:
+    return sum(1 for item in result if isinstance(item, dict) and "text" not in item)
+
+
+def _time(fn: Callable[[str], Any], text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'case':34} {'chars':>7} {'legacy us':>10} {'items':>5} {'tolerant us':>12} {'items':>5}")
+    for name, text in build_corpus().items():
+        legacy_us = _time(legacy_extract, text, args.repeat)
+        tolerant_us = _time(tolerant_extract, text, args.repeat)
+        print(f"{name:34} {len(text):7d} {legacy_us:10.1f} {_items_recovered(legacy_extract(text)):5d} "
+              f"{tolerant_us:12.1f} {_items_recovered(tolerant_extract(text)):5d}")
+
+
+if __name__ == "__main__":
+    main()
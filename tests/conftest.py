@@ -100,6 +100,20 @@ def upload_dir(tmp_path):
     upload_path.mkdir()
     return upload_path
 
+@pytest.fixture(autouse=True)
+def isolated_response_cache(monkeypatch, tmp_path_factory):
+    from app.core.response_cache import ResponseCache
+    stores = tmp_path_factory.mktemp("stores")
+    monkeypatch.setattr('app.core.response_cache._response_cache', ResponseCache(db_path=stores / "response_cache.db"))
+
+@pytest.fixture(autouse=True)
+def isolated_evaluation_store_and_rate_limits(monkeypatch, tmp_path_factory):
+    from app.core.evaluation_store import EvaluationStore
+    from app.core.rate_limiter import SharedRateLimiter
+    stores = tmp_path_factory.mktemp("stores")
+    monkeypatch.setattr('app.core.evaluation_store._evaluation_store', EvaluationStore(db_path=stores / "evaluation_store.db"))
+    monkeypatch.setattr('app.core.rate_limiter._rate_limiter', SharedRateLimiter(db_path=stores / "rate_limits.db"))
+
 @pytest.fixture(autouse=True)
 def mock_db(monkeypatch):
     from tests.mocks import mock_db as mdb
@@ -22,6 +22,9 @@ class MockDatabaseManager:
             "input_path": None,
             "generate_file_name": "test.json"
         }
+
+    def get_evaldata_by_filename(self, filename):
+        return None
     
     def update_hf_path(self, file_name, hf_path):
         self.metadata[file_name] = hf_path
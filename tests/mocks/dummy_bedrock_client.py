@@ -1,9 +1,17 @@
+import json
+
+
 class DummyBedrockClient:
     def converse(self, **kwargs):
-        # Return a dummy response for the converse API.
-        return {
+        # Return a dummy response in the shape of the converse API.
+        text = json.dumps([{
             "score": 1.0,
             "justification": "Dummy converse response"
+        }])
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+            "stopReason": "end_turn",
+            "usage": {"inputTokens": 1, "outputTokens": 1, "totalTokens": 2}
         }
     def invoke_model(self, modelId, body):
         # Return a dummy response for invoke_model.
@@ -15,4 +23,5 @@ class DummyBedrockClient:
     def meta(self):
         class Meta:
             region_name = "us-west-2"
+            endpoint_url = None
         return Meta()
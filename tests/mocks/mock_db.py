@@ -36,7 +36,8 @@ class MockDatabaseManager:
                 return True
         return False
 
-    def update_job_evaluate(self, job_name, evaluate_file_name, local_export_path, timestamp, average_score, job_status):
+    def update_job_evaluate(self, job_name, evaluate_file_name, local_export_path, timestamp, average_score, job_status,
+                            ci_half_width=None, ci_level=None, sample_size=None, results_path=None):
         for meta in self.evaluation_metadata:
             if meta.get('job_name') == job_name:
                 meta.update({
@@ -44,7 +45,11 @@ class MockDatabaseManager:
                     'local_export_path': local_export_path,
                     'timestamp': timestamp,
                     'average_score': average_score,
-                    'job_status': job_status
+                    'job_status': job_status,
+                    'average_score_ci_half_width': ci_half_width,
+                    'ci_level': ci_level,
+                    'sample_size': sample_size,
+                    'results_path': results_path
                 })
                 return True
         return False
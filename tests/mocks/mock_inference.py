@@ -0,0 +1,469 @@
+"""
+In-process fakes for the model providers, for offline and load tests.
+
+FakeBedrockClient / FakeAsyncBedrockClient stand in for the boto3
+``bedrock-runtime`` client and app.core.async_bedrock.AsyncBedrockClient;
+FakeOpenAI / FakeAsyncOpenAI stand in for the OpenAI clients used for CAII.
+All of them draw their behaviour from a MockInferenceEngine, which answers
+with use-case-shaped JSON and injects latency, throttling, server errors,
+truncation and malformed output at the rates of an InferenceProfile.
+tests/mocks/mock_inference_server.py serves the same engine over HTTP.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+
+@dataclass
+class LatencyProfile:
+    """
+    Log-normal latency with the given median and 99th percentile, plus a
+    per-output-token generation time used to pace streamed chunks.
+    """
+    median_ms: float = 0.0
+    p99_ms: float = 0.0
+    per_token_ms: float = 0.0
+
+    def sample_ms(self, rng: random.Random) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        if self.p99_ms <= self.median_ms:
+            return self.median_ms
+        # z(0.99) = 2.326
+        sigma = math.log(self.p99_ms / self.median_ms) / 2.326
+        return self.median_ms * math.exp(rng.gauss(0.0, sigma))
+
+
+@dataclass
+class InferenceProfile:
+    """Failure and latency rates applied to every call; rates are probabilities in [0, 1]"""
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    throttle_rate: float = 0.0
+    server_error_rate: float = 0.0
+    truncation_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+# Production-like shapes for load tests
+PROFILES = {
+    "instant": InferenceProfile(),
+    "healthy": InferenceProfile(latency=LatencyProfile(median_ms=800, p99_ms=4000, per_token_ms=10)),
+    "congested": InferenceProfile(latency=LatencyProfile(median_ms=1500, p99_ms=20000, per_token_ms=15),
+                                  throttle_rate=0.2, server_error_rate=0.02,
+                                  truncation_rate=0.05, malformed_rate=0.05),
+    "flaky": InferenceProfile(latency=LatencyProfile(median_ms=300, p99_ms=2000, per_token_ms=5),
+                              server_error_rate=0.1, truncation_rate=0.1, malformed_rate=0.2),
+}
+
+
+class MockThrottlingError(Exception):
+    status_code = 429
+    code = "ThrottlingException"
+
+
+class MockServerError(Exception):
+    status_code = 503
+    code = "ServiceUnavailableException"
+
+
+@dataclass
+class MockCompletion:
+    """One simulated model answer"""
+    text: str
+    input_tokens: int
+    output_tokens: int
+    latency_ms: float
+    per_token_ms: float
+    truncated: bool
+    structured: bool = False
+
+    @property
+    def stop_reason(self) -> str:
+        return "max_tokens" if self.truncated else "end_turn"
+
+    @property
+    def finish_reason(self) -> str:
+        return "length" if self.truncated else "stop"
+
+    def chunks(self, size: int = 16) -> List[str]:
+        return [self.text[i:i + size] for i in range(0, len(self.text), size)] or [""]
+
+
+_COUNT_RE = re.compile(r"Create\s+(\d+)")
+_TOPIC_RE = re.compile(r"<topic>(.*?)</topic>", re.S)
+_EXAMPLES_RE = re.compile(r"<examples>(.*?)</examples>", re.S)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockInferenceEngine:
+    """Turns a prompt into a MockCompletion, or raises a simulated provider error"""
+
+    def __init__(self, profile: Optional[InferenceProfile] = None):
+        self.profile = profile or InferenceProfile()
+        self._rng = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _roll(self, rate: float) -> bool:
+        return rate > 0 and self._rng.random() < rate
+
+    def complete(self, prompt: str, max_tokens: Optional[int] = None, structured: bool = False) -> MockCompletion:
+        """structured answers {"items": [...]}, as for a tool input or JSON-schema response_format"""
+        with self._lock:
+            self.calls += 1
+            if self._roll(self.profile.throttle_rate):
+                raise MockThrottlingError("Too many requests, please wait before trying again.")
+            if self._roll(self.profile.server_error_rate):
+                raise MockServerError("The service is temporarily unavailable.")
+            payload = self._payload(prompt)
+            text = json.dumps({"items": payload} if structured else payload)
+            truncated = self._roll(self.profile.truncation_rate)
+            if not structured and self._roll(self.profile.malformed_rate):
+                text = self._malform(text)
+            latency_ms = self.profile.latency.sample_ms(self._rng)
+            if truncated:
+                text = text[:self._rng.randint(1, max(1, len(text) - 1))]
+        output_tokens = _tokens(text)
+        if max_tokens and output_tokens > max_tokens:
+            text = text[:max_tokens * 4]
+            output_tokens = max_tokens
+            truncated = True
+        return MockCompletion(text, _tokens(prompt), output_tokens, latency_ms,
+                              self.profile.latency.per_token_ms, truncated, structured)
+
+    def _payload(self, prompt: str) -> List[Dict[str, Any]]:
+        """Answer shaped like the use case the prompt asks for"""
+        if '"justification"' in prompt:
+            return [{"score": self._rng.randint(1, 5),
+                     "justification": "The solution answers the question correctly and concisely."}]
+
+        match = _COUNT_RE.search(prompt)
+        count = int(match.group(1)) if match else 1
+        topic_match = _TOPIC_RE.search(prompt)
+        topic = topic_match.group(1).strip() if topic_match else "general"
+        items = []
+        for i in range(count):
+            n = self._rng.randint(0, 10 ** 6)
+            if "set of data" in prompt:
+                items.append({key: f"{topic} {key} {n}" for key in self._freeform_fields(prompt)})
+            elif "SQL" in prompt:
+                items.append({"question": f"Which {topic} rows have id {n}?",
+                              "solution": f"SELECT * FROM {topic.replace(' ', '_')} WHERE id = {n};"})
+            elif "programming" in prompt:
+                items.append({"question": f"How do you solve {topic} problem #{n}?",
+                              "solution": f"```python\ndef solve_{i}(data):\n    return sorted(data)[:{n % 10 + 1}]\n```"})
+            else:
+                items.append({"question": f"What is fact #{n} about {topic}?",
+                              "solution": f"Fact #{n} about {topic} is that it is well documented."})
+        return items
+
+    @staticmethod
+    def _freeform_fields(prompt: str) -> List[str]:
+        match = _EXAMPLES_RE.search(prompt)
+        if match:
+            try:
+                examples = json.loads(match.group(1))
+                if isinstance(examples, list) and examples and isinstance(examples[0], dict):
+                    return list(examples[0])
+            except json.JSONDecodeError:
+                pass
+        return ["input", "output"]
+
+    def _malform(self, text: str) -> str:
+        """The kinds of broken JSON models produce in practice"""
+        mode = self._rng.choice(["prose", "fence", "trailing_comma", "python_literal", "unescaped_quote"])
+        if mode == "prose":
+            return "Here is the JSON array you asked for:\n" + text + "\nLet me know if you need more."
+        if mode == "fence":
+            return "```json\n" + text + "\n```"
+        if mode == "trailing_comma":
+            return text[:-1] + ",]" if text.endswith("]") else text
+        if mode == "python_literal":
+            return repr(json.loads(text))
+        return text.replace(': "', ': "say "hi" ', 1)
+
+
+def _bedrock_error(e: Exception, operation_name: str) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": e.code, "Message": str(e)},
+         "ResponseMetadata": {"HTTPStatusCode": e.status_code}},
+        operation_name,
+    )
+
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    """Concatenate the text blocks (or plain string content) of every message"""
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block["text"] for block in content or [] if "text" in block)
+    return "".join(parts)
+
+
+def _tool_input(completion: MockCompletion):
+    """Tool input of a structured completion; a truncated one is returned as text instead"""
+    if not completion.structured or completion.truncated:
+        return None
+    return json.loads(completion.text)
+
+
+def converse_response(completion: MockCompletion) -> Dict[str, Any]:
+    """Body of a Bedrock converse response"""
+    tool_input = _tool_input(completion)
+    if tool_input is not None:
+        content = [{"toolUse": {"toolUseId": f"tooluse_mock{id(completion)}", "name": "record_items", "input": tool_input}}]
+    else:
+        content = [{"text": completion.text}]
+    return {
+        "output": {"message": {"role": "assistant", "content": content}},
+        "stopReason": "tool_use" if tool_input is not None else completion.stop_reason,
+        "usage": {"inputTokens": completion.input_tokens,
+                  "outputTokens": completion.output_tokens,
+                  "totalTokens": completion.input_tokens + completion.output_tokens},
+        "metrics": {"latencyMs": int(completion.latency_ms)},
+    }
+
+
+def converse_stream_events(completion: MockCompletion) -> Iterator[Dict[str, Any]]:
+    """Events of a Bedrock converse_stream response, as the boto3 stream yields them"""
+    structured = _tool_input(completion) is not None
+    yield {"messageStart": {"role": "assistant"}}
+    if structured:
+        yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": f"tooluse_mock{id(completion)}",
+                                                           "name": "record_items"}},
+                                     "contentBlockIndex": 0}}
+    for chunk in completion.chunks():
+        delta = {"toolUse": {"input": chunk}} if structured else {"text": chunk}
+        yield {"contentBlockDelta": {"delta": delta, "contentBlockIndex": 0}}
+    yield {"contentBlockStop": {"contentBlockIndex": 0}}
+    yield {"messageStop": {"stopReason": "tool_use" if structured else completion.stop_reason}}
+    yield {"metadata": {"usage": {"inputTokens": completion.input_tokens,
+                                  "outputTokens": completion.output_tokens,
+                                  "totalTokens": completion.input_tokens + completion.output_tokens},
+                        "metrics": {"latencyMs": int(completion.latency_ms)}}}
+
+
+def _delta_text(event: Dict[str, Any]) -> str:
+    delta = event["contentBlockDelta"]["delta"]
+    return delta.get("text") or delta["toolUse"]["input"]
+
+
+def _chunk_delay(completion: MockCompletion, chunk: str) -> float:
+    return completion.per_token_ms * _tokens(chunk) / 1000
+
+
+def _max_tokens(kwargs: Dict[str, Any]) -> Optional[int]:
+    return (kwargs.get("inferenceConfig") or {}).get("maxTokens") or kwargs.get("max_tokens")
+
+
+def _structured(kwargs: Dict[str, Any]) -> bool:
+    """Whether the request asks for schema-constrained output"""
+    return "toolConfig" in kwargs or (kwargs.get("response_format") or {}).get("type") == "json_schema"
+
+
+class FakeBedrockClient:
+    """Stand-in for the boto3 bedrock-runtime client"""
+
+    def __init__(self, profile: Optional[InferenceProfile] = None, engine: Optional[MockInferenceEngine] = None,
+                 region_name: str = "us-west-2"):
+        self.engine = engine or MockInferenceEngine(profile)
+        self.meta = SimpleNamespace(region_name=region_name, endpoint_url=None)
+
+    def _complete(self, kwargs: Dict[str, Any], operation_name: str) -> MockCompletion:
+        try:
+            completion = self.engine.complete(_prompt_text(kwargs.get("messages", [])), _max_tokens(kwargs), _structured(kwargs))
+        except (MockThrottlingError, MockServerError) as e:
+            raise _bedrock_error(e, operation_name)
+        time.sleep(completion.latency_ms / 1000)
+        return completion
+
+    def converse(self, modelId: str, **kwargs) -> Dict[str, Any]:
+        return converse_response(self._complete(kwargs, "Converse"))
+
+    def converse_stream(self, modelId: str, **kwargs) -> Dict[str, Any]:
+        completion = self._complete(kwargs, "ConverseStream")
+
+        def stream():
+            for event in converse_stream_events(completion):
+                if "contentBlockDelta" in event:
+                    time.sleep(_chunk_delay(completion, _delta_text(event)))
+                yield event
+        return {"stream": stream()}
+
+
+class FakeAsyncBedrockClient:
+    """Stand-in for app.core.async_bedrock.AsyncBedrockClient"""
+
+    def __init__(self, profile: Optional[InferenceProfile] = None, engine: Optional[MockInferenceEngine] = None,
+                 region_name: str = "us-west-2"):
+        self.engine = engine or MockInferenceEngine(profile)
+        self.region_name = region_name
+
+    async def _complete(self, kwargs: Dict[str, Any], operation_name: str) -> MockCompletion:
+        try:
+            completion = self.engine.complete(_prompt_text(kwargs.get("messages", [])), _max_tokens(kwargs), _structured(kwargs))
+        except (MockThrottlingError, MockServerError) as e:
+            raise _bedrock_error(e, operation_name)
+        await asyncio.sleep(completion.latency_ms / 1000)
+        return completion
+
+    async def converse(self, modelId: str, **kwargs) -> Dict[str, Any]:
+        return converse_response(await self._complete(kwargs, "Converse"))
+
+    async def converse_stream(self, modelId: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        completion = await self._complete(kwargs, "ConverseStream")
+        for event in converse_stream_events(completion):
+            if "contentBlockDelta" in event:
+                await asyncio.sleep(_chunk_delay(completion, _delta_text(event)))
+            yield event
+
+    async def close(self) -> None:
+        pass
+
+
+def chat_completion(completion: MockCompletion, model: str) -> Dict[str, Any]:
+    """Body of an OpenAI /chat/completions response"""
+    return {
+        "id": f"chatcmpl-mock-{id(completion)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0,
+                     "message": {"role": "assistant", "content": completion.text},
+                     "finish_reason": completion.finish_reason}],
+        "usage": {"prompt_tokens": completion.input_tokens,
+                  "completion_tokens": completion.output_tokens,
+                  "total_tokens": completion.input_tokens + completion.output_tokens},
+    }
+
+
+def chat_completion_chunks(completion: MockCompletion, model: str, include_usage: bool = False) -> Iterator[Dict[str, Any]]:
+    """Chunks of a streamed OpenAI /chat/completions response"""
+    base = {"id": f"chatcmpl-mock-{id(completion)}", "object": "chat.completion.chunk",
+            "created": int(time.time()), "model": model}
+    for chunk in completion.chunks():
+        yield {**base, "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {"content": None}, "finish_reason": completion.finish_reason}]}
+    if include_usage:
+        yield {**base, "choices": [],
+               "usage": {"prompt_tokens": completion.input_tokens,
+                         "completion_tokens": completion.output_tokens,
+                         "total_tokens": completion.input_tokens + completion.output_tokens}}
+
+
+def _namespace(value):
+    """Attribute access over a JSON body, like the openai response models"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_namespace(v) for v in value]
+    return value
+
+
+def _openai_error(e: Exception):
+    import httpx
+    import openai
+    response = httpx.Response(e.status_code, request=httpx.Request("POST", "http://mock/v1/chat/completions"))
+    error_class = openai.RateLimitError if e.status_code == 429 else openai.InternalServerError
+    return error_class(str(e), response=response, body=None)
+
+
+class _FakeCompletions:
+    def __init__(self, engine: MockInferenceEngine, is_async: bool):
+        self.engine = engine
+        self.is_async = is_async
+
+    def _complete(self, kwargs: Dict[str, Any]) -> MockCompletion:
+        try:
+            return self.engine.complete(_prompt_text(kwargs.get("messages", [])), _max_tokens(kwargs), _structured(kwargs))
+        except (MockThrottlingError, MockServerError) as e:
+            raise _openai_error(e)
+
+    def create(self, **kwargs):
+        if self.is_async:
+            return self._acreate(**kwargs)
+        completion = self._complete(kwargs)
+        time.sleep(completion.latency_ms / 1000)
+        if kwargs.get("stream"):
+            return self._stream(completion, kwargs)
+        return _namespace(chat_completion(completion, kwargs.get("model", "")))
+
+    async def _acreate(self, **kwargs):
+        completion = self._complete(kwargs)
+        await asyncio.sleep(completion.latency_ms / 1000)
+        if kwargs.get("stream"):
+            return self._astream(completion, kwargs)
+        return _namespace(chat_completion(completion, kwargs.get("model", "")))
+
+    @staticmethod
+    def _chunks(completion: MockCompletion, kwargs: Dict[str, Any]):
+        include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+        return chat_completion_chunks(completion, kwargs.get("model", ""), include_usage)
+
+    def _stream(self, completion: MockCompletion, kwargs: Dict[str, Any]):
+        for chunk in self._chunks(completion, kwargs):
+            if chunk["choices"]:
+                time.sleep(_chunk_delay(completion, chunk["choices"][0]["delta"]["content"] or ""))
+            yield _namespace(chunk)
+
+    async def _astream(self, completion: MockCompletion, kwargs: Dict[str, Any]):
+        for chunk in self._chunks(completion, kwargs):
+            if chunk["choices"]:
+                await asyncio.sleep(_chunk_delay(completion, chunk["choices"][0]["delta"]["content"] or ""))
+            yield _namespace(chunk)
+
+
+class _FakeModels:
+    def __init__(self, model_ids: List[str], is_async: bool):
+        self.model_ids = model_ids
+        self.is_async = is_async
+
+    def list(self):
+        page = _namespace({"object": "list",
+                           "data": [{"id": m, "object": "model", "owned_by": "mock"} for m in self.model_ids]})
+        if not self.is_async:
+            return page
+
+        async def result():
+            return page
+        return result()
+
+
+class FakeOpenAI:
+    """Stand-in for openai.OpenAI as used for CAII endpoints"""
+
+    _is_async = False
+
+    def __init__(self, profile: Optional[InferenceProfile] = None, engine: Optional[MockInferenceEngine] = None,
+                 model_ids: Optional[List[str]] = None):
+        self.engine = engine or MockInferenceEngine(profile)
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self.engine, self._is_async))
+        self.models = _FakeModels(model_ids or ["mock-model"], self._is_async)
+
+    def close(self):
+        pass
+
+
+class FakeAsyncOpenAI(FakeOpenAI):
+    """Stand-in for openai.AsyncOpenAI as used for CAII endpoints"""
+
+    _is_async = True
+
+    async def close(self):
+        pass
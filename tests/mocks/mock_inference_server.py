@@ -0,0 +1,171 @@
+"""
+Local stand-in for Bedrock runtime and an OpenAI-compatible (CAII) endpoint.
+
+Serves the Bedrock ``converse`` / ``converse-stream`` routes and OpenAI
+``/v1/chat/completions`` + ``/v1/models`` from a MockInferenceEngine, so the
+app and CML jobs can be load-tested without credentials or quota:
+
+    python -m tests.mocks.mock_inference_server --profile congested --port 8100
+    AWS_ENDPOINT_URL_BEDROCK_RUNTIME=http://localhost:8100 uvicorn app.main:app
+
+and for CAII use http://localhost:8100/v1/chat/completions as the endpoint.
+Request signatures are not checked; any AWS credentials will do.
+"""
+import argparse
+import asyncio
+import json
+import struct
+import zlib
+from dataclasses import replace
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from tests.mocks.mock_inference import (
+    PROFILES,
+    InferenceProfile,
+    MockInferenceEngine,
+    MockServerError,
+    MockThrottlingError,
+    _chunk_delay,
+    _delta_text,
+    _max_tokens,
+    _prompt_text,
+    _structured,
+    chat_completion,
+    chat_completion_chunks,
+    converse_response,
+    converse_stream_events,
+)
+
+
+def _encode_header(name: str, value: str) -> bytes:
+    name_bytes = name.encode("utf-8")
+    value_bytes = value.encode("utf-8")
+    # type 7 = string
+    return struct.pack("!B", len(name_bytes)) + name_bytes + struct.pack("!BH", 7, len(value_bytes)) + value_bytes
+
+
+def encode_event_message(headers: Dict[str, str], payload: bytes) -> bytes:
+    """One frame of the AWS event stream encoding (application/vnd.amazon.eventstream)"""
+    header_bytes = b"".join(_encode_header(k, v) for k, v in headers.items())
+    total_length = 12 + len(header_bytes) + len(payload) + 4
+    prelude = struct.pack("!II", total_length, len(header_bytes))
+    prelude += struct.pack("!I", zlib.crc32(prelude) & 0xFFFFFFFF)
+    message = prelude + header_bytes + payload
+    return message + struct.pack("!I", zlib.crc32(message) & 0xFFFFFFFF)
+
+
+def _event_frame(event: Dict) -> bytes:
+    (event_type, body), = event.items()
+    return encode_event_message(
+        {":event-type": event_type, ":content-type": "application/json", ":message-type": "event"},
+        json.dumps(body).encode("utf-8"),
+    )
+
+
+def _bedrock_error_response(e: Exception) -> JSONResponse:
+    return JSONResponse({"message": str(e)}, status_code=e.status_code,
+                        headers={"x-amzn-ErrorType": f"{e.code}:http://internal.amazon.com/coral/com.amazon.bedrock/"})
+
+
+def _openai_error_response(e: Exception) -> JSONResponse:
+    error_type = "rate_limit_error" if e.status_code == 429 else "server_error"
+    return JSONResponse({"error": {"message": str(e), "type": error_type, "code": e.status_code}},
+                        status_code=e.status_code)
+
+
+def create_app(profile: Optional[InferenceProfile] = None, model_ids: Optional[list] = None) -> FastAPI:
+    engine = MockInferenceEngine(profile)
+    app = FastAPI(title="Mock inference server")
+    app.state.engine = engine
+
+    async def complete(body: Dict):
+        completion = engine.complete(_prompt_text(body.get("messages", [])), _max_tokens(body), _structured(body))
+        await asyncio.sleep(completion.latency_ms / 1000)
+        return completion
+
+    @app.post("/model/{model_id:path}/converse")
+    async def converse(model_id: str, request: Request):
+        try:
+            completion = await complete(await request.json())
+        except (MockThrottlingError, MockServerError) as e:
+            return _bedrock_error_response(e)
+        return JSONResponse(converse_response(completion))
+
+    @app.post("/model/{model_id:path}/converse-stream")
+    async def converse_stream(model_id: str, request: Request):
+        try:
+            completion = await complete(await request.json())
+        except (MockThrottlingError, MockServerError) as e:
+            return _bedrock_error_response(e)
+
+        async def frames():
+            for event in converse_stream_events(completion):
+                if "contentBlockDelta" in event:
+                    await asyncio.sleep(_chunk_delay(completion, _delta_text(event)))
+                yield _event_frame(event)
+        return StreamingResponse(frames(), media_type="application/vnd.amazon.eventstream")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        try:
+            completion = await complete(body)
+        except (MockThrottlingError, MockServerError) as e:
+            return _openai_error_response(e)
+        model = body.get("model", "")
+        if not body.get("stream"):
+            return JSONResponse(chat_completion(completion, model))
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        async def events():
+            for chunk in chat_completion_chunks(completion, model, include_usage):
+                if chunk["choices"]:
+                    await asyncio.sleep(_chunk_delay(completion, chunk["choices"][0]["delta"]["content"] or ""))
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list",
+                "data": [{"id": m, "object": "model", "owned_by": "mock"} for m in model_ids or ["mock-model"]]}
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": engine.calls}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="healthy")
+    parser.add_argument("--median-ms", type=float, help="override the profile's median latency")
+    parser.add_argument("--p99-ms", type=float, help="override the profile's p99 latency")
+    parser.add_argument("--per-token-ms", type=float, help="override the profile's streaming time per token")
+    for rate in ("throttle_rate", "server_error_rate", "truncation_rate", "malformed_rate"):
+        parser.add_argument(f"--{rate.replace('_', '-')}", type=float, dest=rate)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--model", action="append", dest="models", help="model id listed by /v1/models")
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    latency = replace(profile.latency, **{k: v for k, v in (("median_ms", args.median_ms),
+                                                            ("p99_ms", args.p99_ms),
+                                                            ("per_token_ms", args.per_token_ms)) if v is not None})
+    overrides = {k: getattr(args, k) for k in ("throttle_rate", "server_error_rate", "truncation_rate",
+                                               "malformed_rate", "seed") if getattr(args, k) is not None}
+    profile = replace(profile, latency=latency, **overrides)
+
+    import uvicorn
+    uvicorn.run(create_app(profile, args.models), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+from app.core import config
+from app.core.caii_clients import get_caii_client, get_async_caii_client
+
+def test_sync_client_reused_per_endpoint_and_token():
+    first = get_caii_client("https://caii.example/v1/chat/completions", "token-a")
+    second = get_caii_client("https://caii.example/v1", "token-a")
+    assert first is second
+
+def test_sync_client_replaced_on_new_token():
+    first = get_caii_client("https://caii-rotate.example/v1", "token-a")
+    second = get_caii_client("https://caii-rotate.example/v1", "token-b")
+    assert first is not second
+    assert second.api_key == "token-b"
+    # Threads still mid-request on the old client keep a working transport
+    assert not first.is_closed()
+
+@pytest.mark.asyncio
+async def test_async_client_reused_within_loop():
+    first = get_async_caii_client("https://caii.example/v1", "token-a")
+    second = get_async_caii_client("https://caii.example/v1/chat/completions", "token-a")
+    assert first is second
+
+def test_token_reloaded_only_when_jwt_changes(tmp_path, monkeypatch):
+    jwt_path = tmp_path / "jwt"
+    jwt_path.write_text(json.dumps({"access_token": "first"}))
+    monkeypatch.delenv("CDP_TOKEN", raising=False)
+    monkeypatch.setattr(config, "JWT_PATH", jwt_path)
+    monkeypatch.setattr(config, "_jwt_cache", None)
+
+    assert config._get_caii_token() == "first"
+    with patch("builtins.open", side_effect=AssertionError("JWT re-read without mtime change")):
+        assert config._get_caii_token() == "first"
+
+    jwt_path.write_text(json.dumps({"access_token": "second"}))
+    stat = os.stat(jwt_path)
+    os.utime(jwt_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert config._get_caii_token() == "second"
@@ -0,0 +1,28 @@
+from app.core.checkpoint import JobCheckpoint
+
+def test_units_and_meta_survive_reopen(tmp_path):
+    checkpoint = JobCheckpoint("synth_job_ab12", directory=str(tmp_path))
+    checkpoint.set_meta("params", {"job_name": "synth_job_ab12", "num_questions": 5})
+    assert checkpoint.output_file("first.json") == "first.json"
+    checkpoint.record_unit("topic/1/0", [{"question": "b?"}])
+    checkpoint.record_unit("topic/0/0", [{"question": "a?"}])
+    checkpoint.record_unit("row/0", [{"solution": "x"}])
+    checkpoint.close()
+
+    resumed = JobCheckpoint("synth_job_ab12", directory=str(tmp_path))
+    assert resumed.get_meta("params")["num_questions"] == 5
+    # A resumed run keeps writing to the output file the first run chose
+    assert resumed.output_file("second.json") == "first.json"
+    assert resumed.completed_units("topic/") == {
+        "topic/1/0": [{"question": "b?"}],
+        "topic/0/0": [{"question": "a?"}],
+    }
+    assert list(resumed.completed_units("row/")) == ["row/0"]
+
+def test_discard_removes_the_checkpoint(tmp_path):
+    checkpoint = JobCheckpoint("eval job/1", directory=str(tmp_path))
+    checkpoint.record_unit("row/0", [{"score": 4}])
+    assert JobCheckpoint.exists("eval job/1", directory=str(tmp_path))
+    checkpoint.discard()
+    assert not JobCheckpoint.exists("eval job/1", directory=str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
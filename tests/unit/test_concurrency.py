@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app.core.concurrency import AdaptiveConcurrencyController, SUCCESS, CONGESTION
+
+@pytest.fixture(autouse=True)
+def no_telemetry():
+    with patch('app.core.concurrency.telemetry_manager'):
+        yield
+
+@pytest.mark.asyncio
+async def test_limit_grows_additively_on_success():
+    controller = AdaptiveConcurrencyController("test.model", initial_limit=2, max_limit=10)
+    for _ in range(10):
+        async with controller.slot() as outcome:
+            outcome["value"] = SUCCESS
+    assert 4 <= controller.limit < 6
+    assert controller.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_burst_of_throttles_halves_limit_once():
+    controller = AdaptiveConcurrencyController("test.model", initial_limit=8, max_limit=10)
+    started = [await controller.acquire() for _ in range(4)]
+    for started_at in started:
+        controller.release(started_at, CONGESTION)
+    assert int(controller.limit) == 4
+    assert controller.history[-1]["event"] == "decrease"
+
+@pytest.mark.asyncio
+async def test_in_flight_never_exceeds_limit():
+    controller = AdaptiveConcurrencyController("test.model", initial_limit=3, max_limit=3)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with controller.slot() as outcome:
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.01)
+            outcome["value"] = SUCCESS
+
+    await asyncio.gather(*[call() for _ in range(20)])
+    assert peak == 3
+    assert controller.in_flight == 0
+
+def test_sync_callers_share_the_limit_across_threads():
+    controller = AdaptiveConcurrencyController("test.model", initial_limit=2, max_limit=2)
+    peak = 0
+    peak_lock = threading.Lock()
+
+    def call():
+        nonlocal peak
+        with controller.sync_slot() as outcome:
+            with peak_lock:
+                peak = max(peak, controller.in_flight)
+            time.sleep(0.01)
+            outcome["value"] = SUCCESS
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert peak == 2
+    assert controller.in_flight == 0
+    assert controller.successes == 8
@@ -0,0 +1,26 @@
+from app.core.dedup import MinHashIndex, jaccard, shingles
+
+def test_reworded_question_is_a_duplicate():
+    index = MinHashIndex(threshold=0.7)
+    assert index.add_if_new("How do you reverse a linked list in Python?")
+    assert not index.add_if_new("How can you reverse a linked list in python")
+    assert index.add_if_new("How do you reverse a string in Python?")
+    assert (index.checked, index.duplicates) == (3, 1)
+
+def test_distinct_items_are_kept():
+    index = MinHashIndex(threshold=0.7)
+    questions = [
+        "Write a SQL query that lists customers who placed more than five orders last month",
+        "Implement binary search over a sorted array",
+        "Explain the difference between a list and a tuple in Python",
+        "Write a function to check whether a string is a palindrome",
+        "Find all employees whose salary is above the department average",
+        "Implement a stack using two queues",
+        "Return the top 5 products by revenue",
+    ]
+    assert all(index.add_if_new(q) for q in questions)
+    assert index.hit_rate == 0.0
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Hello,   World!") == shingles("hello world")
+    assert jaccard(shingles("abc"), shingles("abc")) == 1.0
@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+from app.core.checkpoint import JobCheckpoint
+from app.core.evaluation_store import EvaluationStore
+from app.models.request_models import EvaluationRequest, ModelParameters
+from app.services.evaluator_service import EvaluatorService
+
+@pytest.fixture
+def store(tmp_path):
+    return EvaluationStore(db_path=tmp_path / "evaluations.db")
+
+def test_judge_key_depends_on_prompt_and_params():
+    key = EvaluationStore.judge_key("m", "aws_bedrock", "rubric", ModelParameters())
+    assert key == EvaluationStore.judge_key("m", "aws_bedrock", "rubric", ModelParameters())
+    assert key != EvaluationStore.judge_key("m", "aws_bedrock", "other rubric", ModelParameters())
+    assert key != EvaluationStore.judge_key("m", "aws_bedrock", "rubric", ModelParameters(temperature=0.5))
+
+def test_results_are_scoped_to_the_judge(store):
+    content_key = EvaluationStore.content_key({"a": 1})
+    store.put_many("judge", {content_key: {"row": {"a": 1}, "evaluation": {"score": 4}}})
+    assert store.get_many("judge", [content_key, EvaluationStore.content_key({"a": 2})]) == {
+        content_key: {"row": {"a": 1}, "evaluation": {"score": 4}}}
+    assert store.get_many("other judge", [content_key]) == {}
+
+@pytest.mark.asyncio
+async def test_re_evaluation_scores_only_changed_rows(store):
+    scored = []
+    async def evaluate_single_row(row, model_handler, request, request_id=None):
+        scored.append(row["id"])
+        return {"row": row, "evaluation": {"score": 3, "justification": "ok"}}
+    service = EvaluatorService()
+    request = EvaluationRequest(
+        use_case="custom",
+        model_id="test.model",
+        inference_type="aws_bedrock",
+        is_demo=True
+    )
+    rows = [{"id": n, "text": f"row {n}"} for n in range(5)]
+    with patch('app.services.evaluator_service.get_evaluation_store', return_value=store), \
+         patch.object(service, 'evaluate_single_row', side_effect=evaluate_single_row):
+        stored = service._stored_evaluations(request, ModelParameters(), "rows")
+        await service.evaluate_rows(rows, None, request, stored=stored)
+        rows[2] = {"id": 2, "text": "edited"}
+        stored = service._stored_evaluations(request, ModelParameters(), "rows")
+        stats = await service.evaluate_rows(rows, None, request, stored=stored)
+    assert scored == [0, 1, 2, 3, 4, 2]
+    assert (stored.reused, stored.scored) == (4, 1)
+    assert stats["evaluated_rows"][2]["row"]["text"] == "edited"
+
+@pytest.mark.asyncio
+async def test_checkpoint_resumes_are_not_counted_as_store_hits(store, tmp_path):
+    async def evaluate_single_row(row, model_handler, request, request_id=None):
+        return {"row": row, "evaluation": {"score": 3, "justification": "ok"}}
+    service = EvaluatorService()
+    request = EvaluationRequest(
+        use_case="custom",
+        model_id="test.model",
+        inference_type="aws_bedrock",
+        is_demo=True
+    )
+    rows = [{"id": n} for n in range(3)]
+    checkpoint = JobCheckpoint("resume-counts", directory=str(tmp_path))
+    with patch('app.services.evaluator_service.get_evaluation_store', return_value=store), \
+         patch.object(service, 'evaluate_single_row', side_effect=evaluate_single_row):
+        await service.evaluate_rows(rows, None, request, checkpoint=checkpoint,
+                                    stored=service._stored_evaluations(request, ModelParameters(), "rows"))
+        stored = service._stored_evaluations(request, ModelParameters(), "rows")
+        await service.evaluate_rows(rows, None, request, checkpoint=checkpoint, stored=stored)
+    assert (stored.resumed, stored.reused, stored.scored) == (3, 0, 0)
@@ -1,7 +1,8 @@
 import pytest
 from io import StringIO
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 import json
+import asyncio
 from app.services.evaluator_service import EvaluatorService
 from app.models.request_models import EvaluationRequest
 from tests.mocks.mock_db import MockDatabaseManager
@@ -24,7 +25,8 @@ def evaluator_service():
     service.db = MockDatabaseManager()
     return service
 
-def test_evaluate_results(evaluator_service, mock_qa_file):
+@pytest.mark.asyncio
+async def test_evaluate_results(evaluator_service, mock_qa_file):
     request = EvaluationRequest(
         model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
         use_case="custom",
@@ -34,16 +36,40 @@ def test_evaluate_results(evaluator_service, mock_qa_file):
         output_value="Completion"
     )
     with patch('app.services.evaluator_service.create_handler') as mock_handler:
-        mock_handler.return_value.generate_response.return_value = [{"score": 4, "justification": "Good answer"}]
-        result = evaluator_service.evaluate_results(request)
+        mock_handler.return_value.agenerate_response = AsyncMock(return_value=[{"score": 4, "justification": "Good answer"}])
+        result = await evaluator_service.evaluate_results(request)
         assert result["status"] == "completed"
         assert "output_path" in result
         assert len(evaluator_service.db.evaluation_metadata) == 1
 
-def test_evaluate_single_pair():
+@pytest.mark.asyncio
+async def test_evaluate_results_converts_string_scores(evaluator_service, tmp_path):
+    file_path = tmp_path / "qa_pairs.json"
+    with open(file_path, "w") as f:
+        json.dump([{"Seeds": "topic", "Prompt": f"q{n}", "Completion": f"a{n}"} for n in range(2)], f)
+    request = EvaluationRequest(
+        model_id="test.model",
+        use_case="custom",
+        import_path=str(file_path),
+        is_demo=True,
+        reuse_evaluations=False
+    )
+    with patch('app.services.evaluator_service.create_handler') as mock_handler:
+        mock_handler.return_value.agenerate_response = AsyncMock(side_effect=[
+            [{"score": "4", "justification": "Good answer"}],
+            [{"score": "high", "justification": "Good answer"}],
+        ])
+        result = await evaluator_service.evaluate_results(request)
+    topic = result["result"]["topic"]
+    assert [pair["evaluation"]["score"] for pair in topic["evaluated_pairs"]] == [4.0, 0]
+    assert topic["max_score"] == 4.0
+    assert result["result"]["Overall_Average"] == 2.0
+
+@pytest.mark.asyncio
+async def test_evaluate_single_pair():
     with patch('app.services.evaluator_service.create_handler') as mock_handler:
         mock_response = [{"score": 4, "justification": "Good explanation"}]
-        mock_handler.return_value.generate_response.return_value = mock_response
+        mock_handler.return_value.agenerate_response = AsyncMock(return_value=mock_response)
         service = EvaluatorService()
         qa_pair = {"Prompt": "What is Python?", "Completion": "Python is a programming language"}
         request = EvaluationRequest(
@@ -54,14 +80,15 @@ def test_evaluate_single_pair():
             output_key="Prompt",
             output_value="Completion"
         )
-        result = service.evaluate_single_pair(qa_pair, mock_handler.return_value, request)
+        result = await service.evaluate_single_pair(qa_pair, mock_handler.return_value, request)
         assert result["evaluation"]["score"] == 4
         assert "justification" in result["evaluation"]
 
-def test_evaluate_results_with_error():
+@pytest.mark.asyncio
+async def test_evaluate_results_with_error():
     fake_json = '[{"Seeds": "python_basics", "Prompt": "What is Python?", "Completion": "Python is a programming language"}]'
     class DummyHandler:
-        def generate_response(self, prompt, **kwargs):  # Accept any keyword arguments
+        async def agenerate_response(self, prompt, **kwargs):  # Accept any keyword arguments
             raise ModelHandlerError("Test error")
     with patch('app.services.evaluator_service.os.path.exists', return_value=True), \
          patch('builtins.open', new=lambda f, mode, *args, **kwargs: StringIO(fake_json)), \
@@ -80,4 +107,116 @@ def test_evaluate_results_with_error():
             display_name="dummy"
         )
         with pytest.raises(APIError, match="Test error"):
-            service.evaluate_results(request)
+            await service.evaluate_results(request)
+
+@pytest.mark.asyncio
+async def test_evaluate_topic_bounds_in_flight_and_keeps_order():
+    service = EvaluatorService()
+    in_flight = 0
+    peak = 0
+    async def evaluate_single_pair(pair, model_handler, request, request_id=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * (pair["n"] % 3))
+        in_flight -= 1
+        if pair["n"] == 4:
+            raise ValueError("bad pair")
+        return {"n": pair["n"], "evaluation": {"score": pair["n"] % 5 + 1}}
+    request = EvaluationRequest(
+        use_case="custom",
+        model_id="test.model",
+        inference_type="aws_bedrock",
+        is_demo=True,
+        output_key="Prompt",
+        output_value="Completion"
+    )
+    pairs = [{"n": n} for n in range(20)]
+    with patch('app.services.evaluator_service.EVALUATION_MAX_IN_FLIGHT', 3), \
+         patch.object(service, 'evaluate_single_pair', side_effect=evaluate_single_pair):
+        stats = await service.evaluate_topic("t", pairs, None, request)
+    assert peak <= 3
+    assert [pair["n"] for pair in stats["evaluated_pairs"]] == [n for n in range(20) if n != 4]
+    assert stats["total_failed"] == 1 and stats["failed_pairs"][0]["pair"] == {"n": 4}
+    assert stats["min_score"] == 1 and stats["max_score"] == 5
+
+@pytest.mark.asyncio
+async def test_batched_evaluation_retries_only_missing_pairs():
+    service = EvaluatorService()
+    prompts = []
+    async def agenerate_response(prompt, request_id=None):
+        prompts.append(prompt)
+        ids = [line.split('"')[1] for line in prompt.split("\n") if line.strip().startswith("<item id=")]
+        if len(prompts) == 1:
+            # Leave out the second pair and give the third a malformed score
+            return [{"id": ids[0], "score": 5, "justification": "ok"},
+                    {"id": ids[2], "score": "high", "justification": "bad"},
+                    {"id": ids[3], "score": 3, "justification": "ok"}]
+        return [{"id": i, "score": 4, "justification": "retried"} for i in ids]
+    handler = AsyncMock()
+    handler.agenerate_response = agenerate_response
+    request = EvaluationRequest(
+        use_case="custom",
+        model_id="test.model",
+        inference_type="aws_bedrock",
+        is_demo=True,
+        output_key="Prompt",
+        output_value="Completion",
+        eval_batch_size=4
+    )
+    pairs = [{"Prompt": f"q{n}", "Completion": f"a{n}"} for n in range(4)]
+    stats = await service.evaluate_topic("t", pairs, handler, request)
+    assert len(prompts) == 2
+    assert "q1" in prompts[1] and "q2" in prompts[1] and "q0" not in prompts[1]
+    assert [pair["question"] for pair in stats["evaluated_pairs"]] == ["q0", "q1", "q2", "q3"]
+    assert [pair["evaluation"]["score"] for pair in stats["evaluated_pairs"]] == [5, 4, 4, 3]
+
+@pytest.mark.asyncio
+async def test_sampling_mode_judges_a_stratified_sample(evaluator_service, tmp_path):
+    file_path = tmp_path / "qa_pairs.json"
+    with open(file_path, "w") as f:
+        json.dump([{"Seeds": f"topic{n % 2}", "Prompt": f"q{n}", "Completion": f"a{n}"} for n in range(1000)], f)
+    request = EvaluationRequest(
+        model_id="test.model",
+        use_case="custom",
+        import_path=str(file_path),
+        is_demo=True,
+        ci_half_width=0.1,
+        reuse_evaluations=False
+    )
+    with patch('app.services.evaluator_service.create_handler') as mock_handler:
+        mock_handler.return_value.agenerate_response = AsyncMock(return_value=[{"score": 4, "justification": "Good answer"}])
+        result = await evaluator_service.evaluate_results(request)
+    assert result["population_size"] == 1000
+    assert result["sample_size"] < 1000 and result["ci_half_width"] == 0
+    assert result["result"]["topic0"]["sample_size"] == result["result"]["topic0"]["total_evaluated"]
+    assert evaluator_service.db.evaluation_metadata[0]["sample_size"] == result["sample_size"]
+    with open(result["output_path"]) as f:
+        saved = json.load(f)
+    assert (saved["sample_size"], saved["ci_half_width"]) == (result["sample_size"], result["ci_half_width"])
+
+@pytest.mark.asyncio
+async def test_streaming_mode_appends_results_in_input_order(evaluator_service, tmp_path):
+    file_path = tmp_path / "qa_pairs.jsonl"
+    with open(file_path, "w") as f:
+        for n in range(30):
+            f.write(json.dumps({"Seeds": f"topic{n % 2}", "Prompt": f"q{n}", "Completion": f"a{n}"}) + "\n")
+    request = EvaluationRequest(
+        model_id="test.model",
+        use_case="custom",
+        import_path=str(file_path),
+        is_demo=True,
+        reuse_evaluations=False
+    )
+    with patch('app.services.evaluator_service.create_handler') as mock_handler, \
+         patch('app.services.evaluator_service.EVALUATION_STREAM_PREVIEW_ITEMS', 5):
+        mock_handler.return_value.agenerate_response = AsyncMock(return_value=[{"score": 4, "justification": "Good answer"}])
+        result = await evaluator_service.evaluate_results(request)
+    with open(result["results_path"]) as f:
+        records = [json.loads(line) for line in f]
+    assert [record["question"] for record in records] == [f"q{n}" for n in range(30)]
+    assert evaluator_service.db.evaluation_metadata[0]["results_path"] == result["results_path"]
+    assert records[1]["Seeds"] == "topic1"
+    topic = result["result"]["topic0"]
+    assert topic["total_evaluated"] == 15 and len(topic["evaluated_pairs"]) == 5
+    assert result["result"]["Overall_Average"] == 4
@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import Mock
+from app.core.json_stream import JsonArrayStreamParser, scan_json_objects
+from app.core.model_handlers import UnifiedModelHandler
+
+def feed_all(parser, chunks):
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return items
+
+def test_objects_emitted_as_soon_as_they_close():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('Here you go:\n```json\n[{"question": "a?", ') == []
+    assert parser.feed('"solution": "x"}, {"question"') == [{"question": "a?", "solution": "x"}]
+    assert parser.feed(': "b?", "solution": "y"}]\n```') == [{"question": "b?", "solution": "y"}]
+
+def test_braces_and_escapes_inside_strings():
+    text = '[{"question": "What does {} mean?", "solution": "A \\"dict\\" literal: {\\"a\\": [1]}"}]'
+    parser = JsonArrayStreamParser()
+    items = feed_all(parser, [text[i:i + 3] for i in range(0, len(text), 3)])
+    assert items == [{"question": "What does {} mean?", "solution": 'A "dict" literal: {"a": [1]}'}]
+
+def test_nested_values_and_malformed_objects():
+    parser = JsonArrayStreamParser()
+    items = feed_all(parser, ['[{"a": {"b": [1, 2]}}, {bad}, {"c": 3}]'])
+    assert items == [{"a": {"b": [1, 2]}}, {"c": 3}]
+    assert parser.skipped == 1
+
+def test_scan_repairs_unescaped_quotes_and_drops_truncated_tail():
+    text = ('Sure! Here are [3] pairs:\n```json\n[{"question": "a?", "solution": "x"},\n'
+            '{"question": "b?", "solution": "say "hi""},\n'
+            "{'question': \"It's c?\", 'solution': 'z'},\n"
+            '{"question": "d?", "solution": "trunc')
+    assert scan_json_objects(text) == [
+        {"question": "a?", "solution": "x"},
+        {"question": "b?", "solution": 'say "hi"'},
+        {"question": "It's c?", "solution": "z"},
+    ]
+
+def test_scan_top_level_objects_and_nested_values():
+    text = 'Evaluation: {"score": 4, "justification": "uses [brackets] and {braces}", "extra": {"a": [1]}} done'
+    assert scan_json_objects(text) == [
+        {"score": 4, "justification": "uses [brackets] and {braces}", "extra": {"a": [1]}}
+    ]
+
+def test_extract_json_keeps_apostrophes_and_text_fallback():
+    handler = UnifiedModelHandler("test.model")
+    parsed = handler._extract_json_from_text('[{"question": "What\'s 2+2?", "solution": "4"},]')
+    assert parsed == [{"question": "What's 2+2?", "solution": "4"}]
+    assert handler._extract_json_from_text("no json here") == [{"text": "no json here"}]
+
+@pytest.mark.asyncio
+async def test_handler_streams_items_from_converse_stream():
+    chunks = ['[{"question": "q1?", "solution": "s1"},', ' {"question": "q2?", "solution": "s2"}]']
+
+    async def converse_stream(**kwargs):
+        yield {"messageStart": {"role": "assistant"}}
+        for chunk in chunks:
+            yield {"contentBlockDelta": {"delta": {"text": chunk}}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+
+    mock_async_client = Mock()
+    mock_async_client.converse_stream = converse_stream
+    handler = UnifiedModelHandler("test.model", bedrock_client=Mock(), async_bedrock_client=mock_async_client, use_cache=False)
+    items = [item async for item in handler.astream_response("prompt")]
+    assert [item["question"] for item in items] == ["q1?", "q2?"]
+
+@pytest.mark.asyncio
+async def test_handler_stream_falls_back_to_full_text_parsing():
+    async def converse_stream(**kwargs):
+        yield {"contentBlockDelta": {"delta": {"text": "no json here"}}}
+
+    mock_async_client = Mock()
+    mock_async_client.converse_stream = converse_stream
+    handler = UnifiedModelHandler("test.model", bedrock_client=Mock(), async_bedrock_client=mock_async_client, use_cache=False)
+    items = [item async for item in handler.astream_response("prompt")]
+    assert items == [{"text": "no json here"}]
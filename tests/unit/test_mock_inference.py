@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from botocore.eventstream import EventStreamBuffer
+from app.core.model_handlers import UnifiedModelHandler
+from app.core.prompt_templates import PromptBuilder
+from app.core.config import UseCase
+from tests.mocks.mock_inference import (
+    FakeAsyncBedrockClient, FakeAsyncOpenAI, FakeBedrockClient, InferenceProfile, MockInferenceEngine
+)
+from tests.mocks.mock_inference_server import _event_frame
+
+MODEL_ID = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+
+def _prompt(use_case=UseCase.TEXT2SQL, num_questions=3):
+    return PromptBuilder.build_prompt(
+        model_id=MODEL_ID, use_case=use_case, topic="joins", num_questions=num_questions,
+        omit_questions=[], examples=[], custom_prompt=None
+    )
+
+def test_engine_answers_in_use_case_shape():
+    engine = MockInferenceEngine(InferenceProfile(seed=1))
+    completion = engine.complete(_prompt(num_questions=4))
+    handler = UnifiedModelHandler(MODEL_ID, bedrock_client=FakeBedrockClient(engine=engine), use_cache=False)
+    items = handler._extract_json_from_text(completion.text)
+    assert len(items) == 4
+    assert all(item["solution"].startswith("SELECT") for item in items)
+
+@pytest.mark.asyncio
+async def test_handler_retries_through_fake_throttling():
+    client = FakeAsyncBedrockClient(InferenceProfile(throttle_rate=0.5, seed=3))
+    handler = UnifiedModelHandler(MODEL_ID, bedrock_client=FakeBedrockClient(), async_bedrock_client=client, use_cache=False)
+    with patch('app.core.model_handlers.asyncio.sleep', new=AsyncMock()):
+        results = [await handler.agenerate_response(_prompt(UseCase.CODE_GENERATION, 2)) for _ in range(5)]
+    assert all(len(items) == 2 for items in results)
+    assert client.engine.calls > 5
+
+@pytest.mark.asyncio
+async def test_malformed_and_truncated_output_still_yields_items():
+    client = FakeAsyncOpenAI(InferenceProfile(malformed_rate=1.0, seed=5))
+    handler = UnifiedModelHandler(MODEL_ID, inference_type="CAII", caii_endpoint="http://mock/v1/chat/completions",
+                                  use_cache=False)
+    with patch('app.core.model_handlers.get_async_caii_client', return_value=client), \
+         patch('app.core.model_handlers._get_caii_token', return_value="token"):
+        for _ in range(5):
+            assert len(await handler.agenerate_response(_prompt(num_questions=3))) == 3
+
+def test_event_stream_frames_decode_with_botocore():
+    buffer = EventStreamBuffer()
+    buffer.add_data(_event_frame({"contentBlockDelta": {"delta": {"text": "[{"}}}))
+    message = next(iter(buffer))
+    assert message.headers[":event-type"] == "contentBlockDelta"
+    assert message.payload == b'{"delta": {"text": "[{"}}'
@@ -1,8 +1,10 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock, patch
 from app.core.model_handlers import UnifiedModelHandler, create_handler
 from app.models.request_models import ModelParameters
 from app.core.exceptions import InvalidModelError
+from app.core.prompt_templates import PromptBuilder
+from app.core.config import UseCase
 from botocore.exceptions import ClientError
 
 def test_model_handler_initialization():
@@ -23,6 +25,123 @@ def test_invalid_model_error():
     error_response = {'Error': {'Code': 'ValidationException', 'Message': 'model identifier is invalid'}}
     mock_bedrock_client = Mock()
     mock_bedrock_client.converse.side_effect = ClientError(error_response, 'ConvokeModel')
-    handler = UnifiedModelHandler("invalid.model", bedrock_client=mock_bedrock_client)
+    handler = UnifiedModelHandler("invalid.model", bedrock_client=mock_bedrock_client, use_cache=False)
     with pytest.raises(InvalidModelError):
         handler.generate_response("test", request_id="test_id")
+
+@pytest.mark.asyncio
+async def test_async_invalid_model_error():
+    error_response = {'Error': {'Code': 'ValidationException', 'Message': 'model identifier is invalid'}}
+    mock_async_client = Mock()
+    mock_async_client.converse = AsyncMock(side_effect=ClientError(error_response, 'Converse'))
+    handler = UnifiedModelHandler("invalid.model", bedrock_client=Mock(), async_bedrock_client=mock_async_client, use_cache=False)
+    with pytest.raises(InvalidModelError):
+        await handler.agenerate_response("test", request_id="test_id")
+
+@pytest.mark.asyncio
+async def test_async_throttling_retries_without_blocking():
+    error_response = {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}
+    success = {"output": {"message": {"content": [{"text": '[{"question": "q?", "solution": "s!"}]'}]}}}
+    mock_async_client = Mock()
+    mock_async_client.converse = AsyncMock(side_effect=[ClientError(error_response, 'Converse'), success])
+    handler = UnifiedModelHandler("test.model", bedrock_client=Mock(), async_bedrock_client=mock_async_client, use_cache=False)
+    with patch('app.core.model_handlers.asyncio.sleep', new=AsyncMock()) as mock_sleep, \
+         patch('app.core.model_handlers.time.sleep') as mock_blocking_sleep:
+        result = await handler.agenerate_response("test")
+    assert result == [{"question": "q?", "solution": "s!"}]
+    assert mock_async_client.converse.await_count == 2
+    mock_sleep.assert_awaited_once()
+    mock_blocking_sleep.assert_not_called()
+
+def test_sync_throttling_feeds_the_shared_controller():
+    from app.core.concurrency import AdaptiveConcurrencyController
+    error_response = {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}
+    success = {"output": {"message": {"content": [{"text": '[{"question": "q?", "solution": "s!"}]'}]}}}
+    mock_client = Mock()
+    mock_client.converse.side_effect = [ClientError(error_response, 'Converse'), success]
+    controller = AdaptiveConcurrencyController("test.model", initial_limit=8, max_limit=8)
+    handler = UnifiedModelHandler("test.model", bedrock_client=mock_client, use_cache=False)
+    with patch('app.core.model_handlers.get_concurrency_controller', return_value=controller), \
+         patch('app.core.model_handlers.time.sleep'), \
+         patch('app.core.concurrency.telemetry_manager'):
+        assert handler.generate_response("test") == [{"question": "q?", "solution": "s!"}]
+    assert (controller.congestion_events, controller.successes) == (1, 1)
+    assert controller.in_flight == 0
+
+def test_static_prompt_prefix_gets_bedrock_cache_point():
+    prompt = PromptBuilder.build_prompt(
+        model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+        use_case=UseCase.TEXT2SQL,
+        topic="joins",
+        num_questions=5,
+        omit_questions=["Which employees earn more than 50000?"],
+        examples=[],
+        schema="CREATE TABLE orders (id INT, customer_id INT, amount DECIMAL(10,2));\n" * 400,
+        custom_prompt=None
+    )
+    assert "<topic>joins</topic>" not in prompt.prefix
+    assert "Which employees" not in prompt.prefix
+
+    handler = UnifiedModelHandler("us.anthropic.claude-3-7-sonnet-20250219-v1:0", bedrock_client=Mock(), use_cache=False)
+    content = handler._build_converse_kwargs(prompt, 8192)["messages"][0]["content"]
+    assert content == [{"text": prompt.prefix}, {"cachePoint": {"type": "default"}}, {"text": prompt[len(prompt.prefix):]}]
+
+    # Models without prompt caching get the same text as a single block
+    handler = UnifiedModelHandler("us.meta.llama3-1-70b-instruct-v1:0", bedrock_client=Mock(), use_cache=False)
+    assert handler._build_converse_kwargs(prompt, 8192)["messages"][0]["content"] == [{"text": prompt}]
+
+def test_prompt_prefix_stable_across_topics_and_batches():
+    prompts = [
+        PromptBuilder.build_prompt(
+            model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+            use_case=UseCase.CODE_GENERATION,
+            topic=topic,
+            num_questions=num_questions,
+            omit_questions=omit,
+            examples=[],
+            custom_prompt=None
+        )
+        for topic, num_questions, omit in [("stacks", 5, []), ("queues", 3, ["What is a queue?"])]
+    ]
+    assert prompts[0].prefix == prompts[1].prefix
+    assert prompts[0] != prompts[1]
+
+def test_bedrock_usage_recorded_per_call():
+    response = {
+        "output": {"message": {"content": [{"text": '[{"question": "q?", "solution": "s!"}]'}]}},
+        "usage": {"inputTokens": 40, "outputTokens": 12, "cacheReadInputTokens": 1000},
+        "metrics": {"latencyMs": 850},
+        "stopReason": "end_turn",
+    }
+    mock_client = Mock()
+    mock_client.converse.return_value = response
+    handler = UnifiedModelHandler("test.model", bedrock_client=mock_client, use_cache=False)
+    with patch('app.core.model_handlers.telemetry_manager') as mock_telemetry:
+        handler.generate_response("test", request_id="req-1")
+    kwargs = mock_telemetry.record_llm_operation.call_args.kwargs
+    assert kwargs["request_id"] == "req-1"
+    assert kwargs["operation_type"] == "converse"
+    assert kwargs["tokens_input"] == 1040
+    assert kwargs["tokens_output"] == 12
+    assert kwargs["tokens_cache_read"] == 1000
+    assert kwargs["server_latency_ms"] == 850
+    assert kwargs["stop_reason"] == "end_turn"
+    assert kwargs["success"] is True
+
+def test_structured_output_uses_tool_and_returns_tool_input():
+    from app.core.config import QA_PAIR_SCHEMA
+    handler = UnifiedModelHandler("us.anthropic.claude-3-5-haiku-20241022-v1:0", bedrock_client=Mock(),
+                                  use_cache=False, output_schema=QA_PAIR_SCHEMA)
+    tool_config = handler._build_converse_kwargs("test", 8192)["toolConfig"]
+    assert tool_config["toolChoice"] == {"tool": {"name": "record_items"}}
+    assert tool_config["tools"][0]["toolSpec"]["inputSchema"]["json"]["properties"]["items"]["items"] == QA_PAIR_SCHEMA
+
+    items = [{"question": "q?", "solution": "s!"}]
+    response = {"output": {"message": {"content": [{"toolUse": {"toolUseId": "t1", "name": "record_items",
+                                                                "input": {"items": items}}}]}}}
+    assert handler._parse_bedrock_response(response) == items
+
+    # Models without tool use keep the plain text request
+    handler = UnifiedModelHandler("mistral.mixtral-8x7b-instruct-v0:1", bedrock_client=Mock(),
+                                  use_cache=False, output_schema=QA_PAIR_SCHEMA)
+    assert "toolConfig" not in handler._build_converse_kwargs("test", 4096)
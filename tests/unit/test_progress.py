@@ -0,0 +1,34 @@
+from app.core.progress import JobProgress, read_progress
+from app.core.telemetry import telemetry_manager
+
+def test_progress_is_published_at_low_frequency(tmp_path):
+    progress = JobProgress("synth_job_ab12", "generate", directory=str(tmp_path), flush_interval=3600)
+    progress.set_total(4, items=20)
+    for _ in range(3):
+        progress.unit_done(5)
+    # Units finished within the flush interval stay in memory
+    assert read_progress("synth_job_ab12", directory=str(tmp_path))["units_done"] == 0
+    progress.unit_done(3, fallback=True)
+    progress.finish()
+    snapshot = read_progress("synth_job_ab12", directory=str(tmp_path))
+    assert snapshot["status"] == "completed"
+    assert (snapshot["units_done"], snapshot["units_total"]) == (4, 4)
+    assert (snapshot["valid_items"], snapshot["fallback_calls"]) == (18, 1)
+    assert snapshot["eta_seconds"] == 0
+
+def test_eta_and_tokens_exclude_resumed_work(tmp_path):
+    telemetry_manager.track_request_tokens("req-progress")
+    progress = JobProgress("eval_job_cd34", "evaluate", request_id="req-progress", directory=str(tmp_path), flush_interval=0)
+    telemetry_manager.record_llm_operation("req-progress", "model", "evaluate", tokens_input=100, tokens_output=20)
+    progress.resumed(5, 5)
+    progress.set_total(10, items=10)
+    progress.unit_done(1)
+    snapshot = read_progress("eval_job_cd34", directory=str(tmp_path))
+    assert snapshot["valid_items"] == 6
+    assert snapshot["status"] == "running" and snapshot["eta_seconds"] is not None
+    assert (snapshot["tokens_input"], snapshot["tokens_output"]) == (100, 20)
+    progress.finish("failed")
+    assert telemetry_manager.get_request_token_totals("req-progress")["tokens_input"] == 0
+
+def test_missing_progress_file_reads_as_none(tmp_path):
+    assert read_progress("never_started", directory=str(tmp_path)) is None
@@ -0,0 +1,33 @@
+import pytest
+from app.core.rate_limiter import SharedRateLimiter
+
+LIMITS = {"test.model": {"requests_per_minute": 2, "tokens_per_minute": 1000}}
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "rate_limits.db"
+
+def test_unlisted_model_is_not_limited(db_path):
+    limiter = SharedRateLimiter(db_path=db_path, limits=LIMITS)
+    assert not limiter.is_limited("other.model")
+    assert limiter._take("other.model", 10_000) == 0
+
+def test_request_budget_shared_between_processes(db_path):
+    # Two limiter instances on one file stand in for the API server and a CML job
+    server = SharedRateLimiter(db_path=db_path, limits=LIMITS)
+    job = SharedRateLimiter(db_path=db_path, limits=LIMITS)
+    assert server._take("test.model", 10) == 0
+    assert job._take("test.model", 10) == 0
+    wait = server._take("test.model", 10)
+    assert 0 < wait <= 30
+
+def test_token_budget_and_refund(db_path):
+    limiter = SharedRateLimiter(db_path=db_path, limits={"test.model": {"tokens_per_minute": 1000}})
+    assert limiter._take("test.model", 900) == 0
+    assert limiter._take("test.model", 500) > 0
+    limiter.refund("test.model", 800)
+    assert limiter._take("test.model", 500) == 0
+
+def test_oversized_request_is_clamped_to_bucket_size(db_path):
+    limiter = SharedRateLimiter(db_path=db_path, limits={"test.model": {"tokens_per_minute": 1000}})
+    assert limiter._take("test.model", 50_000) == 0
@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import Mock, AsyncMock
+from app.core.model_handlers import UnifiedModelHandler
+from app.core.response_cache import ResponseCache, response_cache_enabled
+from app.models.request_models import ModelParameters
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(db_path=tmp_path / "cache.db", max_bytes=1024)
+
+def test_cache_key_depends_on_params():
+    key_a = ResponseCache.make_key("m", "aws_bedrock", "p", ModelParameters())
+    key_b = ResponseCache.make_key("m", "aws_bedrock", "p", ModelParameters(top_p=0.5))
+    assert key_a != key_b
+    assert key_a == ResponseCache.make_key("m", "aws_bedrock", "p", ModelParameters())
+
+def test_cache_hit_and_miss_counters(cache):
+    assert cache.get("k") is None
+    cache.put("k", [{"question": "q", "solution": "s"}])
+    assert cache.get("k") == [{"question": "q", "solution": "s"}]
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+def test_lru_eviction_keeps_recent_entries(cache):
+    cache.put("old", "x" * 400)
+    cache.put("recent", "y" * 400)
+    cache.get("old")  # touch so "recent" becomes least recently used
+    cache.put("new", "z" * 400)
+    assert cache.get("recent") is None
+    assert cache.get("old") is not None
+    assert cache.stats()["size_bytes"] <= 1024
+
+def test_enabled_only_for_deterministic_calls_by_default():
+    assert response_cache_enabled(ModelParameters(temperature=0.0))
+    assert not response_cache_enabled(ModelParameters(temperature=0.7))
+
+@pytest.mark.asyncio
+async def test_handler_serves_repeated_prompt_from_cache(cache):
+    success = {"output": {"message": {"content": [{"text": '[{"question": "q?", "solution": "s!"}]'}]}}}
+    mock_async_client = Mock()
+    mock_async_client.converse = AsyncMock(return_value=success)
+    handler = UnifiedModelHandler("test.model", bedrock_client=Mock(), async_bedrock_client=mock_async_client, use_cache=True)
+    handler.response_cache = cache
+    first = await handler.agenerate_response("same prompt")
+    second = await handler.agenerate_response("same prompt")
+    assert first == second
+    assert mock_async_client.converse.await_count == 1
+
+@pytest.mark.asyncio
+async def test_unparseable_reply_is_not_cached(cache):
+    failure = {"output": {"message": {"content": [{"text": "Sorry, I cannot help with that."}]}}}
+    mock_async_client = Mock()
+    mock_async_client.converse = AsyncMock(return_value=failure)
+    handler = UnifiedModelHandler("test.model", bedrock_client=Mock(), async_bedrock_client=mock_async_client, use_cache=True)
+    handler.response_cache = cache
+    assert await handler.agenerate_response("same prompt") == [{"text": "Sorry, I cannot help with that."}]
+    await handler.agenerate_response("same prompt")
+    assert mock_async_client.converse.await_count == 2
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,59 @@
+import json
+import pytest
+from app.core.result_writer import JsonlResultWriter, ensure_json_array, iter_json_array, iter_jsonl, iter_result_file, write_json_array
+
+def test_items_are_on_disk_before_finalize_and_renamed_after(tmp_path):
+    path = tmp_path / "out.jsonl"
+    writer = JsonlResultWriter(str(path), transform=lambda item: {"Seeds": item["Topic"], "q": item["question"]})
+    writer.write_many([{"Topic": "t", "question": "a?"}, {"Topic": "t", "question": "b?"}])
+    assert not path.exists()
+    assert list(iter_jsonl(writer.part_path)) == [{"Seeds": "t", "q": "a?"}, {"Seeds": "t", "q": "b?"}]
+    assert writer.finalize() == str(path)
+    assert not (tmp_path / "out.jsonl.part").exists()
+    assert writer.count == 2
+
+def test_failed_job_keeps_partial_results(tmp_path):
+    path = tmp_path / "out.jsonl"
+    with pytest.raises(RuntimeError):
+        with JsonlResultWriter(str(path)) as writer:
+            writer.write({"a": 1})
+            raise RuntimeError("worker died")
+    assert not path.exists()
+    assert list(iter_jsonl(str(path) + ".part")) == [{"a": 1}]
+
+def test_write_at_keeps_input_order(tmp_path):
+    writer = JsonlResultWriter(str(tmp_path / "out.jsonl"))
+    writer.write_at(2, {"i": 2})
+    writer.write_at(0, {"i": 0})
+    assert writer.count == 1
+    writer.write_at(1, {"i": 1})
+    assert [r["i"] for r in iter_jsonl(writer.finalize())] == [0, 1, 2]
+
+@pytest.mark.parametrize("items", [[], [{"question": "q\nline", "solution": "é"}, {"nested": {"a": [1, 2]}}]])
+def test_json_array_matches_legacy_json_dump(tmp_path, items):
+    path = tmp_path / "out.json"
+    assert write_json_array(iter(items), str(path)) == len(items)
+    assert path.read_text() == json.dumps(items, indent=2)
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_json_array_is_read_back_in_chunks(tmp_path, chunk_size):
+    items = [{"input": f"prompt {i}", "tricky": "],{\"" * i} for i in range(20)]
+    path = tmp_path / "in.json"
+    path.write_text(json.dumps(items, indent=2))
+    assert list(iter_json_array(str(path), chunk_size=chunk_size)) == items
+
+def test_truncated_json_array_raises(tmp_path):
+    path = tmp_path / "in.json"
+    path.write_text('[{"input": "a"}, {"input": ')
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path), chunk_size=4))
+
+def test_legacy_array_is_written_from_job_output_on_first_use(tmp_path):
+    items = [{"Seeds": "t", "Prompt": "a?"}, {"Seeds": "t", "Prompt": "b?"}]
+    with JsonlResultWriter(str(tmp_path / "out.jsonl")) as writer:
+        writer.write_many(items)
+    path = tmp_path / "out.json"
+    assert list(iter_result_file(str(path))) == items
+    assert not path.exists()
+    assert ensure_json_array(str(path)) == str(path)
+    assert path.read_text() == json.dumps(items, indent=2)
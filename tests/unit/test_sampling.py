@@ -0,0 +1,47 @@
+import random
+import statistics
+from app.core.sampling import RunningStats, StratifiedSample
+
+def test_running_stats_match_batch_statistics():
+    values = [random.Random(1).uniform(1, 5) for _ in range(500)]
+    values = [v * (i % 7) for i, v in enumerate(values)]
+    first, second = RunningStats(), RunningStats()
+    for i, value in enumerate(values):
+        (first if i < 200 else second).add(value)
+    combined = RunningStats.combine([first, second])
+    assert combined.count == 500
+    assert abs(combined.mean - statistics.mean(values)) < 1e-9
+    assert abs(combined.variance - statistics.variance(values)) < 1e-9
+
+def _run(sample, populations):
+    while True:
+        draws = sample.next_draws()
+        if not any(draws):
+            return
+        for h, positions in enumerate(draws):
+            for position in positions:
+                sample.stats[h].add(populations[h][position])
+
+def test_sample_stops_once_interval_is_narrow_enough():
+    rng = random.Random(7)
+    populations = [[rng.choice([1, 2, 3, 4, 5]) for _ in range(size)] for size in (20000, 5000, 30)]
+    stats = [RunningStats() for _ in populations]
+    sample = StratifiedSample([len(p) for p in populations], stats, target=0.1, seed=3)
+    _run(sample, populations)
+    assert sample.half_width() <= 0.1
+    assert sample.sample_size < sum(len(p) for p in populations) // 10
+    true_mean = sum(map(sum, populations)) / sum(map(len, populations))
+    assert abs(sample.mean() - true_mean) < 0.2
+
+def test_topic_target_and_seed_decide_the_sample():
+    populations = [[(i * 7) % 5 + 1 for i in range(size)] for size in (3000, 12)]
+    drawn = []
+    for _ in range(2):
+        stats = [RunningStats() for _ in populations]
+        sample = StratifiedSample([len(p) for p in populations], stats, target=0.5, stratum_target=0.2, seed=11)
+        _run(sample, populations)
+        drawn.append(list(sample.drawn))
+    assert drawn[0] == drawn[1]
+    # A small topic can only meet its target by being judged in full
+    assert sample.drawn[1] == 12 and sample.stratum_half_width(1) == 0
+    assert sample.stratum_half_width(0) <= 0.2
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
 import json
 from app.services.synthesis_service import SynthesisService
 from app.models.request_models import SynthesisRequest
@@ -32,7 +32,7 @@ async def test_generate_examples_with_topics(synthesis_service):
         use_case="custom"
     )
     with patch('app.services.synthesis_service.create_handler') as mock_handler:
-        mock_handler.return_value.generate_response.return_value = [{"question": "test?", "solution": "test!"}]
+        mock_handler.return_value.agenerate_response = AsyncMock(return_value=[{"question": "test?", "solution": "test!"}])
         result = await synthesis_service.generate_examples(request)
         assert result["status"] == "completed"
         assert len(synthesis_service.db.generation_metadata) == 1
@@ -50,7 +50,160 @@ async def test_generate_examples_with_doc_paths(synthesis_service, mock_file):
     with patch('app.services.synthesis_service.create_handler') as mock_handler, \
          patch('app.services.synthesis_service.DocumentProcessor') as mock_processor:
         mock_processor.return_value.process_document.return_value = ["chunk1"]
-        mock_handler.return_value.generate_response.return_value = [{"question": "test?", "solution": "test!"}]
+        mock_handler.return_value.agenerate_response = AsyncMock(return_value=[{"question": "test?", "solution": "test!"}])
         result = await synthesis_service.generate_examples(request)
         assert result["status"] == "completed"
         assert len(synthesis_service.db.generation_metadata) == 1
+
+@pytest.mark.asyncio
+async def test_generate_examples_streams_items_to_callback(synthesis_service):
+    request = SynthesisRequest(
+        model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
+        num_questions=2,
+        topics=["test_topic"],
+        is_demo=True,
+        use_case="custom"
+    )
+
+    async def astream_response(prompt, **kwargs):
+        yield {"question": "q1?", "solution": "s1"}
+        yield {"invalid": "item"}
+        yield {"question": "q2?", "solution": "s2"}
+
+    streamed = []
+    with patch('app.services.synthesis_service.create_handler') as mock_handler:
+        mock_handler.return_value.astream_response = astream_response
+        result = await synthesis_service.generate_examples(request, on_item=streamed.append)
+    assert result["status"] == "completed"
+    assert streamed == [
+        {"Topic": "test_topic", "question": "q1?", "solution": "s1"},
+        {"Topic": "test_topic", "question": "q2?", "solution": "s2"},
+    ]
+
+@pytest.mark.asyncio
+async def test_generate_examples_rebatches_missing_items_in_one_call(synthesis_service):
+    request = SynthesisRequest(
+        model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
+        num_questions=5,
+        topics=["test_topic"],
+        is_demo=True,
+        use_case="custom"
+    )
+    batch = [{"question": f"q{i}?", "solution": f"s{i}"} for i in range(3)] + [{"invalid": "item"}] * 2
+    remainder = [{"question": f"r{i}?", "solution": f"s{i}"} for i in range(3)]
+    with patch('app.services.synthesis_service.create_handler') as mock_handler, \
+         patch('app.services.synthesis_service.PromptBuilder.build_prompt', return_value="prompt") as build_prompt:
+        mock_handler.return_value.agenerate_response = AsyncMock(side_effect=[batch, remainder])
+        result = await synthesis_service.generate_examples(request)
+    assert mock_handler.return_value.agenerate_response.await_count == 2
+    # The remainder asks for the 2 missing items plus the over-request margin
+    assert [c.kwargs["num_questions"] for c in build_prompt.call_args_list] == [5, 3]
+    assert [p["question"] for p in result["results"]["test_topic"]] == ["q0?", "q1?", "q2?", "r0?", "r1?"]
+
+@pytest.mark.asyncio
+async def test_generate_examples_drops_near_duplicates_across_topics(synthesis_service):
+    request = SynthesisRequest(
+        model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
+        num_questions=1,
+        topics=["topic_a", "topic_b"],
+        is_demo=True,
+        use_case="custom"
+    )
+    with patch('app.services.synthesis_service.create_handler') as mock_handler:
+        mock_handler.return_value.agenerate_response = AsyncMock(
+            return_value=[{"question": "How do you reverse a linked list in Python?", "solution": "..."}])
+        result = await synthesis_service.generate_examples(request)
+    assert sum(len(pairs) for pairs in result["results"].values()) == 1
+
+@pytest.mark.asyncio
+async def test_generate_freeform_keeps_distinct_rows_sharing_categorical_columns(synthesis_service):
+    request = SynthesisRequest(
+        model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
+        num_questions=3,
+        topics=["customers"],
+        is_demo=True,
+        use_case="custom"
+    )
+    shared = {"country": "United States", "industry": "Financial services", "plan": "Premium annual",
+              "status": "Active", "segment": "Enterprise"}
+    rows = [
+        {"name": "Alice Johnson", **shared},
+        {"name": "Alice Johnson", **shared, "plan": "Basic monthly"},
+        {"name": "Bob Smith", **shared},
+        {"name": "Carol Diaz", **shared},
+    ]
+    with patch('app.services.synthesis_service.create_handler') as mock_handler, \
+         patch('app.services.synthesis_service.PromptBuilder.build_freeform_prompt', return_value="prompt"):
+        mock_handler.return_value.agenerate_response = AsyncMock(return_value=rows)
+        result = await synthesis_service.generate_freeform(request)
+    assert [row["name"] for row in result["results"]["customers"]] == ["Alice Johnson", "Bob Smith", "Carol Diaz"]
+
+@pytest.mark.asyncio
+async def test_generate_examples_resumes_from_checkpoint(synthesis_service, tmp_path):
+    from app.core.checkpoint import JobCheckpoint
+    request = SynthesisRequest(
+        model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
+        num_questions=5,
+        topics=["test_topic"],
+        is_demo=True,
+        use_case="custom"
+    )
+    checkpoint = JobCheckpoint("synth_job_test", directory=str(tmp_path))
+    checkpoint.record_unit("topic/0/0", [{"Topic": "test_topic", "question": f"Done question {i}?", "solution": "s"}
+                                         for i in range(3)])
+    new_items = [{"question": "What is a closure?", "solution": "s"}, {"question": "Why use generators?", "solution": "s"}]
+    with patch('app.services.synthesis_service.create_handler') as mock_handler, \
+         patch('app.services.synthesis_service.PromptBuilder.build_prompt', return_value="prompt") as build_prompt:
+        mock_handler.return_value.agenerate_response = AsyncMock(return_value=new_items)
+        result = await synthesis_service.generate_examples(request, checkpoint=checkpoint)
+    # Only the 2 questions the first run did not finish are generated
+    assert [c.kwargs["num_questions"] for c in build_prompt.call_args_list] == [2]
+    assert len(result["results"]["test_topic"]) == 5
+    assert len(checkpoint.completed_units("topic/0/")) == 2
+
+@pytest.mark.asyncio
+async def test_generate_examples_reports_each_finished_topic(synthesis_service):
+    request = SynthesisRequest(
+        model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
+        num_questions=1,
+        topics=["topic_a", "topic_b"],
+        is_demo=True,
+        use_case="custom"
+    )
+    questions = iter(["How do you reverse a linked list in Python?", "What does the GIL protect?"])
+    events = []
+
+    async def astream_response(prompt, **kwargs):
+        yield {"question": next(questions), "solution": "..."}
+
+    with patch('app.services.synthesis_service.create_handler') as mock_handler:
+        mock_handler.return_value.astream_response = astream_response
+        await synthesis_service.generate_examples(
+            request, on_item=lambda item: events.append(("item", item["Topic"])),
+            on_topic=lambda topic, items, errors: events.append(("topic", topic, items)))
+    # Each topic is reported right after its last item, before the call returns
+    assert sorted(events) == [("item", "topic_a"), ("item", "topic_b"), ("topic", "topic_a", 1), ("topic", "topic_b", 1)]
+    assert events.index(("topic", "topic_a", 1)) > events.index(("item", "topic_a"))
+
+@pytest.mark.asyncio
+async def test_run_inputs_keeps_order_with_a_bounded_window(synthesis_service):
+    import asyncio
+    rows_read = []
+    written = []
+
+    def rows():
+        for i in range(50):
+            rows_read.append(i)
+            yield i
+
+    async def process(index, row):
+        # Later rows finish first, so results must be reordered
+        await asyncio.sleep((50 - index) / 10000)
+        # Rows are pulled lazily: never more than the window ahead of what is written
+        assert len(rows_read) - len(written) <= 4 + 1
+        return row * 2
+
+    count = await synthesis_service.run_inputs(rows(), process, lambda index, item: written.append(item),
+                                               "us.anthropic.claude-3-5-haiku-20241022-v1:0", max_pending=4)
+    assert count == 50
+    assert written == [i * 2 for i in range(50)]
@@ -0,0 +1,50 @@
+from unittest.mock import Mock, patch
+from app.core.token_estimator import (
+    TokenEstimator, TOKENIZER_PROFILES, count_tokens, get_token_limits, MIN_OUTPUT_TOKENS
+)
+from app.core.config import ModelFamily
+from app.core.model_handlers import UnifiedModelHandler
+from app.models.request_models import ModelParameters
+
+CLAUDE = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+LLAMA = "us.meta.llama3-1-70b-instruct-v1:0"
+
+def test_count_tokens_follows_tokenizer_profile():
+    text = "Order 1234567 shipped to Zürich on 2024-05-01.\n\nSELECT * FROM orders;"
+    claude = count_tokens(text, TOKENIZER_PROFILES[ModelFamily.CLAUDE])
+    mistral = count_tokens(text, TOKENIZER_PROFILES[ModelFamily.MISTRAL])
+    # Mistral splits digits one by one, so the same text costs more tokens
+    assert 15 < claude < mistral < 60
+    assert count_tokens("") == 0
+
+def test_plan_fits_output_cap_and_context_window():
+    estimator = TokenEstimator()
+    assert get_token_limits(CLAUDE) == (200000, 8192)
+    assert estimator.plan_max_tokens(CLAUDE, 1000, 8192) == 8192
+    assert estimator.plan_max_tokens(LLAMA, 1000, 8192) == 2048
+    assert estimator.plan_max_tokens(CLAUDE, 195000, 8192) == MIN_OUTPUT_TOKENS
+    assert estimator.plan_max_tokens("mistral.mixtral-8x7b-instruct-v0:1", 28000, 4096) == 32768 - 30800
+
+def test_observed_usage_calibrates_estimates():
+    estimator = TokenEstimator(smoothing=0.5)
+    prompt = "word " * 400
+    first = estimator.estimate(CLAUDE, prompt)
+    with patch("app.core.token_estimator.telemetry_manager") as telemetry:
+        for _ in range(10):
+            estimator.observe(CLAUDE, estimator.estimate(CLAUDE, prompt), first * 2)
+    assert telemetry.record_token_estimate.call_count == 10
+    assert abs(estimator.estimate(CLAUDE, prompt) - first * 2) <= first * 0.05
+
+def test_first_bedrock_call_uses_planned_max_tokens():
+    bedrock_client = Mock()
+    bedrock_client.converse.return_value = {
+        "output": {"message": {"content": [{"text": '[{"question": "q?", "solution": "s"}]'}]}},
+        "usage": {"inputTokens": 20, "outputTokens": 10},
+    }
+    handler = UnifiedModelHandler(LLAMA, bedrock_client=bedrock_client,
+                                  model_params=ModelParameters(max_tokens=8192), use_cache=False)
+    with patch("app.core.token_estimator.telemetry_manager"):
+        result = handler.generate_response("Generate one question")
+    assert result == [{"question": "q?", "solution": "s"}]
+    assert bedrock_client.converse.call_count == 1
+    assert bedrock_client.converse.call_args.kwargs["inferenceConfig"]["maxTokens"] == 2048
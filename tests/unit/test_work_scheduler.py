@@ -0,0 +1,64 @@
+import asyncio
+import time
+import pytest
+from app.core.work_scheduler import WorkLane, WorkUnitScheduler
+
+class CountingLane(WorkLane):
+    def __init__(self, units, duration=0.02, fail_at=None):
+        self.units = units
+        self.duration = duration
+        self.fail_at = fail_at
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+
+    def has_work(self):
+        return len(self.started) < self.units
+
+    def remaining_units(self):
+        return self.units - len(self.started)
+
+    def next_unit(self):
+        index = len(self.started)
+        self.started.append(index)
+        return self._unit(index)
+
+    async def _unit(self, index):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.duration)
+            if index == self.fail_at:
+                raise RuntimeError("unit failed")
+        finally:
+            self.running -= 1
+
+@pytest.mark.asyncio
+async def test_skewed_lanes_share_capacity():
+    lanes = [CountingLane(12), CountingLane(2), CountingLane(2)]
+    scheduler = WorkUnitScheduler(capacity=lambda: 4, max_in_flight_per_lane=4)
+    started = time.monotonic()
+    await scheduler.run(lanes)
+    elapsed = time.monotonic() - started
+    assert all(not lane.has_work() for lane in lanes)
+    assert scheduler.max_in_flight == 4
+    # 16 units over 4 slots take 4 rounds, not the 12 the large lane needs on its own
+    assert elapsed < 8 * 0.02
+    assert lanes[0].max_running > 1
+
+@pytest.mark.asyncio
+async def test_lane_stays_sequential_while_other_lanes_have_work():
+    lanes = [CountingLane(3), CountingLane(3)]
+    await WorkUnitScheduler(capacity=lambda: 2, max_in_flight_per_lane=4).run(lanes)
+    assert [lane.max_running for lane in lanes] == [1, 1]
+
+    lanes = [CountingLane(4)]
+    await WorkUnitScheduler(capacity=lambda: 4, max_in_flight_per_lane=1).run(lanes)
+    assert lanes[0].max_running == 1
+
+@pytest.mark.asyncio
+async def test_failed_unit_cancels_the_rest():
+    lanes = [CountingLane(5, fail_at=0), CountingLane(5, duration=1.0)]
+    with pytest.raises(RuntimeError):
+        await WorkUnitScheduler(capacity=lambda: 2).run(lanes)
+    assert lanes[1].running == 0